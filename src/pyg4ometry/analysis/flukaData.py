@@ -1,5 +1,12 @@
+import logging as _logging
+import mmap as _mmap
+import os as _os
 import struct as _struct
+import zlib as _zlib
 import numpy as _np
+from ..utils import forkMap as _forkMap
+
+_log = _logging.getLogger(__name__)
 
 
 def fortran_skip(f):
@@ -7,11 +14,14 @@ def fortran_skip(f):
 
     if not rlen:
         return 0
+    if len(rlen) < 4:
+        msg = "skipping fortran blocks"
+        raise OSError(msg)
     (size,) = _struct.unpack("=i", rlen)
     f.seek(size, 1)
     rlen2 = f.read(4)
     if rlen != rlen2:
-        msg = "kipping fortran blocks"
+        msg = "skipping fortran blocks"
         raise OSError(msg)
     return size
 
@@ -29,6 +39,53 @@ def fortran_read(f):
     return data
 
 
+def fortran_index(fd):
+    """
+    Scan the records of an unformatted Fortran file from the current position
+    without reading their contents. Returns an (n,2) int64 array of the file
+    offset of the data of each record and its size in bytes. The leading and
+    trailing record markers are checked as in fortran_read.
+    """
+    records = []
+    while True:
+        rlen = fd.read(4)
+        if not rlen:
+            break
+        if len(rlen) < 4:
+            msg = "indexing fortran records"
+            raise OSError(msg)
+        (size,) = _struct.unpack("=i", rlen)
+        records.append((fd.tell(), size))
+        fd.seek(size, 1)
+        rlen2 = fd.read(4)
+        if rlen != rlen2:
+            msg = "indexing fortran records"
+            raise OSError(msg)
+    return _np.array(records, dtype=_np.int64).reshape(-1, 2)
+
+
+def _checkRecordSize(size, shape, name):
+    # a record mapped lazily must hold the float32 array given by the header (as the
+    # reshape of an eagerly read record)
+    if size != 4 * int(_np.prod(shape)):
+        msg = f"{name} record of {size} bytes does not match the detector shape {shape}"
+        raise ValueError(msg)
+
+
+def _memmapRecord(record):
+    # float32 array of a record (fileName, offset, shape) mapped from the file
+    fileName, offset, shape = record
+    return _np.memmap(fileName, dtype=_np.float32, mode="r", offset=offset, shape=shape, order="F")
+
+
+def _fileName(fd):
+    try:
+        return fd.name
+    except AttributeError:
+        msg = "lazy reading requires a file on disk"
+        raise ValueError(msg) from None
+
+
 def debugDumpFile(fd, limit=10000000):
     fd.seek(0)
 
@@ -97,8 +154,30 @@ class FlukaBinData:
         self.name = name
         self.type = type
         self.data = None
+        self.errors = None
         self.stats = None
 
+    # data and errors of lazily read files are mapped from the file on access
+    @property
+    def data(self):
+        if self._data is None and getattr(self, "_dataRecord", None) is not None:
+            return _memmapRecord(self._dataRecord)
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+
+    @property
+    def errors(self):
+        if self._errors is None and getattr(self, "_errorsRecord", None) is not None:
+            return _memmapRecord(self._errorsRecord)
+        return self._errors
+
+    @errors.setter
+    def errors(self, errors):
+        self._errors = errors
+
     def binToVtkGrid(self):
         import vtk as _vtk
         import vtk.util.numpy_support as _numpy_support
@@ -106,15 +185,15 @@ class FlukaBinData:
         # rectilinear
         if self.mesh == 0:
             imdata = _vtk.vtkImageData()
-            dataArray = _numpy_support.numpy_to_vtk(
-                _np.log10(self.data.ravel()), deep=True, array_type=_vtk.VTK_DOUBLE
-            )
+            # vtk image points are ordered with e1 fastest
+            logData = _np.log10(_np.ravel(self.data, order="F"))
+            dataArray = _numpy_support.numpy_to_vtk(logData, deep=True, array_type=_vtk.VTK_DOUBLE)
 
-            print(_np.log10(self.data.ravel()).min(), _np.log10(self.data.ravel()).max())
+            _log.debug(f"log10 data range {logData.min()} {logData.max()}")
             ox = -(self.e1high - self.e1low) / 2 * 10
             oy = -(self.e2high - self.e2low) / 2 * 10
             oz = -(self.e3high - self.e3low) / 2 * 10
-            print("origin", ox, oy, oz)
+            _log.debug(f"origin {ox} {oy} {oz}")
             dx = (self.e1high - self.e1low) / self.e1n * 10
             dy = (self.e2high - self.e2low) / self.e2n * 10
             dz = (self.e3high - self.e3low) / self.e3n * 10
@@ -136,26 +215,85 @@ class FlukaBdxData:
         self.index = index
         self.name = name
         self.type = type
+        self.data = None
+
+    @property
+    def data(self):
+        if self._data is None and getattr(self, "_dataRecord", None) is not None:
+            return _memmapRecord(self._dataRecord)
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
 
 
 class Usrbin(_FlukaDataFile):
-    def __init__(self, fd, read_data=False):
+    """
+    USRBIN binary output. fd is an open (binary) file or a file name. With
+    lazy=True only the headers are read, the record offsets of the file are
+    indexed and the data and errors of each detector are numpy memmaps of
+    the file, so a slice of a detector only reads that part of the file.
+    """
+
+    def __init__(self, fd, read_data=False, lazy=False):
+        if type(fd) is str:
+            with open(fd, "rb") as f:
+                self.__init__(f, read_data, lazy)
+            return
         fd.seek(0)
 
         self.stat_pos = -1
+        self.lazy = lazy
 
         self.detector = []
 
         super().read_header(fd)
-        self.read_file(fd)
+        if lazy:
+            self.read_index(fd)
+        else:
+            self.read_file(fd)
 
     def read_file(self, fd):
         while self.read_header(fd):
             self.read_data(fd)
-        print(f"Read {len(self.detector)} detectors")
+        _log.info(f"Read {len(self.detector)} detectors")
 
         self.read_stats(fd)
 
+    def read_index(self, fd):
+        fileName = _fileName(fd)
+        records = fortran_index(fd)
+
+        iRecord = 0
+        while iRecord < len(records):
+            offset, size = records[iRecord]
+            fd.seek(offset)
+            data = fd.read(size)
+
+            if size == 86:
+                det = self.parse_header(data)
+                if iRecord + 1 == len(records):
+                    msg = f"no data record for detector {det.name}"
+                    raise OSError(msg)
+                offset, size = records[iRecord + 1]
+                _checkRecordSize(size, det.shape, "data")
+                det._dataRecord = (fileName, int(offset), det.shape)
+                iRecord += 2
+            elif size == 14 and data[0:10] == b"STATISTICS":
+                self.stat_pos = int(offset + size + 4)
+                errorRecords = records[iRecord + 1 : iRecord + 1 + len(self.detector)]
+                if len(errorRecords) != len(self.detector):
+                    msg = "missing statistics records"
+                    raise OSError(msg)
+                for det, (offset, size) in zip(self.detector, errorRecords):
+                    _checkRecordSize(size, det.shape, "errors")
+                    det._errorsRecord = (fileName, int(offset), det.shape)
+                break
+            else:
+                break
+        _log.info(f"Indexed {len(self.detector)} detectors")
+
     def read_data(self, fd):
         self.detector[-1].data = _np.reshape(
             _np.frombuffer(fortran_read(fd), _np.float32),
@@ -166,13 +304,13 @@ class Usrbin(_FlukaDataFile):
     def read_stats(self, fd):
         data = fortran_read(fd)
         if data is None:
-            print("No statistics")
+            _log.info("No statistics")
             return
 
         if len(data) == 14 and data[0:10] == b"STATISTICS":
             self.stat_pos = fd.tell()
 
-        print("Statistics present")
+        _log.info("Statistics present")
         for det in self.detector:
             data = fortran_read(fd)
             det.errors = _np.reshape(
@@ -190,7 +328,11 @@ class Usrbin(_FlukaDataFile):
             fd.seek(pos)  # return to statistics
             return False
 
-        # Parse header
+        self.parse_header(data)
+
+        return True
+
+    def parse_header(self, data):
         header = _struct.unpack("=i10siiffifffifffififff", data)
 
         idet = header[0]
@@ -211,12 +353,6 @@ class Usrbin(_FlukaDataFile):
         e3n = int(header[14])
         e3d = float(header[15])
 
-        # print(e1low, e1high, e1n, e1d)
-        # print(e2low, e2high, e2n, e2d)
-        # print(e3low, e3high, e3n, e3d)
-
-        data_size = e1n * e2n * e3n * 4
-
         fluka_data = FlukaBinData(idet, name, "bin")
 
         fluka_data.ncase = self.ncase
@@ -236,24 +372,47 @@ class Usrbin(_FlukaDataFile):
         fluka_data.e1n = e1n
         fluka_data.e2n = e2n
         fluka_data.e3n = e3n
+        fluka_data.shape = (e1n, e2n, e3n)
 
         self.detector.append(fluka_data)
 
-        return True
+        return fluka_data
 
     def print_header(self):
         super().print_header()
 
 
+def sumUsrbin(files, average=False, nworkers=1):
+    """
+    Sum (or average with average=True) the detectors of several USRBIN files,
+    e.g. the cycles of a run, weighted by their primary weight. The files are
+    merged as by mergeUsrbin, which also gives the errors of the average.
+    Returns the detectors of the first file with float64 data, and without
+    errors for a sum.
+    """
+    return _merge(Usrbin, files, nworkers, average)
+
+
 class Usrbdx(_FlukaDataFile):
-    def __init__(self, file):
+    """
+    USRBDX binary output. fd is an open (binary) file or a file name. With
+    lazy=True the data of each detector is a numpy memmap of the file (see
+    Usrbin).
+    """
+
+    def __init__(self, file, lazy=False):
         self.detector = []
+        self.stat_pos = -1
+        self.lazy = lazy
 
         if type(file) is str:
-            fd = open(file, "rb")
-        else:
-            fd = file
-            fd.seek(0)
+            with open(file, "rb") as fd:
+                super().read_header(fd)
+                self.read_file(fd)
+            return
+
+        fd = file
+        fd.seek(0)
 
         super().read_header(fd)
         self.read_file(fd)
@@ -265,16 +424,26 @@ class Usrbdx(_FlukaDataFile):
         self.read_stats(fd)
 
     def read_data(self, fd):
-        self.detector[-1].data = _np.reshape(
+        det = self.detector[-1]
+        if self.lazy:
+            det._dataRecord = (_fileName(fd), fd.tell() + 4, (det.ne, det.na))
+            size = fortran_skip(fd)
+            if not size:
+                msg = f"no data record for detector {det.name}"
+                raise OSError(msg)
+            _checkRecordSize(size, (det.ne, det.na), "data")
+            return
+
+        det.data = _np.reshape(
             _np.frombuffer(fortran_read(fd), _np.float32),
-            (self.detector[-1].ne, self.detector[-1].na),
+            (det.ne, det.na),
             order="F",
         )
 
     def read_stats(self, fd):
         data = fortran_read(fd)
         if data is None:
-            print("No statistics")
+            _log.info("No statistics")
             return
 
         if len(data) == 14 and data[0:10] == b"STATISTICS":
@@ -336,136 +505,392 @@ class Usrbdx(_FlukaDataFile):
         return True
 
 
-class Usrdump(_FlukaDataFile):
-    def __init__(self, fd, iEventHeaderToRead=10000):
-        self.event_seek = []
-        self.read_structure(fd, iEventHeaderToRead)
-
-        self.track_data = []
-        self.energy_data = []
-        self.source_data = []
-
-    def read_structure(self, fd, iEventHeaderToRead=10000):
-        print("read_header")
-
-        # start of file
+def _indexRun(job):
+    # primary weight, number of primaries and detector data records of one file
+    reader, fileName = job
+    run = reader(fileName, lazy=True)
+    return run.weight, run.ncase, [det._dataRecord for det in run.detector]
+
+
+def _detectorSums(job):
+    # weighted sums of the data records of one detector over the files of one worker
+    shape = job[0][2][2]
+    sumX = _np.zeros(shape, dtype=_np.float64, order="F")
+    sumX2 = _np.zeros(shape, dtype=_np.float64, order="F")
+    sumW = 0.0
+    ncase = 0
+    for weight, n, record in job:
+        x = _np.asarray(_memmapRecord(record), dtype=_np.float64)
+        sumX += weight * x
+        sumX2 += weight * x * x
+        sumW += weight
+        ncase += n
+    return sumX, sumX2, sumW, ncase
+
+
+def _merge(reader, files, nworkers, average=True):
+    files = list(files)
+    first = reader(files[0], lazy=True)
+    detectors = first.detector
+    shapes = [det._dataRecord[2] for det in detectors]
+    nworkers = max(1, min(nworkers, len(files)))
+
+    # each file is indexed once, the detectors are then summed from its records
+    runs = _forkMap(_indexRun, [(reader, fileName) for fileName in files[1:]], nworkers, "merge")
+    runs.insert(0, (first.weight, first.ncase, [det._dataRecord for det in detectors]))
+
+    for fileName, run in zip(files, runs):
+        if [record[2] for record in run[2]] != shapes:
+            msg = f"{fileName} has different detectors"
+            raise ValueError(msg)
+
+    chunks = [[runs[i] for i in c] for c in _np.array_split(_np.arange(len(runs)), nworkers)]
+
+    for iDet, det in enumerate(detectors):
+        shape = shapes[iDet]
+        jobs = [[(w, n, records[iDet]) for w, n, records in chunk] for chunk in chunks]
+        results = _forkMap(_detectorSums, jobs, nworkers, "merge")
+
+        sumX = _np.zeros(shape, dtype=_np.float64, order="F")
+        sumX2 = _np.zeros(shape, dtype=_np.float64, order="F")
+        sumW = 0.0
+        ncase = 0
+        for x, x2, w, n in results:
+            sumX += x
+            sumX2 += x2
+            sumW += w
+            ncase += n
+        del results
+
+        det.weight = sumW
+        det.ncase = ncase
+        det.nbatch = len(files)
+        det._errorsRecord = None
+        if not average:
+            det.data = sumX
+            det.errors = None
+            continue
+
+        # weighted mean and its relative error from the spread of the files
+        mean = sumX / sumW
+        errors = _np.zeros(shape, dtype=_np.float64, order="F")
+        if len(files) > 1:
+            variance = _np.clip(sumX2 / sumW - mean * mean, 0, None) / (len(files) - 1)
+            nonZero = mean != 0
+            errors[nonZero] = _np.sqrt(variance[nonZero]) / _np.abs(mean[nonZero])
+
+        det.data = mean
+        det.errors = errors
+
+    return detectors
+
+
+def mergeUsrbin(files, nworkers=1):
+    """
+    Merge the USRBIN files of many cycles like FLUKA's usbsuw. Returns the
+    detectors (FlukaBinData) with the mean of the files weighted by their
+    primary weight as data and the relative statistical error (a fraction)
+    from the spread of the files as errors. The files are indexed once and
+    merged lazily one detector at a time, by a pool of nworkers processes.
+
+    :param files: USRBIN file names
+    :type files: list of str
+    :param nworkers: number of worker processes
+    :type nworkers: int
+    """
+    return _merge(Usrbin, files, nworkers)
+
+
+def mergeUsrbdx(files, nworkers=1):
+    """
+    Merge the USRBDX files of many cycles like FLUKA's usxsuw, see mergeUsrbin.
+    Returns the detectors (FlukaBdxData) with data and errors.
+
+    :param files: USRBDX file names
+    :type files: list of str
+    :param nworkers: number of worker processes
+    :type nworkers: int
+    """
+    return _merge(Usrbdx, files, nworkers)
+
+
+# structured arrays of decoded USRDUMP (mgdraw) events, positions in cm
+trackDtype = _np.dtype(
+    [
+        ("track", _np.int32),
+        ("jtrack", _np.int32),
+        ("etrack", _np.float32),
+        ("wtrack", _np.float32),
+        ("ctrack", _np.float32),
+        ("start", _np.float32, 3),
+        ("end", _np.float32, 3),
+    ]
+)
+# energy deposits (DTRACK) along the tracks, a track may have any number of them
+dtrackDtype = _np.dtype([("track", _np.int32), ("dtrack", _np.float32)])
+energyDtype = _np.dtype(
+    [
+        ("icode", _np.int32),
+        ("jtrack", _np.int32),
+        ("etrack", _np.float32),
+        ("wtrack", _np.float32),
+        ("position", _np.float32, 3),
+        ("rull", _np.float32),
+    ]
+)
+sourceDtype = _np.dtype(
+    [
+        ("ncase", _np.int32),
+        ("iloflk", _np.int32),
+        ("energy", _np.float32),
+        ("weight", _np.float32),
+        ("position", _np.float32, 3),
+        ("direction", _np.float32, 3),
+    ]
+)
+_trackHeaderDtype = _np.dtype(
+    [
+        ("ntrack", _np.int64),
+        ("mtrack", _np.int64),
+        ("jtrack", _np.int32),
+        ("etrack", _np.float32),
+        ("wtrack", _np.float32),
+        ("ctrack", _np.float32),
+    ]
+)
+_sourceRecordDtype = _np.dtype([("iloflk", _np.int32), ("data", _np.float32, 8)])
+
+
+def _fileBuffer(fd):
+    # read only memory map of the whole file, or its contents if it cannot be mapped
+    try:
+        return _mmap.mmap(fd.fileno(), 0, access=_mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
         fd.seek(0)
+        return fd.read()
 
-        # count of file records
-        iRecord = 0
-        iEvent = 0
 
-        while True:
-            # file position for later recording
-            file_pos = fd.tell()
-
-            # read file record
-            data = fortran_read(fd)
-
-            # if nothing is read break loop
-            if not data:
-                break
-
-            # entry header
-            if len(data) == 20:
-                ndum, mdum, jdum, edum, wdum = _struct.unpack("=iiiff", data)
+def _fileMtime(fd):
+    # modification time in ns, 0 for a file object that is not on disk
+    try:
+        return _os.fstat(fd.fileno()).st_mtime_ns
+    except (AttributeError, OSError, ValueError):
+        return 0
 
-                # print(ndum, mdum, jdum, edum, wdum)
-                if ndum < 0:
-                    print(iRecord, file_pos, "read source")
-                    self.event_seek.append(file_pos)
-                    if iEvent > iEventHeaderToRead:
-                        break
 
-                    iEvent += 1
-                    iRecord += 1
+class Usrdump(_FlukaDataFile):
+    """
+    USRDUMP (mgdraw) binary output. fd is an open (binary) file or a file
+    name. The file offsets of the first iEventHeaderToRead events are
+    indexed once (event_seek, the last entry is the end of the last event).
+    If indexFile is given the index is read from that sidecar file, or
+    written to it if it does not exist or is for a different file (its size,
+    modification time or a checksum of its first and last blocks differ) or
+    holds fewer events than asked for.
+
+    Events are decoded with event(ievent) into structured arrays (see
+    trackDtype, energyDtype, sourceDtype and dtrackDtype) of the track
+    segments, energy deposits, source particles and energy deposits along the
+    tracks, positions are in cm.
+    """
+
+    def __init__(self, fd, iEventHeaderToRead=10000, indexFile=None):
+        if type(fd) is str:
+            with open(fd, "rb") as f:
+                self.buffer = _fileBuffer(f)
+                self._mtime = _fileMtime(f)
+        else:
+            self.buffer = _fileBuffer(fd)
+            self._mtime = _fileMtime(fd)
+
+        self.event_seek = None
+        if indexFile is not None:
+            self.read_index(indexFile, iEventHeaderToRead)
+        if self.event_seek is None:
+            self.read_structure(fd, iEventHeaderToRead)
+            if indexFile is not None:
+                self.write_index(indexFile)
+
+        self.track_data = _np.zeros(0, dtype=trackDtype)
+        self.energy_data = _np.zeros(0, dtype=energyDtype)
+        self.source_data = _np.zeros(0, dtype=sourceDtype)
+        self.dtrack_data = _np.zeros(0, dtype=dtrackDtype)
+
+    def __len__(self):
+        return len(self.event_seek) - 1
+
+    def read_structure(self, fd=None, iEventHeaderToRead=10000):
+        buf = self.buffer
+        end = len(buf)
+        seek = []
+        self._complete = True
+
+        # records are pairs of a 20 byte entry header and its data
+        pos = 0
+        while pos + 28 <= end:
+            size, ndum = _struct.unpack_from("=ii", buf, pos)
+            if size != 20:
+                msg = "reading USRDUMP entry header"
+                raise OSError(msg)
+
+            if ndum < 0:
+                if len(seek) == iEventHeaderToRead:
+                    self._complete = False
+                    break
+                seek.append(pos)
+
+            (size,) = _struct.unpack_from("=i", buf, pos + 28)
+            pos += 28 + size + 8
+
+        seek.append(min(pos, end))
+        self.event_seek = _np.array(seek, dtype=_np.int64)
+        _log.info(f"Indexed {len(self)} events")
+
+    def read_index(self, indexFile, iEventHeaderToRead=10000):
+        try:
+            with open(indexFile, "rb") as f:
+                index = _np.load(f)
+        except (OSError, ValueError):
+            return
 
-                # skip data
-                fortran_read(fd)
+        # first entries identify the indexed file, then whether all its events are indexed
+        key = self._indexKey()
+        n = len(key)
+        if len(index) < n + 2 or not (index[:n] == key).all():
+            return
+        complete = bool(index[n])
+        seek = index[n + 1 :]
+        if len(seek) - 1 < iEventHeaderToRead and not complete:
+            return
 
-        self.event_seek.append(100000000000)
+        self._complete = complete and len(seek) - 1 <= iEventHeaderToRead
+        self.event_seek = seek[: iEventHeaderToRead + 1]
+
+    def write_index(self, indexFile):
+        index = [self._indexKey(), [self._complete], self.event_seek]
+        with open(indexFile, "wb") as f:
+            _np.save(f, _np.concatenate(index).astype(_np.int64))
+
+    def _indexKey(self):
+        # size, modification time and checksum of the first and last blocks of the file
+        buf = self.buffer
+        block = min(len(buf), 1 << 16)
+        checksum = _zlib.crc32(buf[len(buf) - block :], _zlib.crc32(buf[:block]))
+        return _np.array([len(buf), self._mtime, checksum], dtype=_np.int64)
+
+    def event(self, ievent):
+        """
+        Decode event ievent, returns (tracks, energy, sources, dtrack) structured arrays
+        """
+        if ievent < 0 or ievent >= len(self):
+            msg = f"event {ievent} out of range"
+            raise IndexError(msg)
+
+        buf = self.buffer
+        pos = int(self.event_seek[ievent])
+        stop = int(self.event_seek[ievent + 1])
+
+        trackPoints = []
+        trackDeposits = []
+        trackHeaders = []
+        energy = []
+        sources = []
+
+        while pos < stop:
+            ndum, mdum, jdum, edum, wdum = _struct.unpack_from("=iiiff", buf, pos + 4)
+            (size,) = _struct.unpack_from("=i", buf, pos + 28)
+            offset = pos + 32
+            pos += 28 + size + 8
+
+            # tracking
+            if ndum > 0:
+                # points, mtrack deposits and the curved path length
+                data = _np.frombuffer(buf, _np.float32, 3 * (ndum + 1) + mdum + 1, offset)
+                trackPoints.append(data[: 3 * (ndum + 1)].reshape(ndum + 1, 3))
+                trackDeposits.append(data[3 * (ndum + 1) : -1])
+                trackHeaders.append((ndum, mdum, jdum, edum, wdum, data[-1]))
+            # energy
+            elif ndum == 0:
+                x, y, z, rull = _struct.unpack_from("=4f", buf, offset)
+                energy.append((mdum, jdum, edum, wdum, (x, y, z), rull))
+            # source
+            else:
+                data = _np.frombuffer(buf, _sourceRecordDtype, mdum, offset)
+                source = _np.zeros(mdum, dtype=sourceDtype)
+                source["ncase"] = -ndum
+                source["iloflk"] = data["iloflk"]
+                source["energy"] = data["data"][:, 0]
+                source["weight"] = data["data"][:, 1]
+                source["position"] = data["data"][:, 2:5]
+                source["direction"] = data["data"][:, 5:8]
+                sources.append(source)
+
+        # one row per track segment
+        headers = _np.array(trackHeaders, dtype=_trackHeaderDtype)
+        nSegments = headers["ntrack"]
+        tracks = _np.zeros(int(nSegments.sum()), dtype=trackDtype)
+        tracks["track"] = _np.repeat(_np.arange(len(headers)), nSegments)
+        for field in ["jtrack", "etrack", "wtrack", "ctrack"]:
+            tracks[field] = _np.repeat(headers[field], nSegments)
+        if trackPoints:
+            tracks["start"] = _np.concatenate([p[:-1] for p in trackPoints])
+            tracks["end"] = _np.concatenate([p[1:] for p in trackPoints])
+
+        # one row per deposit along a track
+        dtrack = _np.zeros(int(headers["mtrack"].sum()), dtype=dtrackDtype)
+        dtrack["track"] = _np.repeat(_np.arange(len(headers)), headers["mtrack"])
+        if trackDeposits:
+            dtrack["dtrack"] = _np.concatenate(trackDeposits)
+
+        energy = _np.array(energy, dtype=energyDtype)
+        if sources:
+            sources = _np.concatenate(sources)
+        else:
+            sources = _np.zeros(0, dtype=sourceDtype)
 
-    def read_event(self, fd, ievent=0):
-        print("read_event")
-        # clear event data
-        self.track_data.clear()
-        self.energy_data.clear()
-        self.source_data.clear()
+        return tracks, energy, sources, dtrack
 
+    def read_event(self, fd=None, ievent=0):
         # check event number
-        if ievent > len(self.event_seek) - 1:
-            print("Event out of range")
+        if ievent > len(self) - 1:
+            _log.warning("Event out of range")
             return
 
-        # move to start of event
-        fd.seek(self.event_seek[ievent])
+        self.track_data, self.energy_data, self.source_data, self.dtrack_data = self.event(ievent)
 
-        # read header
-        while True:
-            if fd.tell() == self.event_seek[ievent + 1]:
-                print("next event reached", fd.tell())
-                break
+    def trackDataToPolydata(self, tracks=None):
+        """
+        vtkPolyData of the track segments (default those of the last event
+        read), with the particle type (jtrack) as cell data. The tracks of
+        many events can be converted together by concatenating them.
+        """
+        import vtk as _vtk
+        import vtk.util.numpy_support as _numpy_support
 
-            # read file record
-            data = fortran_read(fd)
+        if tracks is None:
+            tracks = self.track_data
 
-            # break on no data
-            if not data:
-                break
+        idType = _numpy_support.get_vtk_to_numpy_typemap()[_vtk.VTK_ID_TYPE]
+        nSegments = len(tracks)
 
-            if len(data) == 20:
-                ndum, mdum, jdum, edum, wdum = _struct.unpack("=iiiff", data)
-
-                # tracking
-                if ndum > 0:
-                    ntrack = ndum
-                    mtrack = mdum
-                    jtrack = jdum
-                    etrack = edum
-                    wtrack = wdum
-                    data = fortran_read(fd)
-                    data = list(_struct.unpack(f"={3 * (ntrack + 1) + mtrack + 1}f", data))
-                    self.track_data.append(data)
-                # energy
-                elif ndum == 0:
-                    icode = ndum
-                    jtrack = jdum
-                    etrack = edum
-                    wtrack = wdum
-                    data = fortran_read(fd)
-                    data = list(_struct.unpack("=4f", data))
-                    self.energy_data.append(data)
-                # source
-                else:
-                    ncase = ndum
-                    npflka = mdum
-                    nstmax = jdum
-                    tkesum = edum
-                    weipri = wdum
-                    data = fortran_read(fd)
-                    data = list(_struct.unpack("=" + ("i8f" * npflka), data))
-                    self.source_data.append(data)
-
-    def trackDataToPolydata(self):
-        import vtk as _vtk
+        # cm to mm, start and end point of each segment
+        points = 10 * _np.stack([tracks["start"], tracks["end"]], axis=1).reshape(-1, 3)
+        offsets = _np.arange(0, 2 * nSegments + 1, 2, dtype=idType)
+        connectivity = _np.arange(2 * nSegments, dtype=idType)
 
         vp = _vtk.vtkPoints()
+        vp.SetData(_numpy_support.numpy_to_vtk(points.astype(_np.float32), deep=1))
         ca = _vtk.vtkCellArray()
-        pd = _vtk.vtkPolyData()
-
-        iPnt = 0
-        for t in self.track_data:
-            iPntStart = iPnt
-            id1 = vp.InsertNextPoint(10 * t[0], 10 * t[1], 10 * t[2])
-            id2 = vp.InsertNextPoint(10 * t[3], 10 * t[4], 10 * t[5])
-
-            iPnt += 2
-
-            ca.InsertNextCell(2)
-            ca.InsertCellPoint(id1)
-            ca.InsertCellPoint(id2)
+        ca.SetData(
+            _numpy_support.numpy_to_vtkIdTypeArray(offsets, deep=1),
+            _numpy_support.numpy_to_vtkIdTypeArray(connectivity, deep=1),
+        )
+        jtrack = _numpy_support.numpy_to_vtk(_np.ascontiguousarray(tracks["jtrack"]), deep=1)
+        jtrack.SetName("jtrack")
 
+        pd = _vtk.vtkPolyData()
         pd.SetPoints(vp)
         pd.SetLines(ca)
+        pd.GetCellData().AddArray(jtrack)
 
         return pd
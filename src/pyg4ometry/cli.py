@@ -34,7 +34,7 @@ class OptionParserTestable(OptionParser):
             self.exit(2, msg2)
 
 
-def _loadFile(fileName):
+def _loadFile(fileName, nworkers=1):
     # convert to string for possible pathlib path object from testing data
     if type(fileName) != str:
         fileName = str(fileName)
@@ -49,7 +49,7 @@ def _loadFile(fileName):
         wl = reg.getWorldVolume()
     elif fileName.find(".inp") != -1:
         r = _pyg4.fluka.Reader(fileName)
-        reg = _pyg4.convert.fluka2Geant4(r.getRegistry())
+        reg = _pyg4.convert.fluka2Geant4(r.getRegistry(), nworkers=nworkers)
         wl = reg.getWorldVolume()
     elif fileName.find(".stl") != -1:
         reg = _pyg4.geant4.Registry()
@@ -139,6 +139,7 @@ def cli(
     view=False,
     bounding=False,
     checkOverlaps=False,
+    nworkers=1,
     analysis=False,
     nullMeshException=False,
     compareFileName=None,
@@ -186,7 +187,7 @@ def cli(
     if nullMeshException:
         _pyg4.config.meshingNullException = not nullMeshException
 
-    reg, wl = _loadFile(inputFileName)
+    reg, wl = _loadFile(inputFileName, nworkers)
 
     if bounding:
         bbExtent = _np.array(wl.extent())
@@ -226,7 +227,7 @@ def cli(
 
     if checkOverlaps:
         print("pyg4> checkoverlaps")  # noqa: T201
-        wl.checkOverlaps(True)
+        wl.checkOverlaps(True, nworkers=nworkers)
 
     if analysis:
         print("pyg4> analysis")  # noqa: T201
@@ -234,13 +235,13 @@ def cli(
         a.printSummary()
 
     if compareFileName is not None:
-        creg, cwl = _loadFile(compareFileName)
+        creg, cwl = _loadFile(compareFileName, nworkers)
         comparision = _pyg4.compare.geometry(wl, cwl, _pyg4.compare.Tests(), False)
         print("pyg4> compare")  # noqa: T201
         comparision.print()
 
     if appendFileName is not None:
-        reg1, wl1 = _loadFile(appendFileName)
+        reg1, wl1 = _loadFile(appendFileName, nworkers)
         wp1 = _pyg4.geant4.PhysicalVolume(r, t, wl1, "l1_pv", wl, reg)
         print("pyg4> append")  # noqa: T201
         reg.addVolumeRecursive(wp1)
@@ -417,6 +418,15 @@ def main(testArgs=None, testing=False):
         help="information on geometry (tree, reg, instance)",
         dest="info",
     )
+    parser.add_option(
+        "-j",
+        "--jobs",
+        help="number of worker processes for overlap checking and FLUKA conversion",
+        dest="nworkers",
+        type="int",
+        default=1,
+        metavar="NWORKERS",
+    )
     parser.add_option(
         "-l",
         "--logical",
@@ -567,6 +577,7 @@ def main(testArgs=None, testing=False):
         view=options.__dict__["view"],
         bounding=options.__dict__["bounding"],
         checkOverlaps=options.__dict__["checkOverlaps"],
+        nworkers=options.__dict__["nworkers"],
         analysis=options.__dict__["analysis"],
         nullMeshException=options.__dict__["nullmesh"],
         compareFileName=options.__dict__["compareFileName"],
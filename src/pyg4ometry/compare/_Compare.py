@@ -343,7 +343,9 @@ def logicalVolumes(
         elif includeAllTestResults:
             result["nDaughters"] += [TestResultNamed(testName, TestResult.Passed)]
 
-    result += _meshes(testName, rlv.mesh, olv.mesh, tests)
+    # only access the meshes if needed as they may not be built yet (config.lazyMeshing)
+    if tests.shapeExtent or tests.shapeVolume or tests.shapeArea:
+        result += _meshes(testName, rlv.mesh, olv.mesh, tests)
 
     # if not recursive return now and don't loop over daughter physical volumes
     if not recursive:
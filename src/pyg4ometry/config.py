@@ -2,6 +2,8 @@
 # _logging.basicConfig(filename='logging.log', encoding='utf-8', level=_logging.INFO)
 
 
+import os as _os
+
 """
 We check that sweep angles aren't greater than 2 pi. This is the tolerance for rounding
 errors. The default is around float precision.
@@ -32,6 +34,30 @@ def backendName():
 # whether to generate meshes during the construction of each logical volume
 # note this is required for a lot of functionality
 doMeshing = True
+# whether to defer meshing of each logical volume until its mesh is first used (e.g. by a
+# viewer, extent or overlap checking). This makes loading fast when meshes are not needed
+lazyMeshing = False
+
+# whether to share meshes between solids of the same type with identical evaluated parameters
+# and mesh settings. Shared meshes must not be modified in place (clone them first).
+meshCache = True
+# maximum number of meshes held in memory by the mesh cache (least recently used are evicted)
+meshCacheSize = 1000
+# optional directory to store the cached meshes in so they are reused between sessions (None for
+# memory only). This can also be set with the environment variable PYG4OMETRY_MESH_CACHE_DIR.
+meshCacheDirectory = _os.environ.get("PYG4OMETRY_MESH_CACHE_DIR", None)
+# maximum number of FLUKA body meshes held by the mesh cache of each FlukaRegistry (only used if
+# meshCache is True)
+flukaBodyMeshCacheSize = 10000
+
+# level of detail variants of meshes for visualisation (see visualisation.Mesh.lodMesh). Each
+# entry is the fraction of the triangles removed by quadric decimation for level 1, 2, ... (level
+# 0 is the full mesh). Meshes are not decimated below lodMinPolygons triangles.
+lodReductions = [0.5, 0.8, 0.95]
+lodMinPolygons = 32
+# fraction of the screen below which a mesh is drawn with level 1, 2, ... (see
+# visualisation.ViewerBase.setLevelOfDetail)
+lodScreenFractions = [0.1, 0.03, 0.01]
 
 # Global settings for default meshing settings for solids
 # nslice and and nstacks determine the discretisation of curved solids.
@@ -8,6 +8,7 @@ import warnings as _warnings
 
 from .fluka2g4materials import makeFlukaToG4MaterialsMap as _makeFlukaToG4MaterialsMap
 from ..fluka.vector import areAABBsOverlapping as _areAABBsOverlapping
+from ..fluka.region import regionZoneAABBsToRegionAABBs as _regionZoneAABBsToRegionAABBs
 from .. import fluka as _fluka
 from .. import geant4 as _g4
 from .. import transformation as _trans
@@ -36,6 +37,7 @@ def fluka2Geant4(
     worldDimensions=None,
     omitBlackholeRegions=True,
     quadricRegionAABBs=None,
+    nworkers=1,
     **kwargs,
 ):
     """
@@ -55,6 +57,8 @@ def fluka2Geant4(
     :type omitBlackholeRegions: bool
     :param quadricRegionAABBs: The axis-aligned aabbs of any regions featuring QUA bodies, mapping region names to fluka.AABB instances.
     :type quadricRegionAABBs: dict
+    :param nworkers: number of worker processes to mesh the zones of the regions with.
+    :type nworkers: int
 
     Developer options (to kwargs) withLengthSafety: Whether or not to apply automatic length safety.
 
@@ -80,7 +84,7 @@ def fluka2Geant4(
         flukareg = _makeLengthSafetyRegistry(flukareg, regions)
 
     if kwargs["minimiseSolids"]:
-        regionZoneAABBs = _getRegionZoneAABBs(flukareg, regions, quadricRegionAABBs)
+        regionZoneAABBs = _getRegionZoneAABBs(flukareg, regions, quadricRegionAABBs, nworkers)
         flukareg, regionZoneAABBs = _filterRegistryNullZones(flukareg, regionZoneAABBs)
         regions = [r for r in regions if r in regionZoneAABBs]
         if not regions:
@@ -210,11 +214,22 @@ def _makeLengthSafetyRegistry(flukareg, regions):
     return fluka_reg_out
 
 
-def _getRegionZoneAABBs(flukareg, regions, quadricRegionAABBs):
+def _getRegionZoneAABBs(flukareg, regions, quadricRegionAABBs, nworkers=1):
     """Loop over the regions, and for each region, get all the aabbs
     of the zones belonging to that region.  Don't do this for
     quadricRegionAABBs, instead, just continue to use the aabb
-    provided by the user."""
+    provided by the user.  The zones are meshed by nworkers
+    processes."""
+
+    meshedZoneAABBs = _fluka.regionZoneAABBs(
+        [
+            region
+            for name, region in flukareg.regionDict.items()
+            if name not in quadricRegionAABBs and name in regions
+        ],
+        aabb=None,
+        nworkers=nworkers,
+    )
 
     regionZoneAABBs = {}
     for name, region in flukareg.regionDict.items():
@@ -240,7 +255,7 @@ def _getRegionZoneAABBs(flukareg, regions, quadricRegionAABBs):
         elif name not in regions:
             continue
         else:
-            regionZoneAABBs[name] = region.zoneAABBs(aabb=None)
+            regionZoneAABBs[name] = meshedZoneAABBs[name]
     return regionZoneAABBs
 
 
@@ -598,17 +613,6 @@ def _getMaximalQuadricRegionAABBs(freg, quadricRegionAABBs):
     return regionSharedAABBs
 
 
-def _regionZoneAABBsToRegionAABBs(regionZoneAABBs):
-    """Given a map of region names to zone aabbs, return a map of
-    region names to a total region aabb.
-    """
-    regionAABBs = {}
-    for name, zoneAABBs in regionZoneAABBs.items():
-        regionAABB = _reduce(_getMaximalOfTwoAABBs, zoneAABBs, zoneAABBs[0])
-        regionAABBs[name] = regionAABB
-    return regionAABBs
-
-
 def _copyStructureToNewFlukaRegistry(freg, fregtarget):
     fregtarget.latticeDict = _deepcopy(freg.latticeDict)
     fregtarget.assignmas = _deepcopy(freg.assignmas)
@@ -19,8 +19,31 @@
     END
 """
 
+import gzip as _gzip
+import io as _io
+import numbers as _numbers
+
 from . import material as _material
-from .directive import RecursiveRotoTranslation, Transform
+from .card import Card as _Card
+from .directive import RecursiveRotoTranslation, RotoTranslation, Transform
+
+# cards written before the geometry
+_initCards = [
+    "TITLE",
+    "DEFAULTS",
+    "GLOBAL",
+    "BEAM",
+    "BEAMPOS",
+    "BEAMAXES",
+    "PHOTONUC",
+    "MUPHOTON",
+    "PAIRBREM",
+    "",
+]
+
+
+def _isInitCard(keyword):
+    return keyword in _initCards or len(keyword) > 8
 
 
 class Writer:
@@ -30,12 +53,21 @@ class Writer:
     >>> f = Writer()
     >>> f.addDetector(flukaRegObject)
     >>> f.write("model.inp")
+
+    The output is generated line by line (see lines) and written in large
+    chunks, to a file (gzip compressed if the file name ends in .gz) or to any
+    file-like object.
     """
 
     _flukaFFString = (
         "*...+....1....+....2....+....3....+....4....+....5....+....6....+....7....+..."
     )
 
+    # number of lines joined per write call
+    _chunkLines = 4096
+    # buffer size in bytes of files opened by write
+    _bufferSize = 1 << 20
+
     def __init__(self):
         pass
 
@@ -45,133 +77,192 @@ class Writer:
         """
         self.flukaRegistry = flukaRegistry
 
-    def write(self, fileName):
+    def write(self, fileName, fixed=False):
+        """
+        Write the output to a given filename. e.g. "model.inp" or "model.inp.gz"
+        (gzip compressed), or to a file-like object opened for writing in text or
+        binary mode.
+
+        :param fileName: file name or file-like object to write to
+        :type fileName: str, pathlib.Path or file-like
+        :param fixed: write the (non-geometry) cards in FIXED rather than FREE format
+        :type fixed: bool
         """
-        Write the output to a given filename. e.g. "model.inp".
+        if hasattr(fileName, "write"):
+            self._writeLines(fileName, fixed)
+            return
+
+        if str(fileName).endswith(".gz"):
+            f = _gzip.open(fileName, "wt")
+        else:
+            f = open(fileName, "w", buffering=self._bufferSize)
+        with f:
+            self._writeLines(f, fixed)
+
+    def _writeLines(self, f, fixed):
+        binary = not isinstance(f, _io.TextIOBase)
+        chunk = []
+        for line in self.lines(fixed=fixed):
+            chunk.append(line)
+            if len(chunk) == self._chunkLines:
+                self._writeChunk(f, chunk, binary)
+                chunk = []
+        if chunk:
+            self._writeChunk(f, chunk, binary)
+
+    @staticmethod
+    def _writeChunk(f, chunk, binary):
+        text = "\n".join(chunk) + "\n"
+        f.write(text.encode() if binary else text)
+
+    def lines(self, fixed=False):
+        """
+        Generator of the lines (without line endings) of the FLUKA input
+        for the registry.  The geometry is always written in the name based
+        free format (GEOBEGIN with COMBNAME), the other cards are written in
+        FREE format or, if fixed, in FIXED format.
+
+        :param fixed: yield the (non-geometry) cards in FIXED rather than FREE format
+        :type fixed: bool
         """
-        f = open(fileName, "w")
+        freg = self.flukaRegistry
 
-        f.write("FREE\n")
+        cardString = _Card.toFixedString if fixed else _Card.toFreeString
+
+        if not fixed:
+            yield "FREE"
 
         # actually used rot-defi directives
         rotdefi = {}
 
         # loop over (init cards)
-        for c in self.flukaRegistry.cardDict.keys():
-            if (
-                c == "TITLE"
-                or c == "DEFAULTS"
-                or c == "GLOBAL"
-                or c == "BEAM"
-                or c == "BEAMPOS"
-                or c == "BEAMAXES"
-                or c == "PHOTONUC"
-                or c == "MUPHOTON"
-                or c == "PAIRBREM"
-                or c == ""
-                or len(c) > 8
-            ):
-                if type(self.flukaRegistry.cardDict[c]) is list:
-                    for cc in self.flukaRegistry.cardDict[c]:
-                        cardstr = cc.toFreeString()
-                        f.write(f"{cardstr}\n")
-                else:
-                    cardstr = self.flukaRegistry.cardDict[c].toFreeString()
-
-        f.write("GEOBEGIN , , , , , , , COMBNAME\n")
-        f.write("    0    0\n")
+        for keyword, cards in freg.cardDict.items():
+            if _isInitCard(keyword):
+                for card in cards:
+                    yield from cardString(card).splitlines()
+
+        if fixed:
+            yield _Card("GEOBEGIN", sdum="COMBNAME").toFixedString()
+        else:
+            yield "GEOBEGIN , , , , , , , COMBNAME"
+        yield "    0    0"
 
         # loop over bodies
-        for bk in self.flukaRegistry.bodyDict.keys():
-            transform = self.flukaRegistry.bodyDict[bk].transform
-
-            if type(transform) is RecursiveRotoTranslation:
-                if len(transform) != 0:
-                    if transform.flukaFreeString() != "":
-                        f.write("$start_transform " + transform.name + "\n")
-                        try:
-                            rotdefi[transform.name] = transform
-                        except KeyError:
-                            pass
-
-                f.write(self.flukaRegistry.bodyDict[bk].flukaFreeString() + "\n")
-
-                if len(transform) != 0:
-                    if transform.flukaFreeString() != "":
-                        f.write("$end_transform\n")
-            elif type(transform) is Transform:
-                if transform.rotoTranslation:
-                    if len(transform.rotoTranslation) != 0:
-                        if transform.rotoTranslation.flukaFreeString() != "":
-                            f.write("$start_transform " + transform.rotoTranslation.name + "\n")
-                            try:
-                                rotdefi[transform.rotoTranslation.name] = transform.rotoTranslation
-                            except KeyError:
-                                pass
-
-                f.write(self.flukaRegistry.bodyDict[bk].flukaFreeString() + "\n")
-
-                if transform.rotoTranslation:
-                    if len(transform.rotoTranslation) != 0:
-                        if transform.rotoTranslation.flukaFreeString() != "":
-                            f.write("$end_transform\n")
-        f.write("END\n")
+        for body in freg.bodyDict.values():
+            directives, rotoTranslations = self._bodyDirectives(body)
+            for rotoTranslation in rotoTranslations:
+                rotdefi[rotoTranslation.name] = rotoTranslation
+
+            for start, _ in directives:
+                yield start
+            yield from body.flukaFreeString().splitlines()
+            for _, end in reversed(directives):
+                yield end
+        yield "END"
 
         # loop over regions
-        for rk in self.flukaRegistry.regionDict.keys():
-            f.write(self.flukaRegistry.regionDict[rk].flukaFreeString())
-        f.write("END\n")
-        f.write("GEOEND\n")
+        for region in freg.regionDict.values():
+            yield from region.flukaFreeString().splitlines()
+        yield "END"
+        yield "GEOEND"
 
         # loop over materials
-        f.write("FREE\n")
+        if not fixed:
+            yield "FREE"
 
         predefinedNames = _material.predefinedMaterialNames()
 
-        f.write(self._flukaFFString + "\n")
+        yield self._flukaFFString
 
-        for mk in self.flukaRegistry.materials.keys():
+        for name, material in freg.materials.items():
             # check if material/compound is already defined
-            if mk in predefinedNames:
-                pass
+            if name in predefinedNames:
+                continue
+            if fixed:
+                if material.comment:
+                    yield f"* {material.comment}"
+                for card in material.toCards():
+                    yield card.toFixedString()
             else:
-                f.write(self.flukaRegistry.materials[mk].flukaFreeString() + "\n")
+                yield from material.flukaFreeString().splitlines()
 
         # loop over material assignments
-        for rk in self.flukaRegistry.regionDict.keys():
+        for name in freg.regionDict:
             try:
-                # print(self.flukaRegistry.assignmas[rk])
-                assignmaString = "ASSIGNMA " + self.flukaRegistry.assignmas[rk][0] + " " + rk
-                f.write(assignmaString + "\n")
-
-                # now electric field
-
-                # now magnetic field
+                materialName = freg.assignmas[name][0]
             except KeyError:
-                print("Region does not have an assigned material", rk)
-
-        # loop over magnetic fields
+                print("Region does not have an assigned material", name)
+                continue
+            if fixed:
+                yield _Card("ASSIGNMA", materialName, name).toFixedString()
+            else:
+                yield "ASSIGNMA " + materialName + " " + name
 
         # loop over rotdefis
-        for rotdefi in rotdefi.values():
-            rotstr = rotdefi.flukaFreeString()
-            f.write(f"{rotstr}\n")
+        for rotoTranslation in rotdefi.values():
+            for r in rotoTranslation:
+                yield cardString(r.toCard())
 
         # loop over (non init cards)
-        for c in self.flukaRegistry.cardDict.keys():
-            if (
-                c != "TITLE"
-                and c != "GLOBAL"
-                and c != "DEFAULTS"
-                and c != "BEAM"
-                and c != "BEAMPOS"
-                and c != "BEAMAXES"
-                and c != ""
-            ):
-                for card in self.flukaRegistry.cardDict[c]:
-                    cardstr = card.toFreeString()
-                    f.write(f"{cardstr}\n")
-
-        # Close file (TODO use with)
-        # f.write("END\n")
-        f.close()
+        for keyword, cards in freg.cardDict.items():
+            if not _isInitCard(keyword):
+                for card in cards:
+                    yield from cardString(card).splitlines()
+
+    @staticmethod
+    def _bodyDirectives(body):
+        """
+        Geometry directives ($start_expansion, $start_translat and $start_transform)
+        a body is defined in as a list of (start, end) lines, outermost first, and the
+        RecursiveRotoTranslations they refer to. A Transform (as made by the Reader)
+        holds stacks of each kind with the rotoTranslations innermost first.
+        """
+        transform = body.transform
+        if type(transform) is not Transform:
+            transform = Transform(rotoTranslation=transform)
+
+        directives = []
+
+        expansions = transform.expansion
+        if not expansions:
+            expansions = []
+        elif isinstance(expansions, _numbers.Number):
+            expansions = [expansions]
+        for expansion in expansions:
+            directives.append((f"$start_expansion {expansion}", "$end_expansion"))
+
+        translations = transform.translation
+        if translations is None or len(translations) == 0:
+            translations = []
+        elif isinstance(translations[0], _numbers.Number):
+            translations = [translations]
+        for translation in translations:
+            # CONVERTING TO CENTIMETRES
+            x, y, z = (0.1 * t for t in translation)
+            directives.append((f"$start_translat {x} {y} {z}", "$end_translat"))
+
+        rotoTranslations = transform.rotoTranslation
+        inversions = transform.invertRotoTranslation
+        if not rotoTranslations:
+            rotoTranslations = []
+        elif isinstance(rotoTranslations, (RotoTranslation, RecursiveRotoTranslation)):
+            rotoTranslations = [rotoTranslations]
+            if not isinstance(inversions, (list, tuple)):
+                inversions = [bool(inversions)]
+        if not inversions:
+            inversions = [False] * len(rotoTranslations)
+
+        recursiveRotoTranslations = []
+        for rotoTranslation, invert in reversed(list(zip(rotoTranslations, inversions))):
+            if type(rotoTranslation) is RotoTranslation:
+                rotoTranslation = RecursiveRotoTranslation(rotoTranslation.name, [rotoTranslation])
+            elif type(rotoTranslation) is not RecursiveRotoTranslation:
+                msg = f"Cannot write transform {rotoTranslation!r} of body {body.name}"
+                raise TypeError(msg)
+            if len(rotoTranslation) == 0:
+                continue
+            name = "-" + rotoTranslation.name if invert else rotoTranslation.name
+            directives.append(("$start_transform " + name, "$end_transform"))
+            recursiveRotoTranslations.append(rotoTranslation)
+
+        return directives, recursiveRotoTranslations
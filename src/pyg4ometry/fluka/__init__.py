@@ -35,6 +35,8 @@ from .region import (
     zone_to_sympy,
     region_to_sympy,
     sympy_to_region,
+    regionZoneAABBs,
+    regionZoneAABBsToRegionAABBs,
 )
 from .directive import Transform, RotoTranslation, RecursiveRotoTranslation
 from .lattice import Lattice
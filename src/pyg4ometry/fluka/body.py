@@ -25,10 +25,12 @@ __all__ = [
 ]
 
 from math import degrees
+from collections import OrderedDict
 from contextlib import contextmanager
 from copy import deepcopy
 import logging
 from itertools import chain
+import threading
 
 import numpy as np
 import vtk
@@ -80,6 +82,156 @@ def infinity(inf):
         INFINITY = _DEFAULT_INFINITY
 
 
+class BodyMeshCache:
+    """
+    Cache of body meshes, one per FlukaRegistry. Meshes are keyed on the body itself,
+    its parameters and transform (i.e. body.hash()), the AABB used to truncate infinite
+    bodies and the current INFINITY, so an edited body is simply remeshed. Copies of the
+    meshes are returned as they are often modified in place. The least recently used
+    meshes are evicted beyond maxSize entries. Copies of bodies (and pickled bodies)
+    refer to the same (a new) cache.
+
+    :param maxSize: maximum number of meshes held (None for config.flukaBodyMeshCacheSize)
+    :type maxSize: int or None
+    """
+
+    def __init__(self, maxSize=None):
+        self._maxSize = maxSize
+        self._meshes = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxSize(self):
+        return self._maxSize if self._maxSize is not None else _config.flukaBodyMeshCacheSize
+
+    def __len__(self):
+        return len(self._meshes)
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getstate__(self):
+        return {"_maxSize": self._maxSize}
+
+    def __setstate__(self, state):
+        self.__init__(state["_maxSize"])
+
+    def clear(self):
+        """
+        Remove all meshes and reset the statistics.
+        """
+        with self._lock:
+            self._meshes.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def invalidate(self, body):
+        """
+        Remove all meshes of a body (for any AABB).
+        """
+        with self._lock:
+            keys = [k for k in self._meshes if k[:2] == self._bodyKey(body)]
+            for key in keys:
+                del self._meshes[key]
+
+    @staticmethod
+    def _bodyKey(body):
+        # the body is kept with its meshes so its id is not reused while they are cached
+        return (id(body), body.hash())
+
+    @staticmethod
+    def _key(body, aabb):
+        if aabb is None:
+            aabbKey = None
+        else:
+            aabbKey = (tuple(float(x) for x in aabb.lower), tuple(float(x) for x in aabb.upper))
+        return (*BodyMeshCache._bodyKey(body), aabbKey, INFINITY)
+
+    def mesh(self, body, aabb=None):
+        """
+        Return (a copy of) the mesh of body, meshing it only if it is not in the cache.
+        """
+        key = self._key(body, aabb)
+        with self._lock:
+            if key in self._meshes:
+                self._meshes.move_to_end(key)
+                self.hits += 1
+                return self._meshes[key][1].clone()
+            self.misses += 1
+
+        mesh = body._mesh(aabb)
+
+        with self._lock:
+            self._meshes[key] = (body, mesh)
+            self._meshes.move_to_end(key)
+            while len(self._meshes) > max(self.maxSize, 0):
+                self._meshes.popitem(last=False)
+        return mesh.clone()
+
+
+def _unboundedExtent():
+    return np.array([[-np.inf] * 3, [np.inf] * 3])
+
+
+def _transformPoints(transform, points):
+    # points as rows, transformed by the full (expansion, rotation and translation) matrix
+    matrix = transform.to4DMatrix()
+    return np.array(points, dtype=float) @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def _transformVectors(transform, vectors):
+    matrix = transform.to4DMatrix()
+    return np.array(vectors, dtype=float) @ matrix[:3, :3].T
+
+
+def _pointsExtent(points):
+    return np.array([points.min(axis=0), points.max(axis=0)])
+
+
+def _ellipseExtent(centres, semiAxes):
+    # extent of ellipses (or ellipsoids) with the given centres (rows) and
+    # semi-axis vectors (rows), i.e. the sets c + sum_i cos/sin(t_i) a_i
+    half = np.sqrt((np.asarray(semiAxes) ** 2).sum(axis=0))
+    centres = np.atleast_2d(centres)
+    return np.array([(centres - half).min(axis=0), (centres + half).max(axis=0)])
+
+
+def _mergeExtents(extents):
+    extents = np.array(extents)
+    return np.array([extents[:, 0].min(axis=0), extents[:, 1].max(axis=0)])
+
+
+def _isAxisAligned(vectors):
+    # each row (vector) is along one of the axes
+    vectors = np.atleast_2d(np.array(vectors, dtype=float))
+    vectors = np.abs(vectors) / np.linalg.norm(vectors, axis=1)[:, np.newaxis]
+    return np.isclose(np.sort(vectors, axis=1), [0, 0, 1], atol=1e-12).all()
+
+
+def _perpendicularVectors(direction):
+    # two orthogonal unit vectors perpendicular to direction
+    direction = np.asarray(direction, dtype=float)
+    direction = direction / np.linalg.norm(direction)
+    other = np.identity(3)[np.argmin(np.abs(direction))]
+    u = np.cross(direction, other)
+    u /= np.linalg.norm(u)
+    return u, np.cross(direction, u)
+
+
+def _infiniteCylinderExtent(transform, centre, direction, semiAxes):
+    # cross-section ellipse extent, unbounded along the axes the cylinder axis is not
+    # perpendicular to
+    centre = _transformPoints(transform, centre)
+    direction = _transformVectors(transform, direction)
+    extent = _ellipseExtent(centre, _transformVectors(transform, semiAxes))
+    unbounded = ~np.isclose(direction / np.linalg.norm(direction), 0, atol=1e-12)
+    extent[0][unbounded] = -np.inf
+    extent[1][unbounded] = np.inf
+    return extent
+
+
 class BodyMixin(vis.ViewableMixin):
     """
     Base class representing a body as defined in FLUKA
@@ -126,6 +278,29 @@ class BodyMixin(vis.ViewableMixin):
         return offset
 
     def mesh(self, aabb=None):
+        """
+        Mesh of this body, truncated to aabb for infinite bodies. Bodies in a
+        FlukaRegistry share the registry's BodyMeshCache.
+        """
+        meshCache = getattr(self, "_meshCache", None)
+        if meshCache is not None and _config.meshCache:
+            return meshCache.mesh(self, aabb)
+        return self._mesh(aabb)
+
+    def analyticExtent(self):
+        """
+        Axis-aligned extent [[xmin, ymin, zmin], [xmax, ymax, zmax]] of this body
+        calculated from its parameters without meshing. Unbounded directions are
+        given as -inf/inf. Returns None if the body is empty.
+        """
+        return _unboundedExtent()
+
+    def _isAxisAlignedBox(self):
+        # True if the body is exactly filled by its analytic extent (clipped to any
+        # finite extent), i.e. an axis-aligned box or half space.
+        return False
+
+    def _mesh(self, aabb):
         mesh = self.geant4Solid(g4.Registry(), aabb=aabb).mesh()
         axis, angle = trans.tbxyz2axisangle(self.tbxyz())
         mesh.rotate(axis, -degrees(angle))
@@ -176,6 +351,21 @@ class _HalfSpaceMixin(BodyMixin):
 
         return shiftedCentre
 
+    def analyticExtent(self):
+        # only bounded (on one side) if the normal is along an axis
+        extent = _unboundedExtent()
+        if self._isAxisAlignedBox():
+            normal, point = self.toPlane()
+            axis = np.argmax(np.abs(normal))
+            if normal[axis] > 0:
+                extent[1][axis] = point[axis]
+            else:
+                extent[0][axis] = point[axis]
+        return extent
+
+    def _isAxisAlignedBox(self):
+        return _isAxisAligned(self.toPlane()[0])
+
     def _toPlaneHelper(self, normal, point):
         normal = Three(self.transform.leftMultiplyRotation(normal))
         point = self.transform.leftMultiplyVector(point)
@@ -281,6 +471,18 @@ class RPP(BodyMixin):
     def lengths(self):
         return self.upper - self.lower
 
+    def analyticExtent(self):
+        corners = [
+            [x, y, z]
+            for x in (self.lower.x, self.upper.x)
+            for y in (self.lower.y, self.upper.y)
+            for z in (self.lower.z, self.upper.z)
+        ]
+        return _pointsExtent(_transformPoints(self.transform, corners))
+
+    def _isAxisAlignedBox(self):
+        return _isAxisAligned(self.transform.toRotationMatrix()[:3, :3])
+
     def geant4Solid(self, reg, aabb=None):
         v = self.transform.netExpansion() * (self.upper - self.lower)
         return g4.solid.Box(self.name, v.x, v.y, v.z, reg, lunit="mm")
@@ -388,6 +590,20 @@ class BOX(BodyMixin):
         n = np.linalg.norm
         return Three(n(self.edge1), n(self.edge2), n(self.edge3))
 
+    def analyticExtent(self):
+        edges = np.array([self.edge1, self.edge2, self.edge3])
+        corners = [
+            np.array(self.vertex) + np.array([i, j, k]) @ edges
+            for i in (0, 1)
+            for j in (0, 1)
+            for k in (0, 1)
+        ]
+        return _pointsExtent(_transformPoints(self.transform, corners))
+
+    def _isAxisAlignedBox(self):
+        edges = _transformVectors(self.transform, [self.edge1, self.edge2, self.edge3])
+        return _isAxisAligned(edges)
+
     def geant4Solid(self, greg, aabb=None):
         exp = self.transform.netExpansion()
         return g4.solid.Box(
@@ -480,6 +696,10 @@ class SPH(BodyMixin):
     def rotation(self):
         return self.transform.leftMultiplyRotation(np.identity(3))
 
+    def analyticExtent(self):
+        semiAxes = _transformVectors(self.transform, self.radius * np.identity(3))
+        return _ellipseExtent(_transformPoints(self.transform, self.point), semiAxes)
+
     def geant4Solid(self, reg, aabb=None):
         return g4.solid.Orb(self.name, self.transform.netExpansion() * self.radius, reg, lunit="mm")
 
@@ -553,6 +773,12 @@ class RCC(BodyMixin):
         rotation = trans.matrix_from(initial, final)
         return self.transform.leftMultiplyRotation(rotation)
 
+    def analyticExtent(self):
+        centres = _transformPoints(self.transform, [self.face, self.face + self.direction])
+        u, v = _perpendicularVectors(self.direction)
+        semiAxes = _transformVectors(self.transform, self.radius * np.array([u, v]))
+        return _ellipseExtent(centres, semiAxes)
+
     def geant4Solid(self, reg, aabb=None):
         exp = self.transform.netExpansion()
         return g4.solid.Tubs(
@@ -675,6 +901,11 @@ class REC(BodyMixin):
         )
         return self.transform.leftMultiplyRotation(rotation)
 
+    def analyticExtent(self):
+        centres = _transformPoints(self.transform, [self.face, self.face + self.direction])
+        semiAxes = _transformVectors(self.transform, [self.semiminor, self.semimajor])
+        return _ellipseExtent(centres, semiAxes)
+
     def geant4Solid(self, reg, aabb=None):
         exp = self.transform.netExpansion()
         return g4.solid.EllipticalTube(
@@ -786,6 +1017,21 @@ class TRC(BodyMixin):
         rotation = trans.matrix_from([0, 0, 1], self.direction)
         return self.transform.leftMultiplyRotation(rotation)
 
+    def analyticExtent(self):
+        u, v = _perpendicularVectors(self.direction)
+        faces = [
+            (self.major_centre, self.major_radius),
+            (self.major_centre + self.direction, self.minor_radius),
+        ]
+        extents = [
+            _ellipseExtent(
+                _transformPoints(self.transform, centre),
+                _transformVectors(self.transform, radius * np.array([u, v])),
+            )
+            for centre, radius in faces
+        ]
+        return _mergeExtents(extents)
+
     def geant4Solid(self, registry, aabb=None):
         # The first face of g4.Cons is located at -z, and the
         # second at +z.  Here choose to put the major face at -z.
@@ -910,6 +1156,14 @@ class ELL(BodyMixin):
             - self._linearEccentricity() ** 2
         )
 
+    def analyticExtent(self):
+        focus1, focus2 = _transformPoints(self.transform, [self.focus1, self.focus2])
+        semimajor = 0.5 * self.transform.netExpansion() * self.length
+        axis = (focus1 - focus2) / np.linalg.norm(focus1 - focus2)
+        u, v = _perpendicularVectors(axis)
+        semiAxes = [semimajor * axis, self._semiminor() * u, self._semiminor() * v]
+        return _ellipseExtent(0.5 * (focus1 + focus2), semiAxes)
+
     def geant4Solid(self, greg, aabb=None):
         semiminor = self._semiminor()
         expansion = self.transform.netExpansion()
@@ -1028,6 +1282,12 @@ class _WED_RAW(BodyMixin):
         )
         return self.transform.leftMultiplyRotation(rotation)
 
+    def analyticExtent(self):
+        vertex = np.array(self.vertex)
+        face = [vertex, vertex + self.edge1, vertex + self.edge2]
+        corners = face + [point + self.edge3 for point in face]
+        return _pointsExtent(_transformPoints(self.transform, corners))
+
     def geant4Solid(self, greg, aabb=None):
         exp = self.transform.netExpansion()
         face = [[0, 0], [exp * self.edge1.length(), 0], [0, exp * self.edge2.length()]]
@@ -1231,6 +1491,9 @@ class ARB(BodyMixin):
         z = vertices[..., 2]
         return vector.AABB([min(x), min(y), min(z)], [max(x), max(y), max(z)])
 
+    def analyticExtent(self):
+        return _pointsExtent(_transformPoints(self.transform, self.vertices))
+
     def geant4Solid(self, greg, aabb=None):
         verticesAndPolygons = self._getVerticesAndPolygons()
         return self._toTesselatedSolid(verticesAndPolygons, greg, addRegistry=True)
@@ -1350,6 +1613,7 @@ class ARB(BodyMixin):
             h ^= hash((v[0], v[1], v[2]))
 
         h ^= self.transform.hash()
+        return h
 
 
 class XYP(_HalfSpaceMixin):
@@ -1570,6 +1834,11 @@ class XCC(_InfiniteCylinderMixin, _ShiftableCylinderMixin):
             return initialCentre
         return self._shiftInfiniteCylinderCentre(aabb, [1, 0, 0], initialCentre)
 
+    def analyticExtent(self):
+        return _infiniteCylinderExtent(
+            self.transform, [0, self.y, self.z], [1, 0, 0], self.radius * np.identity(3)[1:]
+        )
+
     def rotation(self):
         return self.transform.leftMultiplyRotation(np.array([[0, 0, -1], [0, 1, 0], [1, 0, 0]]))
 
@@ -1635,6 +1904,11 @@ class YCC(_InfiniteCylinderMixin, _ShiftableCylinderMixin):
             return initialCentre
         return self._shiftInfiniteCylinderCentre(aabb, [0, 1, 0], initialCentre)
 
+    def analyticExtent(self):
+        return _infiniteCylinderExtent(
+            self.transform, [self.x, 0, self.z], [0, 1, 0], self.radius * np.identity(3)[::2]
+        )
+
     def rotation(self):
         return self.transform.leftMultiplyRotation(np.array([[1, 0, 0], [0, 0, 1], [0, -1, 0]]))
 
@@ -1700,6 +1974,11 @@ class ZCC(_InfiniteCylinderMixin, _ShiftableCylinderMixin):
             return self.transform.leftMultiplyVector(initialCentre)
         return self._shiftInfiniteCylinderCentre(aabb, [0, 0, 1], initialCentre)
 
+    def analyticExtent(self):
+        return _infiniteCylinderExtent(
+            self.transform, [self.x, self.y, 0], [0, 0, 1], self.radius * np.identity(3)[:2]
+        )
+
     def rotation(self):
         return self.transform.leftMultiplyRotation(np.identity(3))
 
@@ -1771,6 +2050,10 @@ class XEC(BodyMixin, _ShiftableCylinderMixin):
     def rotation(self):
         return self.transform.leftMultiplyRotation(np.array([[0, 0, -1], [0, 1, 0], [1, 0, 0]]))
 
+    def analyticExtent(self):
+        semiAxes = [[0, self.ysemi, 0], [0, 0, self.zsemi]]
+        return _infiniteCylinderExtent(self.transform, [0, self.y, self.z], [1, 0, 0], semiAxes)
+
     def geant4Solid(self, reg, aabb=None):
         exp = self.transform.netExpansion()
         scale = self._aabbToScaleFactor(aabb)
@@ -1846,6 +2129,10 @@ class YEC(BodyMixin, _ShiftableCylinderMixin):
     def rotation(self):
         return self.transform.leftMultiplyRotation(np.array([[1, 0, 0], [0, 0, 1], [0, -1, 0]]))
 
+    def analyticExtent(self):
+        semiAxes = [[0, 0, self.zsemi], [self.xsemi, 0, 0]]
+        return _infiniteCylinderExtent(self.transform, [self.x, 0, self.z], [0, 1, 0], semiAxes)
+
     def geant4Solid(self, reg, aabb=None):
         exp = self.transform.netExpansion()
         scale = self._aabbToScaleFactor(aabb)
@@ -1921,6 +2208,10 @@ class ZEC(BodyMixin, _ShiftableCylinderMixin):
     def rotation(self):
         return self.transform.leftMultiplyRotation(np.identity(3))
 
+    def analyticExtent(self):
+        semiAxes = [[self.xsemi, 0, 0], [0, self.ysemi, 0]]
+        return _infiniteCylinderExtent(self.transform, [self.x, self.y, 0], [0, 0, 1], semiAxes)
+
     def geant4Solid(self, reg, aabb=None):
         exp = self.transform.netExpansion()
         scale = self._aabbToScaleFactor(aabb)
@@ -2151,6 +2442,24 @@ class QUA(BodyMixin):
 
         return _CSG.fromPolygons(polygons)
 
+    def analyticExtent(self):
+        # only bounded if the quadric is an ellipsoid, i.e. (x-x0)^T A (x-x0) <= k
+        # with A positive definite
+        inv = np.linalg.inv(self.transform.to4DMatrix())
+        quadric = inv.T @ self.coefficientsMatrix() @ inv
+        a, b, c = quadric[:3, :3], quadric[:3, 3], quadric[3, 3]
+        try:
+            np.linalg.cholesky(a)
+        except np.linalg.LinAlgError:
+            return _unboundedExtent()
+        ainv = np.linalg.inv(a)
+        centre = -ainv @ b
+        k = b @ ainv @ b - c
+        if k <= 0:
+            return None
+        half = np.sqrt(k * np.diagonal(ainv))
+        return np.array([centre - half, centre + half])
+
     def geant4Solid(self, reg, aabb=None):
         if aabb is None:
             msg = "QUA must be evaluated with respect to an AABB."
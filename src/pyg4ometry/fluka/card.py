@@ -50,10 +50,16 @@ class Card:
         return delim.join(entries)
 
     def toFixedString(self):
-        # TODO finish fixed string
+        # Keyword and SDUM left aligned, WHATs right aligned, in 10 character columns:
         # *...+....1....+....2....+....3....+....4....+....5....+....6....+....7....+...
         # PHOTONUC      1111.0       0.0       0.0      26.0     147.0       1.0ELECTNUC
-        pass
+        # The title is not a field but the line after the TITLE card.
+        if self.keyword == "TITLE":
+            title = "" if self.sdum is None else str(self.sdum).lstrip("\n")
+            return "TITLE\n" + title
+        whats = "".join(_fixedField(what).rjust(10) for what in self.toList()[1:7])
+        line = _fixedField(self.keyword).ljust(10) + whats + _fixedField(self.sdum).ljust(10)
+        return line.rstrip()
 
     def nonesToZero(self):
         """Return a class instance with same contents as this
@@ -87,6 +93,24 @@ class Card:
         return cls(*columns)
 
 
+def _fixedField(value):
+    # Format a card entry to fit in a FIXED format column of 10 characters.
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        string = str(value)
+        precision = 9
+        while len(string) > 10 and precision > 0:
+            string = f"{value:.{precision}g}".upper()
+            precision -= 1
+    else:
+        string = str(value)
+    if len(string) > 10:
+        msg = f"{string} is too long for a FIXED format field."
+        raise ValueError(msg)
+    return string
+
+
 def _attempt_float_coercion(string):
     try:
         return float(string)
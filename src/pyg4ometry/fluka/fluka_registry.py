@@ -8,6 +8,8 @@ from .. import geant4 as _g4
 from .region import Region as _Region
 from .region import bracket_depth as _bracket_depth
 from .region import bracket_number as _bracket_number
+from .region import regionZoneAABBs as _regionZoneAABBs
+from .region import regionZoneAABBsToRegionAABBs as _regionZoneAABBsToRegionAABBs
 from .directive import RecursiveRotoTranslation as _RecursiveRotoTranslation
 from .directive import RotoTranslation as _RotoTranslation
 from .directive import rotoTranslationFromTra2 as _rotoTranslationFromTra2
@@ -43,6 +45,8 @@ class FlukaRegistry:
     def __init__(self):
         # self.bodyDict = FlukaBodyStore()
         self.bodyDict = FlukaBodyStoreExact()
+        # meshes of the bodies, shared by all zones and regions
+        self.bodyMeshCache = _body.BodyMeshCache()
 
         self.rotoTranslations = RotoTranslationStore()
         self.regionDict = _OrderedDict()
@@ -74,12 +78,17 @@ class FlukaRegistry:
             raise _IdenticalNameError(body.name)
         logger.debug("%s", body)
         self.bodyDict[body.name] = body
+        body._meshCache = self.bodyMeshCache
 
     def makeBody(self, clas, *args, **kwargs):
-        return self.bodyDict.make(clas, *args, **kwargs)
+        body = self.bodyDict.make(clas, *args, **kwargs)
+        body._meshCache = self.bodyMeshCache
+        return body
 
     def getDegenerateBody(self, body):
-        return self.bodyDict.getDegenerateBody(body)
+        body = self.bodyDict.getDegenerateBody(body)
+        body._meshCache = self.bodyMeshCache
+        return body
 
     def addRotoTranslation(self, rototrans):
         self.rotoTranslations.addRotoTranslation(rototrans)
@@ -117,10 +126,18 @@ class FlukaRegistry:
         print(f"latticeDict = {self.latticeDict}")
         print(f"cardDict = {self.cardDict}")
 
-    def regionAABBs(self, write=None):
-        regionAABBs = {}
-        for regionName, region in self.regionDict.items():
-            regionAABBs[regionName] = region.extent()
+    def regionAABBs(self, write=None, nworkers=1):
+        """
+        AABB of each region (None for a null region) from the AABBs of its zones.
+
+        :param write: file name to pickle the AABBs to
+        :type write: str
+        :param nworkers: number of worker processes to mesh the zones with
+        :type nworkers: int
+        """
+        regionAABBs = _regionZoneAABBsToRegionAABBs(
+            _regionZoneAABBs(list(self.regionDict.values()), nworkers=nworkers)
+        )
 
         if write:
             import pickle
@@ -130,11 +147,15 @@ class FlukaRegistry:
 
         return regionAABBs
 
-    def latticeAABBs(self):
-        latticeCellAABBs = {}
-        for cellName, lattice in self.latticeDict.items():
-            latticeCellAABBs[cellName] = lattice.cellRegion.extent()
-        return latticeCellAABBs
+    def latticeAABBs(self, nworkers=1):
+        """
+        AABB of the cell region of each lattice.
+
+        :param nworkers: number of worker processes to mesh the zones with
+        :type nworkers: int
+        """
+        cellRegions = [lattice.cellRegion for lattice in self.latticeDict.values()]
+        return _regionZoneAABBsToRegionAABBs(_regionZoneAABBs(cellRegions, nworkers=nworkers))
 
     def addMaterial(self, material, recursive=False):
         name = material.name
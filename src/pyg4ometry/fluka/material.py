@@ -223,7 +223,7 @@ class Material(_MatProp):
         return material
 
     def flukaFreeString(self, delim=", "):
-        result = "".join(c.toFreeString(delim=delim) for c in self.toCards())
+        result = "\n".join(c.toFreeString(delim=delim) for c in self.toCards())
         if self.comment:
             result = f"* {self.comment}\n{result}"
         return result
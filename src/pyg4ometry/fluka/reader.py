@@ -1,6 +1,7 @@
 from collections import OrderedDict
 from copy import deepcopy
 from operator import mul, add
+import re
 import sys
 from warnings import warn
 
@@ -188,6 +189,17 @@ class Reader:
         regions_block = self._lines[self.regionsbegin : self.regionsend]
         regions_block = "\n".join(regions_block)  # turn back into 1 big string
 
+        try:
+            regions = RegionExpressionParser(self.flukaregistry).parse(regions_block)
+        except RegionSyntaxError:
+            # The ANTLR parser is much slower but reports where the error is.
+            self._parseRegionsANTLR(regions_block)
+            return
+
+        for region in regions:
+            self.flukaregistry.addRegion(region)
+
+    def _parseRegionsANTLR(self, regions_block):
         # Create ANTLR4 char stream from processed regions_block string
         istream = antlr4.InputStream(regions_block)
         # tokenize
@@ -778,6 +790,166 @@ class RegionVisitor(RegionParserVisitor):
         return [("+", body)]  # implicit intersection
 
 
+class RegionSyntaxError(Exception):
+    pass
+
+
+# tokens of the region definitions as in RegionLexer.g4, the names are
+# region names if they start a line and body names otherwise.
+_REGION_TOKEN = re.compile(
+    r"[ \t]*(?:(?P<name>[A-Za-z][A-Za-z0-9_]+)|(?P<integer>-?[0-9]+)|(?P<operator>[-+|()]))"
+)
+_REGION_TRAILING = re.compile(r"[ \t]*(?:!.*)?\Z")
+
+
+def _tokenizeRegions(regions_block):
+    tokens = []
+    for line in regions_block.split("\n"):
+        if line.startswith(("*", "#")):  # comments and preprocessor directives
+            continue
+        line = line.rstrip("\r")
+        pos = 0
+        while not _REGION_TRAILING.match(line, pos):
+            match = _REGION_TOKEN.match(line, pos)
+            if match is None:
+                msg = f"Unexpected character in region definition: {line}"
+                raise RegionSyntaxError(msg)
+            kind = match.lastgroup
+            if kind == "name" and match.start(kind) == 0:
+                kind = "region"
+            elif kind == "operator":
+                kind = match.group(kind)
+            tokens.append((kind, match.group(match.lastgroup)))
+            pos = match.end()
+    return tokens
+
+
+class RegionExpressionParser:
+    """
+    Hand-written recursive descent parser for the region definitions
+    of a FLUKA input, following RegionParser.g4.  It builds the same
+    Region and Zone instances (with the same zone and subzone names)
+    as the ANTLR RegionParser and RegionVisitor but is much faster.  A
+    RegionSyntaxError is raised for any input that does not follow the
+    grammar, for which the ANTLR parser can be used to report the error.
+
+    :param flukaregistry: FlukaRegistry with the bodies the regions are made of.
+    :type flukaregistry: FlukaRegistry
+    """
+
+    def __init__(self, flukaregistry):
+        self.flukaregistry = flukaregistry
+        self._bodies = {}
+        self._tokens = []
+        self._pos = 0
+        self._region_name = None
+        self._subzone_counter = 0
+
+    def parse(self, regions_block):
+        """
+        Parse the regions block of an input and return the list of
+        Region instances (which are not added to the registry).
+        """
+        self._tokens = _tokenizeRegions(regions_block)
+        self._pos = 0
+        regions = []
+        while self._pos < len(self._tokens):
+            regions.append(self._region())
+        if not regions:
+            msg = "No regions defined."
+            raise RegionSyntaxError(msg)
+        return regions
+
+    def _peek(self):
+        if self._pos < len(self._tokens):
+            return self._tokens[self._pos][0]
+        return None
+
+    def _accept(self, kind):
+        if self._peek() == kind:
+            self._pos += 1
+            return self._tokens[self._pos - 1][1]
+        return None
+
+    def _expect(self, kind):
+        text = self._accept(kind)
+        if text is None:
+            msg = f"Expected {kind} in region {self._region_name}, got {self._peek()}."
+            raise RegionSyntaxError(msg)
+        return text
+
+    def _body(self, name):
+        try:
+            return self._bodies[name]
+        except KeyError:
+            body = self._bodies[name] = self.flukaregistry.bodyDict[name]
+            return body
+
+    def _region(self):
+        self._region_name = self._expect("region")
+        self._expect("integer")
+        self._subzone_counter = 0
+
+        isUnion = self._accept("|") is not None
+        zones = [self._zone()]
+        while self._accept("|") is not None:
+            isUnion = True
+            zones.append(self._zone())
+
+        region = Region(self._region_name)
+        for i, booleans in enumerate(zones):
+            name = f"{self._region_name}_zone{i}" if isUnion else f"{self._region_name}_zone"
+            region.addZone(self._addBooleans(Zone(name=name), booleans))
+        return region
+
+    @staticmethod
+    def _addBooleans(zone, booleans):
+        for operator, body in booleans:
+            if operator == "+":
+                zone.addIntersection(body)
+            else:
+                zone.addSubtraction(body)
+        return zone
+
+    def _zone(self):
+        booleans = []
+        name = self._accept("name")
+        if name is not None:
+            booleans.append(("+", self._body(name)))  # implicit intersection
+        booleans.extend(self._expr())
+        if not booleans:
+            msg = f"Empty zone in region {self._region_name}."
+            raise RegionSyntaxError(msg)
+        return booleans
+
+    def _expr(self):
+        # sequence of +body, -body, +(subzone) and -(subzone)
+        booleans = []
+        while self._peek() in ("+", "-"):
+            operator = self._tokens[self._pos][0]
+            self._pos += 1
+            if self._accept("(") is not None:
+                booleans.append((operator, self._subZone()))
+            else:
+                booleans.append((operator, self._body(self._expect("name"))))
+        return booleans
+
+    def _subZone(self):
+        self._subzone_counter += 1
+        name = self._accept("name")
+        booleans = self._expr()
+        if not booleans:
+            msg = f"Empty subzone in region {self._region_name}."
+            raise RegionSyntaxError(msg)
+        self._expect(")")
+
+        # named after the inner subzones are counted, as in RegionVisitor.visitSubZone
+        zone = Zone(name=f"{self._region_name}_subzone{self._subzone_counter}")
+        if name is not None:
+            zone.addIntersection(self._body(name))
+        return self._addBooleans(zone, booleans)
+
+
 class SensitiveErrorListener(ErrorListener.ErrorListener):
     """
     ANTLR4 by default is very passive regarding parsing errors, it will
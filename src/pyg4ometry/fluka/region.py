@@ -1,4 +1,3 @@
-import itertools
 import logging
 from copy import deepcopy
 from uuid import uuid4
@@ -16,14 +15,14 @@ from .body import BodyMixin
 from .vector import Three, AABB, areAABBsOverlapping
 from . import boolean_algebra
 from ..transformation import tbxyz2axisangle
+from ..meshutils import MeshBoolean, MeshUnion, SweepAndPrune
 from .. import config as _config
+from ..utils import forkMap as _forkMap
 
 if _config.meshing == _config.meshingType.pycsg:
     from ..pycsg.core import CSG, do_intersect
 elif _config.meshing == _config.meshingType.cgal_sm:
-    pass
-    # TODO reinstate intersecting meshes
-    # from pyg4ometry.pycgal.core import CSG, do_intersect, intersecting_meshes
+    from ..pycgal.core import CSG, do_intersect
 
 from textwrap import wrap as _wrap
 
@@ -243,15 +242,44 @@ class Zone(vis.ViewableMixin):
             print(self.dumpsDebug())
             return None
 
-        result = self.intersections[0].body.mesh(aabb=aabb)
-        for boolean in self.intersections[1:] + self.subtractions:
-            mesh = boolean.body.mesh(aabb=aabb)
-            # TODOprint(boolean.body)
-            if isinstance(boolean, Intersection):
-                result = result.intersect(mesh)
-            elif isinstance(boolean, Subtraction):
-                result = result.subtract(mesh)
-        return result
+        # subtractions are unioned and subtracted once (see meshutils.MeshBoolean)
+        return MeshBoolean(
+            [boolean.body.mesh(aabb=aabb) for boolean in self.intersections],
+            [boolean.body.mesh(aabb=aabb) for boolean in self.subtractions],
+        )
+
+    def analyticExtent(self):
+        """
+        Axis-aligned extent [[xmin, ymin, zmin], [xmax, ymax, zmax]] of this zone
+        from the analytic extents of its bodies, without meshing.  This is the
+        overlap of the extents of the intersected bodies and subtractions are
+        ignored, so the zone is contained in but may be smaller than this extent.
+        Unbounded directions are given as -inf/inf.  Returns None if the zone is
+        empty.
+        """
+        extent = np.array([[-np.inf] * 3, [np.inf] * 3])
+        for boolean in self.intersections:
+            bodyExtent = boolean.body.analyticExtent()
+            if bodyExtent is None:
+                return None
+            extent[0] = np.maximum(extent[0], bodyExtent[0])
+            extent[1] = np.minimum(extent[1], bodyExtent[1])
+        if (extent[0] >= extent[1]).any():
+            return None
+        return extent
+
+    def _isAxisAlignedBox(self):
+        # analyticExtent is exact for intersections of boxes and half spaces
+        return not self.subtractions and all(
+            boolean.body._isAxisAlignedBox() for boolean in self.intersections
+        )
+
+    def _isAnalyticExtentExact(self):
+        if self.subtractions:
+            return False
+        if len(self.intersections) == 1 and not isinstance(self.intersections[0].body, Zone):
+            return True
+        return self._isAxisAlignedBox()
 
     def geant4Solid(self, reg, aabb=None):
         """
@@ -622,11 +650,19 @@ class Region(vis.ViewableMixin):
         return bodies
 
     def mesh(self, aabb=None):
-        result = self.zones[0].mesh(aabb=aabb)
-        for zone in self.zones[1:]:
-            mesh = zone.mesh(aabb=aabb)
-            result = result.union(mesh)
-        return result
+        return MeshUnion([zone.mesh(aabb=aabb) for zone in self.zones])
+
+    def analyticExtent(self):
+        """
+        Axis-aligned extent of this region from the analytic extents of its
+        zones (see Zone.analyticExtent), without meshing.  Returns None if every
+        zone is empty.
+        """
+        extents = [zone.analyticExtent() for zone in self.zones]
+        extents = np.array([e for e in extents if e is not None])
+        if len(extents) == 0:
+            return None
+        return np.array([extents[:, 0].min(axis=0), extents[:, 1].max(axis=0)])
 
     def geant4Solid(self, reg, aabb=None):
         """
@@ -659,11 +695,7 @@ class Region(vis.ViewableMixin):
 
         fsLines = _wrap(fs, modLen)
 
-        fsNew = fsLines[0] + "\n"
-        for l in fsLines[1:]:
-            fsNew = fsNew + barPos * " " + l + "\n"
-
-        fs = fsNew
+        fs = "".join([fsLines[0] + "\n"] + [barPos * " " + l + "\n" for l in fsLines[1:]])
         if self.comment:
             fs = f"* {self.comment}\n{fs}"
         return fs
@@ -689,18 +721,27 @@ class Region(vis.ViewableMixin):
             zone.allBodiesToRegistry(registry)
 
     def zoneGraph(self, zoneAABBs=None, aabb=None):
-        if _config.meshing == _config.meshingType.cgal_sm:
-            return self._zoneGraphPycgal()
-
+        """
+        Graph with a node per zone (by index) and edges between touching or
+        overlapping zones, such that its connected components are the connected
+        parts of this region.  Candidate pairs of zones are found by a sweep and
+        prune over the zone AABBs and their meshes are only intersected if the
+        two zones are not already known to be connected, so a path rather than
+        an edge may join two overlapping zones.
+
+        :param zoneAABBs: optional list of the AABBs of the zones (see zoneAABBs)
+        :type zoneAABBs: list of AABB
+        :param aabb: AABB (or dict of body name to AABB) to truncate infinite bodies with
+        :type aabb: AABB or dict
+        """
         zones = self.zones
         n_zones = len(zones)
 
-        tried = []
         # Build undirected graph, and add nodes corresponding to each zone.
         graph = nx.Graph()
         graph.add_nodes_from(range(n_zones))
         if n_zones == 1:  # return here if there's only one zone.
-            return nx.connected_components(graph)
+            return graph
 
         # We allow the user to provide a list of zoneAABBs as an
         # optimisation, but if they have not been provided, then we
@@ -708,51 +749,43 @@ class Region(vis.ViewableMixin):
         if zoneAABBs is None:
             zoneAABBs = self.zoneAABBs(aabb=aabb)
 
-        # Loop over all combinations of zone numbers within this region
-        for i, j in itertools.product(range(n_zones), range(n_zones)):
-            # Trivially connected to self or tried this combination.
-            if i == j or {i, j} in tried:
-                continue
-            tried.append({i, j})
+        # Broad phase: only pairs of (non-null) zones with overlapping or touching AABBs.
+        indices = [i for i in range(n_zones) if zoneAABBs[i] is not None]
+        extents = [[list(zoneAABBs[i].lower), list(zoneAABBs[i].upper)] for i in indices]
+        candidatePairs = [(indices[i], indices[j]) for i, j in SweepAndPrune(extents)]
 
-            # Check if the bounding boxes overlap.  Cheaper than intersecting.
-            if not areAABBsOverlapping(zoneAABBs[i], zoneAABBs[j]):
-                continue
+        connected = nx.utils.UnionFind(range(n_zones))
+        meshes = {}
 
-            # Check if a path already exists.  Not sure how often this
-            # arises but should at least occasionally save some time.
-            if nx.has_path(graph, i, j):
-                graph.add_edge(i, j)
+        def zoneMesh(i):
+            if i not in meshes:
+                meshes[i] = zones[i].mesh(aabb=aabb)
+            return meshes[i]
+
+        for i, j in candidatePairs:
+            # Already connected through other zones so no need to intersect.
+            if connected[i] == connected[j]:
                 continue
 
             # Finally: we must do the intersection op.
             logger.debug("Region = %s, int zone %d with %d", self.name, i, j)
-            if do_intersect(zones[i].mesh(aabb=aabb), zones[j].mesh(aabb=aabb)):
+            if do_intersect(zoneMesh(i), zoneMesh(j)):
                 graph.add_edge(i, j)
+                connected.union(i, j)
 
         return graph
 
-    def _zoneGraphPycgal(self):
-        meshes = [z.mesh() for z in self.zones]
-        intersections = intersecting_meshes(meshes)
-        graph = nx.Graph()
-        graph.add_nodes_from(range(len(self.zones)))
-        graph.add_edges_from(intersections)
-        return graph
-
     def connectedZones(self, zoneAABBs=None, aabb=None):
         return list(nx.connected_components(self.zoneGraph(zoneAABBs=zoneAABBs, aabb=aabb)))
 
-    def zoneAABBs(self, aabb=None):
-        extents = []
-        for zone in self.zones:
-            try:
-                zoneExtent = AABB.fromMesh(zone.mesh(aabb=aabb))
-            except ValueError:
-                zoneExtent = None
-            extents.append(zoneExtent)
+    def zoneAABBs(self, aabb=None, nworkers=1):
+        """
+        AABBs of the zones of this region (None for a null zone).
 
-        return extents
+        :param nworkers: number of worker processes to mesh the zones with
+        :type nworkers: int
+        """
+        return regionZoneAABBs([self], aabb=aabb, nworkers=nworkers)[self.name]
 
     def aabb(self, aabb=None):
         return AABB.fromMesh(self.mesh(aabb=aabb))
@@ -823,6 +856,99 @@ class Region(vis.ViewableMixin):
             del self.zones[index]
 
 
+def _analyticZoneAABB(zone, aabb):
+    """
+    AABB of a zone from the analytic extents of its bodies. Returns (True, AABB) if
+    the analytic extent is exact, (True, None) if the zone is empty and (False, None)
+    if the zone has to be meshed.
+    """
+    extent = zone.analyticExtent()
+    if extent is None:
+        return True, None
+    # without an aabb infinite bodies are meshed out to INFINITY, so only finite
+    # extents are used, and only where the extent is that of the zone itself
+    if aabb is None and np.isfinite(extent).all() and zone._isAnalyticExtentExact():
+        return True, AABB(extent[0], extent[1])
+    return False, None
+
+
+def _meshedZoneAABB(zone, aabb):
+    try:
+        return AABB.fromMesh(zone.mesh(aabb=aabb))
+    except ValueError:
+        return None
+
+
+def _runZoneAABBJob(job):
+    """
+    Mesh a zone (zone, aabb) in a worker process and return its extent as lists so it can be
+    pickled.
+    """
+    zoneAABB = _meshedZoneAABB(*job)
+    if zoneAABB is None:
+        return None
+    return list(zoneAABB.lower), list(zoneAABB.upper)
+
+
+def regionZoneAABBs(regions, aabb=None, nworkers=1):
+    """
+    AABBs of the zones of each region, as a dict of region name to a list of AABBs
+    (None for a null zone). With nworkers > 1 the zones are meshed by a pool of worker
+    processes. The result is the same as a serial evaluation.
+
+    :param regions: regions to evaluate
+    :type regions: list of Region
+    :param aabb: AABB (or dict of body name to AABB) to truncate infinite bodies with
+    :type aabb: AABB or dict
+    :param nworkers: number of worker processes
+    :type nworkers: int
+    """
+    zones = [zone for region in regions for zone in region.zones]
+
+    # zones with an exact (or empty) analytic extent are not meshed
+    zoneAABBs = [None] * len(zones)
+    jobs = []
+    iMeshed = []
+    for iZone, zone in enumerate(zones):
+        isAnalytic, zoneAABBs[iZone] = _analyticZoneAABB(zone, aabb)
+        if not isAnalytic:
+            jobs.append((zone, aabb))
+            iMeshed.append(iZone)
+
+    results = _forkMap(_runZoneAABBJob, jobs, nworkers, "regionZoneAABBs")
+    meshedAABBs = [AABB(*r) if r is not None else None for r in results]
+    for iZone, zoneAABB in zip(iMeshed, meshedAABBs):
+        zoneAABBs[iZone] = zoneAABB
+
+    result = {}
+    iJob = 0
+    for region in regions:
+        result[region.name] = zoneAABBs[iJob : iJob + len(region.zones)]
+        iJob += len(region.zones)
+    return result
+
+
+def regionZoneAABBsToRegionAABBs(regionZoneAABBs):
+    """
+    AABB of each region from the AABBs of its zones (as returned by regionZoneAABBs),
+    None for a region whose zones are all null.
+
+    :param regionZoneAABBs: dict of region name to a list of zone AABBs (or None)
+    :type regionZoneAABBs: dict
+    """
+    regionAABBs = {}
+    for name, zoneAABBs in regionZoneAABBs.items():
+        zoneAABBs = [a for a in zoneAABBs if a is not None]
+        if not zoneAABBs:
+            regionAABBs[name] = None
+            continue
+        regionAABBs[name] = AABB(
+            np.min([a.lower for a in zoneAABBs], axis=0),
+            np.max([a.upper for a in zoneAABBs], axis=0),
+        )
+    return regionAABBs
+
+
 def _get_relative_rot_matrix(first, second):
     return first.rotation().T.dot(second.rotation())
 
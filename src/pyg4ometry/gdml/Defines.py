@@ -1,3 +1,4 @@
+import functools as _functools
 import numbers as _numbers
 import numpy as _np
 import re as _re
@@ -7,10 +8,57 @@ from . import Units as _Units
 _log = _log.getLogger(__name__)
 
 
+_num_re = r"-?[0-9]+(?:\.[0-9]+)?(?:e-?[0-9]{1,2})?"
+_num_w_unit_re = "(" + _num_re + r")(?:\*([a-zA-Z]+))?$"
+
+_expressionParser = None
+
+
+def _getExpressionParser():
+    global _expressionParser
+    if _expressionParser is None:
+        from .GdmlExpression import ExpressionParser
+
+        _expressionParser = ExpressionParser()
+    return _expressionParser
+
+
+@_functools.lru_cache(maxsize=100000)
+def _compileExpression(expressionString):
+    """
+    Parse an expression string once and return a function of the define dictionary
+    that evaluates it. The function only depends on the string, so it is shared by all
+    expressions (and registries) with the same string. Defines are looked up when the
+    function is called, so changes to their values are always picked up.
+    """
+    # short-cut for expressions only having a numeric part.
+    if _re.match(_num_re + "$", expressionString):
+        value = float(expressionString)
+        return lambda defines: value
+
+    # short-cut for expressions only having a numeric part and a unit.
+    match_w_unit = _re.match(_num_w_unit_re, expressionString)
+    if match_w_unit:
+        unit = _Units.unit(match_w_unit.group(2))
+        if unit is not None:
+            value = float(match_w_unit.group(1)) * unit
+            return lambda defines: value
+
+    expressionParser = _getExpressionParser()
+    return expressionParser.compile(expressionParser.parse(expressionString))
+
+
+@_functools.lru_cache(maxsize=100000)
+def _expressionVariables(expressionString):
+    expressionParser = _getExpressionParser()
+    return tuple(expressionParser.get_variables(expressionParser.parse(expressionString)))
+
+
 class BasicExpression:
     """
-    Holds an expression as a string and can use the expression parser
-    in the supplied registry to evaluate it. A registry is required.
+    Holds an expression as a string and evaluates it with the defines of the
+    supplied registry. Each distinct expression string is only parsed once. A
+    registry is required.
 
     :param name: Name of the expression object
     :type name: str
@@ -32,28 +80,11 @@ class BasicExpression:
         self.registry = registry
 
     def eval(self):
-        # short-cut for expressions only having a numeric part.
-        num_re = r"-?[0-9]+(?:\.[0-9]+)?(?:e-?[0-9]{1,2})?"
-        if _re.match(num_re + "$", self.expressionString):
-            return float(self.expressionString)
-
-        # short-cut for expressions only having a numeric part and a unit.
-        num_w_unit_re = "(" + num_re + r")(?:\*([a-zA-Z]+))?$"
-        match_w_unit = _re.match(num_w_unit_re, self.expressionString)
-        if match_w_unit:
-            unit = _Units.unit(match_w_unit.group(2))
-            if unit is not None:
-                return float(match_w_unit.group(1)) * unit
-
-        expressionParser = self.registry.getExpressionParser()
-        self.parseTree = expressionParser.parse(self.expressionString)
-        value = expressionParser.evaluate(self.parseTree, self.registry.defineDict)
-        return value
+        function = _compileExpression(self.expressionString)
+        return function(self.registry.defineDict if self.registry is not None else {})
 
     def variables(self, allDependents=False):
-        expressionParser = self.registry.getExpressionParser()
-        self.parseTree = expressionParser.parse(self.expressionString)
-        variables = expressionParser.get_variables(self.parseTree)
+        variables = list(_expressionVariables(self.expressionString))
         if allDependents:
             dependents = []
             for v in variables:
@@ -167,9 +167,150 @@ class GdmlExpressionEvalVisitor(GdmlExpressionVisitor):
                 return getattr(math, constant().getText())
 
 
+class GdmlExpressionCompileVisitor(GdmlExpressionEvalVisitor):
+    """
+    Lowers a parse tree to a Python function of the define dictionary, so an expression
+    only has to be parsed once. Evaluating the function gives the same result as
+    GdmlExpressionEvalVisitor visiting the parse tree.
+    """
+
+    def visitVariable(self, ctx):
+        name = ctx.VARIABLE().getText()
+
+        def variable(defines):
+            try:
+                value = defines[name]
+            except KeyError:
+                try:
+                    value = _units[name]
+                except KeyError as err:
+                    msg = f"<= Undefined variable : {name}"
+                    if not err.args:
+                        err.args = ("",)
+                    err.args = (*err.args, msg)
+                    raise
+
+            return value
+
+        return variable
+
+    def visitScientific(self, ctx):
+        value = super().visitScientific(ctx)
+        return lambda defines: value
+
+    def visitConstant(self, ctx):
+        value = super().visitConstant(ctx)
+        return lambda defines: value
+
+    def visitMultiplyingExpression(self, ctx):
+        first = self.visit(ctx.powExpression(0))
+        rest = [
+            (bool(ctx.operatorMulDiv(i).TIMES()), self.visit(ctx.powExpression(i + 1)))
+            for i in range(len(ctx.operatorMulDiv()))
+        ]
+
+        def multiplyingExpression(defines):
+            left = float(first(defines))
+            for times, right in rest:
+                if times:
+                    left *= float(right(defines))
+                else:
+                    left /= float(right(defines))
+            return left
+
+        return multiplyingExpression
+
+    def visitExpression(self, ctx):
+        first = self.visit(ctx.multiplyingExpression(0))
+        rest = [
+            (bool(ctx.operatorAddSub(i).PLUS()), self.visit(ctx.multiplyingExpression(i + 1)))
+            for i in range(len(ctx.operatorAddSub()))
+        ]
+
+        def expression(defines):
+            left = float(first(defines))
+            for plus, right in rest:
+                if plus:
+                    left += float(right(defines))
+                else:
+                    left -= float(right(defines))
+            return left
+
+        return expression
+
+    def visitPowExpression(self, ctx):
+        first = self.visit(ctx.signedAtom(0))
+        rest = [self.visit(ctx.signedAtom(i + 1)) for i in range(len(ctx.POW()))]
+
+        def powExpression(defines):
+            base = float(first(defines))
+            for power in rest:
+                base = base ** float(power(defines))
+            return base
+
+        return powExpression
+
+    def visitMatrixElement(self, ctx):
+        matrix = self.visit(ctx.variable())
+        indices = [self.visit(ctx.expression(i)) for i in range(len(ctx.COMMA()) + 1)]
+
+        def matrixElement(defines):
+            # decrement indices to match python 0-indexing
+            index = tuple(int(i(defines)) - 1 for i in indices)
+            return matrix(defines).values_asarray[index]
+
+        return matrixElement
+
+    def visitSignedAtom(self, ctx):
+        sign = -1 if ctx.MINUS() else 1
+        if ctx.func():
+            value = self.visit(ctx.func())
+        elif ctx.atom():
+            value = self.visit(ctx.atom())
+        elif ctx.signedAtom():
+            value = self.visit(ctx.signedAtom())
+        else:
+            value = lambda defines: 0
+
+        return lambda defines: sign * float(value(defines))
+
+    def visitAtom(self, ctx):
+        if ctx.constant():
+            value = self.visit(ctx.constant())
+        elif ctx.variable():
+            value = self.visit(ctx.variable())
+        elif ctx.expression():  # This handles expr with and without parens
+            value = self.visit(ctx.expression())
+        elif ctx.scientific():
+            value = self.visit(ctx.scientific())
+        elif ctx.matrixElement():
+            value = self.visit(ctx.matrixElement())
+        else:
+            msg = "Invalid atom."
+            raise SystemExit(msg)  ##DEBUG####
+
+        return lambda defines: float(value(defines))
+
+    def visitFunc(self, ctx):
+        function_name = str(self.visit(ctx.funcname()))
+        if hasattr(builtins, function_name):
+            function = getattr(builtins, function_name)
+        elif hasattr(math, function_name):
+            function = getattr(math, function_name)
+        elif hasattr(numpy, function_name):
+            function = getattr(numpy, function_name)
+        else:
+            msg = f"Function {function_name} not found in 'builtins', 'numpy' or 'math'"
+            raise ValueError(msg)
+
+        arguments = [self.visit(expr) for expr in ctx.expression()]
+        return lambda defines: function(*[a(defines) for a in arguments])
+
+
 class ExpressionParser:
     def __init__(self):
         self.visitor = GdmlExpressionEvalVisitor()
+        self.compiler = GdmlExpressionCompileVisitor()
         self.defines_dict = {}
 
     def parse(self, expression):
@@ -193,6 +334,12 @@ class ExpressionParser:
 
         return result
 
+    def compile(self, parse_tree):
+        """
+        Return a function that evaluates the parse tree for a given define dictionary.
+        """
+        return self.compiler.visit(parse_tree)
+
     def get_variables(self, parse_tree):
         variables = []
         if hasattr(parse_tree, "children"):
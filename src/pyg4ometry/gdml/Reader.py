@@ -1,6 +1,7 @@
 from collections import defaultdict as _defaultdict
 import re as _re
 from xml.dom import minidom as _minidom
+import xml.etree.ElementTree as _ElementTree
 import xml.parsers.expat as _expat
 from . import Defines as _defines
 import logging as _log
@@ -16,6 +17,134 @@ def isComment(node):
     return not node.attributes
 
 
+def _preparedLines(data, entities):
+    """
+    Strip the lines of a GDML file ready for parsing, i.e. remove whitespace outside
+    tags, and render out ENTITY includes (entities is a dict of name : filename).
+    """
+    for l in data:
+        l = l.strip()
+        # Render out entities in those lines
+        if l.startswith("&"):
+            name = _re.search(r"&([\s\S]+)\;", l).group(1)
+            with open(entities[name]) as content_file:
+                yield from _preparedLines(content_file, {})
+            continue
+
+        if l.endswith(">"):
+            end = ""
+        else:
+            end = " "
+        if len(l) != 0:
+            yield l + end
+
+
+def _iterparse(lines, chunkSize=1 << 20):
+    """
+    Generate the (event, element) pairs of start and end events of a document
+    given as an iterable of strings, feeding the parser in chunks.
+    """
+    parser = _ElementTree.XMLPullParser(events=("start", "end"))
+    chunk = []
+    size = 0
+    for l in lines:
+        chunk.append(l)
+        size += len(l)
+        if size > chunkSize:
+            parser.feed("".join(chunk))
+            chunk = []
+            size = 0
+            yield from parser.read_events()
+    parser.feed("".join(chunk))
+    parser.close()
+    yield from parser.read_events()
+
+
+class _XmlAttribute:
+    """
+    Attribute with a value, as in a minidom NamedNodeMap.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _XmlAttributes:
+    """
+    minidom NamedNodeMap like view of the attributes of an ElementTree element.
+    """
+
+    def __init__(self, attrib):
+        self._attrib = attrib
+
+    def __getitem__(self, key):
+        return _XmlAttribute(self._attrib[key])
+
+    def __contains__(self, key):
+        return key in self._attrib
+
+    def __len__(self):
+        return len(self._attrib)
+
+    def get(self, key, default=None):
+        if key in self._attrib:
+            return _XmlAttribute(self._attrib[key])
+        return default
+
+    def keys(self):
+        return list(self._attrib.keys())
+
+    def values(self):
+        return [_XmlAttribute(v) for v in self._attrib.values()]
+
+
+class _XmlText:
+    """
+    minidom like text node.
+    """
+
+    ELEMENT_NODE = _minidom.Node.ELEMENT_NODE
+    TEXT_NODE = _minidom.Node.TEXT_NODE
+    nodeType = _minidom.Node.TEXT_NODE
+    attributes = None
+    childNodes = []
+
+    def __init__(self, text):
+        self.nodeValue = text
+        self.data = text
+
+
+class _XmlElement:
+    """
+    minidom like element node wrapping an ElementTree element, so the same parse
+    functions can be used for both the DOM and the streaming reader.
+    """
+
+    ELEMENT_NODE = _minidom.Node.ELEMENT_NODE
+    TEXT_NODE = _minidom.Node.TEXT_NODE
+    nodeType = _minidom.Node.ELEMENT_NODE
+
+    def __init__(self, element):
+        self._element = element
+
+    @property
+    def tagName(self):
+        return self._element.tag
+
+    @property
+    def attributes(self):
+        return _XmlAttributes(self._element.attrib)
+
+    @property
+    def childNodes(self):
+        nodes = [_XmlText(self._element.text)] if self._element.text else []
+        nodes.extend(_XmlElement(e) for e in self._element)
+        return nodes
+
+    def getElementsByTagName(self, name):
+        return [_XmlElement(e) for e in self._element.iter(name) if e is not self._element]
+
+
 class Reader:
     """
     Read a GDML file.
@@ -28,12 +157,21 @@ class Reader:
     :type reduceNISTMaterialsToPredefined: bool
     :param makeAllVisible: loaded volumes with aux info to make them invisible will be ignored and made visible
     :type makeAllVisible: bool
+    :param streaming: parse the file incrementally instead of building a full DOM (lower memory)
+    :type streaming: bool
 
     When loading a GDML file that was exported by Geant4, the NIST materials may be
     fully expanded to include their full element / isotope composition. With the
     reduceNISTMaterialsToPredefined flag set to True, these will be ignored and the
     materials that have a name that matches a NIST one will be 'reduced' back to a
     predefined material by name only.
+
+    With the streaming flag set to True, the file is read with a pull parser and each
+    define, material, solid and volume is processed (and its XML freed) as soon as it
+    has been read. This is intended for very large files, e.g. exported from CAD. The
+    sections must then appear in the usual order (define, materials, solids, structure,
+    setup) as anything referenced must already have been read. The xmldefines,
+    xmlsolids etc. attributes of the reader are not set in this mode.
     """
 
     def __init__(
@@ -43,6 +181,7 @@ class Reader:
         skipMaterials=False,
         reduceNISTMaterialsToPredefined=False,
         makeAllVisible=False,
+        streaming=False,
     ):
         super().__init__()
         self.filename = fileName
@@ -51,6 +190,7 @@ class Reader:
         self._makeAllVisible = makeAllVisible
         self._forcedVisibleOptions = _VisOptions(alpha=0.1)
         self._skipMaterials = skipMaterials
+        self._streaming = streaming
 
         if self.registryOn:
             self._registry = _g4.Registry()
@@ -69,11 +209,12 @@ class Reader:
 
         # Render out the ENTITY includes
         # Only look at the starting block - no need to iterate over the whole file
-        start_block = ""
+        start_block = []
         for line in data:
             if line.startswith("<gdml"):
                 break
-            start_block += line
+            start_block.append(line)
+        start_block = "".join(start_block)
         data.seek(0)  # Reset the file iterator
 
         # Extract the information from entities and store in a dict
@@ -90,36 +231,17 @@ class Reader:
                 name = en.split()[1]
                 filename = _re.search(r"[^\"]+", " ".join(en.split()[3:])).group(0)
                 filename = _os.path.dirname(self.filename) + "/" + filename
+                entities[name] = filename
 
-                with open(filename) as content_file:
-                    # ensure the contents are properly prepared for parsing
-                    contents = ""
-                    for l in content_file:
-                        l = l.strip()
-                        if l.endswith(">"):
-                            end = ""
-                        else:
-                            end = " "
-                        if len(l) != 0:
-                            contents += l + end
-                entities[name] = (filename, contents)
+        lines = _preparedLines(data, entities)
 
-        # remove all newline charecters and whitespaces outside tags
-        fs = ""
-        for l in data:
-            l = l.strip()
-            # Render out entities in those lines
-            if l.startswith("&"):
-                name = _re.search(r"&([\s\S]+)\;", l).group(1)
-                fs += entities[name][1]
-                continue
+        if self._streaming:
+            self._loadStreaming(lines)
+            data.close()
+            return
 
-            if l.endswith(">"):
-                end = ""
-            else:
-                end = " "
-            if len(l) != 0:
-                fs += l + end
+        # remove all newline charecters and whitespaces outside tags
+        fs = "".join(lines)
 
         # parse xml
         _log.debug("Reader.load> minidom parse")
@@ -146,6 +268,57 @@ class Reader:
 
         data.close()
 
+    def _loadStreaming(self, lines):
+        """
+        Parse the (prepared) lines of a GDML file with a pull parser. Each child of the
+        define, materials, solids, structure and userinfo sections is processed as soon
+        as it is complete and then freed, so the whole document is never held in memory.
+        The materials are made at the end of the materials section as in parseMaterials.
+        """
+        _log.debug("Reader.load> streaming parse")
+        materials = []
+        elements = []
+        isotopes = []
+        materialSubstitutionNames = None
+
+        stack = []
+        try:
+            for event, element in _iterparse(lines):
+                if event == "start":
+                    stack.append(element)
+                    continue
+                stack.pop()
+
+                if len(stack) == 2:
+                    # complete child of a section
+                    section = stack[1].tag
+                    node = _XmlElement(element)
+                    if section == "define":
+                        self._parseDefine(node)
+                    elif section == "materials":
+                        if not self._skipMaterials:
+                            self._parseMaterial(node, materials, elements, isotopes)
+                    elif section == "solids":
+                        self._parseSolid(node)
+                    elif section == "structure":
+                        self.extractStructureNodeData(node, materialSubstitutionNames)
+                    elif section == "userinfo":
+                        self._parseAuxiliary(node)
+                    if section != "setup":
+                        stack[1].remove(element)
+                elif len(stack) == 1:
+                    # complete section
+                    if element.tag == "materials" and not self._skipMaterials:
+                        materialSubstitutionNames = self._makeMaterials(
+                            materials, elements, isotopes
+                        )
+                    elif element.tag == "setup":
+                        self._parseSetup(_XmlElement(element))
+                    stack[0].remove(element)
+        except _ElementTree.ParseError as pe:
+            _log.error("Reader.load> %s", pe)
+            raise pe
+
     def getRegistry(self):
         return self._registry
 
@@ -158,73 +331,76 @@ class Reader:
             return
 
         for df in self.xmldefines.childNodes:
-            try:
-                define_type = df.tagName
-            except AttributeError:
-                # comment so continue
-                continue
+            self._parseDefine(df)
 
-            name = df.attributes["name"].value
-            attrs = df.attributes
+    def _parseDefine(self, df):
+        try:
+            define_type = df.tagName
+        except AttributeError:
+            # comment so return
+            return
 
-            keys = attrs.keys()
-            vals = [attr.value for attr in attrs.values()]
-            def_attrs = dict(zip(keys, vals))
+        name = df.attributes["name"].value
+        attrs = df.attributes
 
-            # parse positions and rotations
-            def getXYZ(def_attrs):
-                x = def_attrs.get("x", "0.0")
-                y = def_attrs.get("y", "0.0")
-                z = def_attrs.get("z", "0.0")
-                u = def_attrs.get("unit", None)
-                return (x, y, z, u)
+        keys = attrs.keys()
+        vals = [attr.value for attr in attrs.values()]
+        def_attrs = dict(zip(keys, vals))
 
-            # parse matrices
-            def getMatrix(def_attrs):
-                try:
-                    coldim = def_attrs["coldim"]
-                except KeyError:
-                    coldim = 0
-                values = def_attrs["values"].split()
-                return (coldim, values)
-
-            if define_type == "constant":
-                value = def_attrs["value"]
-                _defines.Constant(name, value, self._registry, True)
-            elif define_type == "quantity":
-                value = def_attrs["value"]
-                try:
-                    unit = def_attrs["unit"]
-                except KeyError:
-                    unit = None
-                try:
-                    qtype = def_attrs["type"]
-                except KeyError:
-                    qtype = None
-                _defines.Quantity(name, value, unit, qtype, self._registry, True)
-            elif define_type == "variable":
-                value = def_attrs["value"]
-                _defines.Variable(name, value, self._registry, True)
-            elif define_type == "expression":
-                value = df.childNodes[0].nodeValue
-                _defines.Expression(name, value, self._registry, True)
-            elif define_type == "position":
-                (x, y, z, u) = getXYZ(def_attrs)
-                unit = u if u else "mm"
-                _defines.Position(name, x, y, z, unit, self._registry, True)
-            elif define_type == "rotation":
-                (x, y, z, u) = getXYZ(def_attrs)
-                unit = u if u else "rad"
-                _defines.Rotation(name, x, y, z, unit, self._registry, True)
-            elif define_type == "scale":
-                (x, y, z, u) = getXYZ(def_attrs)
-                unit = u if u else "none"
-                _defines.Scale(name, x, y, z, unit, self._registry, True)
-            elif define_type == "matrix":
-                (coldim, values) = getMatrix(def_attrs)
-                _defines.Matrix(name, coldim, values, self._registry, True)
-            else:
-                _log.warning("unrecognised define: %s", define_type)
+        # parse positions and rotations
+        def getXYZ(def_attrs):
+            x = def_attrs.get("x", "0.0")
+            y = def_attrs.get("y", "0.0")
+            z = def_attrs.get("z", "0.0")
+            u = def_attrs.get("unit", None)
+            return (x, y, z, u)
+
+        # parse matrices
+        def getMatrix(def_attrs):
+            try:
+                coldim = def_attrs["coldim"]
+            except KeyError:
+                coldim = 0
+            values = def_attrs["values"].split()
+            return (coldim, values)
+
+        if define_type == "constant":
+            value = def_attrs["value"]
+            _defines.Constant(name, value, self._registry, True)
+        elif define_type == "quantity":
+            value = def_attrs["value"]
+            try:
+                unit = def_attrs["unit"]
+            except KeyError:
+                unit = None
+            try:
+                qtype = def_attrs["type"]
+            except KeyError:
+                qtype = None
+            _defines.Quantity(name, value, unit, qtype, self._registry, True)
+        elif define_type == "variable":
+            value = def_attrs["value"]
+            _defines.Variable(name, value, self._registry, True)
+        elif define_type == "expression":
+            value = df.childNodes[0].nodeValue
+            _defines.Expression(name, value, self._registry, True)
+        elif define_type == "position":
+            (x, y, z, u) = getXYZ(def_attrs)
+            unit = u if u else "mm"
+            _defines.Position(name, x, y, z, unit, self._registry, True)
+        elif define_type == "rotation":
+            (x, y, z, u) = getXYZ(def_attrs)
+            unit = u if u else "rad"
+            _defines.Rotation(name, x, y, z, unit, self._registry, True)
+        elif define_type == "scale":
+            (x, y, z, u) = getXYZ(def_attrs)
+            unit = u if u else "none"
+            _defines.Scale(name, x, y, z, unit, self._registry, True)
+        elif define_type == "matrix":
+            (coldim, values) = getMatrix(def_attrs)
+            _defines.Matrix(name, coldim, values, self._registry, True)
+        else:
+            _log.warning("unrecognised define: %s", define_type)
 
     def parseVector(self, node, type="position", addRegistry=True):
         try:
@@ -275,118 +451,119 @@ class Reader:
         self.materialdef = xmldoc.getElementsByTagName("materials")[0]
 
         for node in self.materialdef.childNodes:
-            if node.nodeType != node.ELEMENT_NODE:
-                # probably a comment node, skip
-                continue
+            self._parseMaterial(node, materials, elements, isotopes)
 
-            mat_type = node.tagName
+        materialSubstitutionNames = self._makeMaterials(materials, elements, isotopes)
+        return materialSubstitutionNames
 
-            name = node.attributes["name"].value
-            attrs = node.attributes
+    def _parseMaterial(self, node, materials, elements, isotopes):
+        if node.nodeType != node.ELEMENT_NODE:
+            # probably a comment node, skip
+            return
 
-            keys = attrs.keys()
-            vals = [attr.value for attr in attrs.values()]
-            def_attrs = dict(zip(keys, vals))
+        mat_type = node.tagName
 
-            if mat_type == "isotope":
-                for chNode in node.childNodes:
-                    if chNode.nodeType != chNode.ELEMENT_NODE:
-                        continue  # comment
+        name = node.attributes["name"].value
+        attrs = node.attributes
 
-                    if chNode.tagName == "atom":
-                        def_attrs["a"] = chNode.attributes["value"].value
+        keys = attrs.keys()
+        vals = [attr.value for attr in attrs.values()]
+        def_attrs = dict(zip(keys, vals))
 
-                isotopes.append(def_attrs)
+        if mat_type == "isotope":
+            for chNode in node.childNodes:
+                if chNode.nodeType != chNode.ELEMENT_NODE:
+                    continue  # comment
 
-            elif mat_type == "element":
-                components = []
-                for chNode in node.childNodes:
-                    if chNode.nodeType != chNode.ELEMENT_NODE:
-                        continue  # comment
+                if chNode.tagName == "atom":
+                    def_attrs["a"] = chNode.attributes["value"].value
 
-                    if chNode.tagName == "atom":
-                        def_attrs["a"] = chNode.attributes["value"].value
+            isotopes.append(def_attrs)
 
-                    elif chNode.tagName == "fraction":
-                        keys = chNode.attributes.keys()
-                        vals = [attr.value for attr in chNode.attributes.values()]
-                        comp = dict(zip(keys, vals))
-                        comp["comp_type"] = "fraction"
-                        components.append(comp)
+        elif mat_type == "element":
+            components = []
+            for chNode in node.childNodes:
+                if chNode.nodeType != chNode.ELEMENT_NODE:
+                    continue  # comment
 
-                def_attrs["components"] = components
-                elements.append(def_attrs)
+                if chNode.tagName == "atom":
+                    def_attrs["a"] = chNode.attributes["value"].value
 
-            elif mat_type == "material":
-                components = []
-                properties = {}
+                elif chNode.tagName == "fraction":
+                    keys = chNode.attributes.keys()
+                    vals = [attr.value for attr in chNode.attributes.values()]
+                    comp = dict(zip(keys, vals))
+                    comp["comp_type"] = "fraction"
+                    components.append(comp)
 
-                try:
-                    state = node.attributes["state"].value
-                except:
-                    state = None
-                for chNode in node.childNodes:
-                    if chNode.nodeType != chNode.ELEMENT_NODE:
-                        continue  # comment
-
-                    if chNode.tagName == "D":
-                        def_attrs["density"] = chNode.attributes["value"].value
-
-                    elif chNode.tagName == "T":
-                        def_attrs["temperature"] = chNode.attributes["value"].value
-                        try:
-                            def_attrs["temperature_unit"] = chNode.attributes["unit"].value
-                        except KeyError:
-                            def_attrs["temperature_unit"] = "K"
+            def_attrs["components"] = components
+            elements.append(def_attrs)
 
-                    elif chNode.tagName == "P":
-                        def_attrs["pressure"] = chNode.attributes["value"].value
-                        try:
-                            def_attrs["pressure_unit"] = chNode.attributes["unit"].value
-                        except KeyError:
-                            def_attrs["pressure_unit"] = "pascal"
-
-                    elif chNode.tagName == "atom":
-                        def_attrs["a"] = chNode.attributes["value"].value
-
-                    elif chNode.tagName == "composite":
-                        keys = chNode.attributes.keys()
-                        vals = [attr.value for attr in chNode.attributes.values()]
-                        comp = dict(zip(keys, vals))
-                        comp["comp_type"] = "composite"
-                        components.append(comp)
-
-                    elif chNode.tagName == "fraction":
-                        keys = chNode.attributes.keys()
-                        vals = [attr.value for attr in chNode.attributes.values()]
-                        comp = dict(zip(keys, vals))
-                        comp["comp_type"] = "fraction"
-                        components.append(comp)
-
-                    elif chNode.tagName == "property":
-                        try:
-                            properties[chNode.attributes["name"].value] = chNode.attributes[
-                                "value"
-                            ].value
-                        except KeyError:
-                            pass
+        elif mat_type == "material":
+            components = []
+            properties = {}
 
-                        try:
-                            properties[chNode.attributes["name"].value] = chNode.attributes[
-                                "ref"
-                            ].value
-                        except KeyError:
-                            pass
+            try:
+                state = node.attributes["state"].value
+            except:
+                state = None
+            for chNode in node.childNodes:
+                if chNode.nodeType != chNode.ELEMENT_NODE:
+                    continue  # comment
 
-                def_attrs["components"] = components
-                def_attrs["properties"] = properties
-                materials.append(def_attrs)
+                if chNode.tagName == "D":
+                    def_attrs["density"] = chNode.attributes["value"].value
 
-            else:
-                _log.warning("Unrecognised define: %s", mat_type)
+                elif chNode.tagName == "T":
+                    def_attrs["temperature"] = chNode.attributes["value"].value
+                    try:
+                        def_attrs["temperature_unit"] = chNode.attributes["unit"].value
+                    except KeyError:
+                        def_attrs["temperature_unit"] = "K"
 
-        materialSubstitutionNames = self._makeMaterials(materials, elements, isotopes)
-        return materialSubstitutionNames
+                elif chNode.tagName == "P":
+                    def_attrs["pressure"] = chNode.attributes["value"].value
+                    try:
+                        def_attrs["pressure_unit"] = chNode.attributes["unit"].value
+                    except KeyError:
+                        def_attrs["pressure_unit"] = "pascal"
+
+                elif chNode.tagName == "atom":
+                    def_attrs["a"] = chNode.attributes["value"].value
+
+                elif chNode.tagName == "composite":
+                    keys = chNode.attributes.keys()
+                    vals = [attr.value for attr in chNode.attributes.values()]
+                    comp = dict(zip(keys, vals))
+                    comp["comp_type"] = "composite"
+                    components.append(comp)
+
+                elif chNode.tagName == "fraction":
+                    keys = chNode.attributes.keys()
+                    vals = [attr.value for attr in chNode.attributes.values()]
+                    comp = dict(zip(keys, vals))
+                    comp["comp_type"] = "fraction"
+                    components.append(comp)
+
+                elif chNode.tagName == "property":
+                    try:
+                        properties[chNode.attributes["name"].value] = chNode.attributes[
+                            "value"
+                        ].value
+                    except KeyError:
+                        pass
+
+                    try:
+                        properties[chNode.attributes["name"].value] = chNode.attributes["ref"].value
+                    except KeyError:
+                        pass
+
+            def_attrs["components"] = components
+            def_attrs["properties"] = properties
+            materials.append(def_attrs)
+
+        else:
+            _log.warning("Unrecognised define: %s", mat_type)
 
     def _makeMaterials(self, materials, elements, isotopes):
         """
@@ -557,84 +734,87 @@ class Reader:
         self.xmlsolids = xmldoc.getElementsByTagName("solids")[0]
 
         for node in self.xmlsolids.childNodes:
-            try:
-                solid_type = node.tagName
-            except AttributeError:
-                continue  # node is probably a comment so continue
-
-            if solid_type == "box":  # solid test 001
-                self.parseBox(node)
-            elif solid_type == "tube":  # solid test 002
-                self.parseTube(node)
-            elif solid_type == "cutTube":  # solid test 003
-                self.parseCutTube(node)
-            elif solid_type == "cone":  # solid test 004 (problem when rmin1 == rmin2 != 0)
-                self.parseCone(node)
-            elif solid_type == "para":  # solid test 005
-                self.parsePara(node)
-            elif solid_type == "trd":  # solid test 006
-                self.parseTrd(node)
-            elif solid_type == "trap":  # solid test 007
-                self.parseTrap(node)
-            elif solid_type == "sphere":  # solid test 008
-                self.parseSphere(node)
-            elif solid_type == "orb":  # solid test 009
-                self.parseOrb(node)
-            elif solid_type == "torus":  # solid test 010
-                self.parseTorus(node)
-            elif solid_type == "polycone":  # solid test 011
-                self.parsePolycone(node)
-            elif solid_type == "genericPolycone":  # solid test 012
-                self.parseGenericPolycone(node)
-            elif solid_type == "polyhedra":  # solid test 013
-                self.parsePolyhedra(node)
-            elif solid_type == "genericPolyhedra":  # solid test 014
-                self.parseGenericPolyhedra(node)
-            elif solid_type == "eltube":  # solid test 015
-                self.parseEllipticalTube(node)
-            elif solid_type == "ellipsoid":  # solid test 016
-                self.parseEllipsoid(node)
-            elif solid_type == "elcone":  # solid test 017
-                self.parseEllipticalCone(node)
-            elif solid_type == "paraboloid":  # solid test 018
-                self.parseParaboloid(node)
-            elif solid_type == "hype":  # solid test 019
-                self.parseHype(node)
-            elif solid_type == "tet":  # solid test 020
-                self.parseTet(node)
-            elif solid_type == "xtru":  # solid test 021
-                self.parseExtrudedSolid(node)
-            elif solid_type == "twistedbox":  # solid test 022
-                self.parseTwistedBox(node)
-            elif solid_type == "twistedtrap":  # solid test 023
-                self.parseTwistedTrap(node)
-            elif solid_type == "twistedtrd":  # solid test 024
-                self.parseTwistedTrd(node)
-            elif solid_type == "twistedtubs":  # solid test 025
-                self.parseTwistedTubs(node)
-            elif solid_type == "arb8":  # solid test 026
-                self.parseGenericTrap(node)
-            elif solid_type == "tessellated":  # solid test 027
-                self.parseTessellatedSolid(node)
-            elif solid_type == "union":  # solid test 028
-                self.parseUnion(node)
-            elif solid_type == "subtraction":  # solid test 029
-                self.parseSubtraction(node)
-            elif solid_type == "intersection":  # solid test 030
-                self.parseIntersection(node)
-            elif solid_type == "multiUnion":  # solid test 031
-                self.parseMultiUnion(node)
-            elif solid_type == "opticalsurface":
-                self.parseOpticalSurface(node)
-            elif solid_type == "scaledSolid":
-                self.parseScaledSolid(node)
-            elif solid_type == "loop":
-                pass
-                # self.parseSolidLoop(node)
-            else:
-                _log.warning(
-                    "unrecognized solid %s (name=%s)", solid_type, node.attributes["name"].value
-                )
+            self._parseSolid(node)
+
+    def _parseSolid(self, node):
+        try:
+            solid_type = node.tagName
+        except AttributeError:
+            return  # node is probably a comment so return
+
+        if solid_type == "box":  # solid test 001
+            self.parseBox(node)
+        elif solid_type == "tube":  # solid test 002
+            self.parseTube(node)
+        elif solid_type == "cutTube":  # solid test 003
+            self.parseCutTube(node)
+        elif solid_type == "cone":  # solid test 004 (problem when rmin1 == rmin2 != 0)
+            self.parseCone(node)
+        elif solid_type == "para":  # solid test 005
+            self.parsePara(node)
+        elif solid_type == "trd":  # solid test 006
+            self.parseTrd(node)
+        elif solid_type == "trap":  # solid test 007
+            self.parseTrap(node)
+        elif solid_type == "sphere":  # solid test 008
+            self.parseSphere(node)
+        elif solid_type == "orb":  # solid test 009
+            self.parseOrb(node)
+        elif solid_type == "torus":  # solid test 010
+            self.parseTorus(node)
+        elif solid_type == "polycone":  # solid test 011
+            self.parsePolycone(node)
+        elif solid_type == "genericPolycone":  # solid test 012
+            self.parseGenericPolycone(node)
+        elif solid_type == "polyhedra":  # solid test 013
+            self.parsePolyhedra(node)
+        elif solid_type == "genericPolyhedra":  # solid test 014
+            self.parseGenericPolyhedra(node)
+        elif solid_type == "eltube":  # solid test 015
+            self.parseEllipticalTube(node)
+        elif solid_type == "ellipsoid":  # solid test 016
+            self.parseEllipsoid(node)
+        elif solid_type == "elcone":  # solid test 017
+            self.parseEllipticalCone(node)
+        elif solid_type == "paraboloid":  # solid test 018
+            self.parseParaboloid(node)
+        elif solid_type == "hype":  # solid test 019
+            self.parseHype(node)
+        elif solid_type == "tet":  # solid test 020
+            self.parseTet(node)
+        elif solid_type == "xtru":  # solid test 021
+            self.parseExtrudedSolid(node)
+        elif solid_type == "twistedbox":  # solid test 022
+            self.parseTwistedBox(node)
+        elif solid_type == "twistedtrap":  # solid test 023
+            self.parseTwistedTrap(node)
+        elif solid_type == "twistedtrd":  # solid test 024
+            self.parseTwistedTrd(node)
+        elif solid_type == "twistedtubs":  # solid test 025
+            self.parseTwistedTubs(node)
+        elif solid_type == "arb8":  # solid test 026
+            self.parseGenericTrap(node)
+        elif solid_type == "tessellated":  # solid test 027
+            self.parseTessellatedSolid(node)
+        elif solid_type == "union":  # solid test 028
+            self.parseUnion(node)
+        elif solid_type == "subtraction":  # solid test 029
+            self.parseSubtraction(node)
+        elif solid_type == "intersection":  # solid test 030
+            self.parseIntersection(node)
+        elif solid_type == "multiUnion":  # solid test 031
+            self.parseMultiUnion(node)
+        elif solid_type == "opticalsurface":
+            self.parseOpticalSurface(node)
+        elif solid_type == "scaledSolid":
+            self.parseScaledSolid(node)
+        elif solid_type == "loop":
+            pass
+            # self.parseSolidLoop(node)
+        else:
+            _log.warning(
+                "unrecognized solid %s (name=%s)", solid_type, node.attributes["name"].value
+            )
 
     def parseBox(self, node):
         solid_name = node.attributes["name"].value
@@ -1847,7 +2027,10 @@ class Reader:
 
         # find world logical volume
         self.xmlsetup = xmldoc.getElementsByTagName("setup")[0]
-        worldLvName = self.xmlsetup.childNodes[0].attributes["ref"].value
+        self._parseSetup(self.xmlsetup)
+
+    def _parseSetup(self, node):
+        worldLvName = node.childNodes[0].attributes["ref"].value
         self._registry.orderLogicalVolumes(worldLvName)
         self._registry.setWorld(worldLvName)
 
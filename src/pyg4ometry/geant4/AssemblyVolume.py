@@ -311,7 +311,8 @@ class AssemblyVolume:
 
         bm = _Mesh(bs)
 
-        return bm.localmesh
+        # the local mesh may be shared with identical boxes so a copy is returned
+        return bm.localmesh.clone()
 
     def logicalVolume(self, material="G4_Galactic", solidName="worldSolid"):
         """
@@ -1,6 +1,9 @@
 from .. import config as _config
 from ..visualisation import Mesh as _Mesh
 from ..visualisation import OverlapType as _OverlapType
+from ..visualisation.MeshCache import _meshFromVerticesAndPolygons, _meshToArrays
+from ..meshutils import SweepAndPrune as _SweepAndPrune
+from ..utils import forkMap as _forkMap
 from . import solid as _solid
 from . import _Material as _mat
 from .. import transformation as _trans
@@ -8,6 +11,7 @@ from .AssemblyVolume import AssemblyVolume as _AssemblyVolume
 from ..gdml import Constant as _Constant
 from .. import convert as _convert
 
+
 import vtk as _vtk
 from ..visualisation import VisualisationOptions as _VisOptions
 from .. import exceptions as _exceptions
@@ -17,9 +21,13 @@ from collections import defaultdict as _defaultdict
 import numpy as _np
 import logging as _logging
 import copy as _copy
+import threading as _threading
 
 _log = _logging.getLogger(__name__)
 
+# guards building deferred meshes (config.lazyMeshing) so each is only built once
+_meshLock = _threading.RLock()
+
 
 def _solid2tessellated(solid):
     pycsg_mesh = solid.mesh()
@@ -48,6 +56,154 @@ def _solid2tessellated(solid):
     return tesselated_solid
 
 
+def _meshExtent(mesh):
+    """
+    Axis-aligned extent of a mesh as a (2,3) array of [min, max]. Intended for
+    the (8 vertex) bounding meshes so is cheap to evaluate.
+    """
+    vertices = _meshToArrays(mesh)[0]
+    if len(vertices) == 0:
+        # empty mesh - make the extent cover everything so nothing is culled
+        return _np.array([[-_np.inf, -_np.inf, -_np.inf], [_np.inf, _np.inf, _np.inf]])
+    return _np.array([vertices.min(axis=0), vertices.max(axis=0)])
+
+
+def _extentContains(outer, inner):
+    """
+    Is the axis-aligned extent inner entirely within the extent outer.
+    """
+    return bool(_np.all(outer[0] <= inner[0]) and _np.all(inner[1] <= outer[1]))
+
+
+def _findOverlaps(
+    name,
+    transformedMeshes,
+    transformedBoundingMeshes,
+    transformedMeshesNames,
+    motherMesh,
+    motherBoundingMesh,
+    coplanar,
+):
+    """
+    Overlap tests for one logical volume given its daughter meshes (transformed into the
+    logical volume frame) and its own mesh. return [[overlapMesh, OverlapType],...] in the
+    order they are detected.
+    """
+    overlaps = []
+
+    # broad phase - axis-aligned extents of the transformed bounding meshes. Only
+    # pairs whose extents overlap (or touch) are candidates for the mesh tests
+    transformedExtents = [_meshExtent(bm) for bm in transformedBoundingMeshes]
+    candidatePairs = _SweepAndPrune(transformedExtents)
+    motherExtent = _meshExtent(motherBoundingMesh)
+
+    # overlap daughter pv checks
+    for i, j in candidatePairs:
+        _log.debug(
+            f"LogicalVolume.checkOverlaps> daughter-daughter bounding mesh intersection test: {transformedMeshesNames[i]} {transformedMeshesNames[j]}"
+        )
+
+        # first check if bounding mesh intersects
+        cullIntersection = transformedBoundingMeshes[i].intersect(transformedBoundingMeshes[j])
+        if cullIntersection.vertexCount() == 0:
+            continue
+
+        # bounding meshes collide, so check full mesh properly
+        interMesh = transformedMeshes[i].intersect(transformedMeshes[j])
+        _log.debug(
+            f"LogicalVolume.checkOverlaps> full daughter-daughter intersection test: {i} {j} {interMesh.vertexCount()} {interMesh.polygonCount()}"
+        )
+        if interMesh.vertexCount() != 0:
+            _log.error(
+                f"OVERLAP DETECTED> overlap between daughters of {name} {transformedMeshesNames[i]} {transformedMeshesNames[j]} {interMesh.vertexCount()}"
+            )
+            overlaps.append([interMesh, _OverlapType.overlap])
+
+    # coplanar daughter pv checks
+    if coplanar:
+        for i, j in candidatePairs:
+            _log.debug(
+                f"LogicalVolume.checkOverlaps> full coplanar test between daughters {transformedMeshesNames[i]} {transformedMeshesNames[j]}"
+            )
+
+            # first check if bounding mesh intersects
+            cullIntersection = transformedBoundingMeshes[i].intersect(transformedBoundingMeshes[j])
+            cullCoplanar = transformedBoundingMeshes[i].coplanarIntersection(
+                transformedBoundingMeshes[j]
+            )
+            if cullIntersection.vertexCount() == 0 and cullCoplanar.vertexCount() == 0:
+                continue
+
+            coplanarMesh = transformedMeshes[i].coplanarIntersection(transformedMeshes[j])
+            if coplanarMesh.vertexCount() != 0:
+                _log.error(
+                    f"OVERLAP DETECTED> coplanar overlap between daughters {transformedMeshesNames[i]} {transformedMeshesNames[j]} {coplanarMesh.vertexCount()}"
+                )
+                overlaps.append([coplanarMesh, _OverlapType.coplanar])
+
+    # protrusion from mother solid
+    for i in range(len(transformedMeshes)):
+        _log.debug(
+            f"LogicalVolume.checkOverlaps> full daughter-mother intersection test {transformedMeshesNames[i]}"
+        )
+
+        # daughter extent entirely inside the mother extent so cannot protrude
+        # from the bounding mesh
+        if _extentContains(motherExtent, transformedExtents[i]):
+            continue
+
+        cullIntersection = transformedBoundingMeshes[i].subtract(motherBoundingMesh)
+        if cullIntersection.vertexCount() == 0:
+            continue
+
+        interMesh = transformedMeshes[i].subtract(motherMesh)
+        _log.debug(
+            f"LogicalVolume.checkOverlaps> daughter container {i} {interMesh.vertexCount()} {interMesh.polygonCount()}"
+        )
+
+        if interMesh.vertexCount() != 0:
+            _log.error(
+                f"OVERLAP DETECTED> overlap with mother {transformedMeshesNames[i]} {interMesh.vertexCount()}"
+            )
+            overlaps.append([interMesh, _OverlapType.protrusion])
+
+    # coplanar with solid
+    if coplanar:
+        for i in range(len(transformedMeshes)):
+            _log.debug(
+                f"LogicalVolume.checkOverlaps> full daughter-mother coplanar test {transformedMeshesNames[i]}"
+            ),
+
+            # cullCoplanar = motherBoundingMesh.coplanarIntersection(transformedBoundingMeshes[i])
+            # if cullCoplanar.vertexCount() == 0 :
+            #    continue
+            # print(motherBoundingMesh,transformedBoundingMeshes[i])
+            coplanarMesh = motherMesh.coplanarIntersection(
+                transformedMeshes[i]
+            )  # Need mother.coplanar(daughter) as typically mother is larger
+            if coplanarMesh.vertexCount() != 0:
+                _log.error(
+                    f"OVERLAP DETECTED> coplanar overlap between daughter and mother {transformedMeshesNames[i]} {coplanarMesh.vertexCount()}"
+                )
+                overlaps.append([coplanarMesh, _OverlapType.coplanar])
+
+    return overlaps
+
+
+def _runOverlapJob(job):
+    """
+    Run an overlap job (lv, coplanar) in a worker process. The daughter meshes are transformed
+    here and the overlap meshes are returned as vertices and polygons so they can be pickled.
+    """
+    lv, coplanar = job
+    overlaps = _findOverlaps(lv.name, *lv._getOverlapCheckMeshes(), coplanar)
+    result = []
+    for mesh, overlapType in overlaps:
+        vertices, polygons, _ = mesh.toVerticesAndPolygons()
+        result.append((overlapType, vertices, polygons))
+    return result
+
+
 class LogicalVolume:
     """
     LogicalVolume : G4LogicalVolume
@@ -98,6 +254,9 @@ class LogicalVolume:
         self.daughterVolumes = []
         self._daughterVolumesDict = {}
         self.bdsimObjects = []
+        self._meshDeferred = False
+        self._subtractedMesh = None
+        self._subtractedMeshKey = None
         if _config.doMeshing:
             self.reMesh()
         self.auxiliary = []
@@ -120,19 +279,47 @@ class LogicalVolume:
     def reMesh(self, recursive=False):
         """
         Regenerate the visualisation for this logical volume. Required if the geometry is modified
-        and overlap checking is subsequently required or revisualisation.
+        and overlap checking is subsequently required or revisualisation. With config.lazyMeshing
+        the mesh is only marked as out of date and is regenerated on its next access.
         """
+        if _config.lazyMeshing:
+            self._mesh = None
+            self._meshDeferred = True
+        else:
+            self._makeMesh()
+        if recursive:
+            for d in self.daughterVolumes:
+                d.logicalVolume.reMesh(recursive)
+
+    def _makeMesh(self):
         try:
-            self.mesh = _Mesh(self.solid)
-            if recursive:
-                for d in self.daughterVolumes:
-                    d.logicalVolume.reMesh(recursive)
+            self._mesh = _Mesh(self.solid)
         except _exceptions.NullMeshError:
-            self.mesh = None
+            self._mesh = None
             _log.error("geant4.LogicalVolume> meshing error %s", self.name)
         except ValueError:
-            self.mesh = None
+            self._mesh = None
             _log.error(f"geant4.LogicalVolume> meshing error %s", self.name)
+        # only once the mesh is set as the mesh property reads it without the lock
+        self._meshDeferred = False
+
+    @property
+    def mesh(self):
+        """
+        Mesh (visualisation.Mesh) of the solid of this logical volume. With config.lazyMeshing
+        this is built on first access and then kept.
+        """
+        if self._meshDeferred:
+            with _meshLock:
+                # another thread may have built it while waiting for the lock
+                if self._meshDeferred:
+                    self._makeMesh()
+        return self._mesh
+
+    @mesh.setter
+    def mesh(self, mesh):
+        self._meshDeferred = False
+        self._mesh = mesh
 
     def add(self, physicalVolume):
         """
@@ -202,6 +389,93 @@ class LogicalVolume:
         mesh.translate(t)
         return mesh
 
+    def _daughterSubtractedMeshKey(self):
+        # mother mesh and the meshes and evaluated placements of the daughters
+        key = [self.mesh.localmesh]
+        for pv in self.daughterVolumes:
+            if pv.type != "placement" or pv.logicalVolume.type == "assembly":
+                continue
+            if pv.logicalVolume.mesh is None:
+                continue
+            scale = tuple(pv.scale.eval()) if pv.scale else (1, 1, 1)
+            key.append(
+                (
+                    pv.logicalVolume.mesh.localmesh,
+                    pv.logicalVolume.mesh.localboundingmesh,
+                    tuple(pv.rotation.eval()),
+                    tuple(pv.position.eval()),
+                    scale,
+                )
+            )
+        return key
+
+    def daughterSubtractedMesh(self):
+        """
+        Mesh of this logical volume with the meshes of its daughters subtracted (e.g. to view
+        only the material of the mother). The daughters whose bounding boxes overlap that of
+        the mother are united first and then subtracted in one boolean operation. The result is
+        cached until the mesh of the mother, the daughters or their placements change, so it
+        is shared and must be cloned before it is modified. Assembly, replica, division and
+        parameterised daughters are not subtracted.
+        """
+        if self.mesh is None:
+            return None
+
+        key = self._daughterSubtractedMeshKey()
+        if self._subtractedMesh is not None and self._subtractedMeshKey == key:
+            return self._subtractedMesh
+
+        motherExtent = _meshExtent(self.mesh.localboundingmesh)
+
+        daughterMeshes = []
+        for localmesh, boundingmesh, rotation, position, scale in key[1:]:
+            # daughter mesh is scaled, rotated and translated (as placed by the viewers)
+            mtra = _np.linalg.inv(_trans.tbxyz2matrix(rotation)) @ _np.diag(scale)
+            corners = _meshToArrays(boundingmesh)[0] @ mtra.T + position
+            if _np.any(corners.min(axis=0) > motherExtent[1]) or _np.any(
+                corners.max(axis=0) < motherExtent[0]
+            ):
+                continue
+
+            mesh = localmesh.clone()
+            if scale != (1, 1, 1):
+                mesh.scale(list(scale))
+                if scale[0] * scale[1] * scale[2] < 0:
+                    mesh = mesh.inverse()
+            aa = _trans.tbxyz2axisangle(rotation)
+            mesh.rotate(aa[0], _trans.rad2deg(aa[1]))
+            mesh.translate(position)
+            daughterMeshes.append(mesh)
+
+        nDaughters = len(daughterMeshes)
+
+        # balanced union of the daughters
+        while len(daughterMeshes) > 1:
+            daughterMeshes = [
+                (
+                    daughterMeshes[i].union(daughterMeshes[i + 1])
+                    if i + 1 < len(daughterMeshes)
+                    else daughterMeshes[i]
+                )
+                for i in range(0, len(daughterMeshes), 2)
+            ]
+
+        if daughterMeshes:
+            # the boolean changes its inputs so the (shared) mother mesh is cloned
+            self._subtractedMesh = self.mesh.localmesh.clone().subtract(daughterMeshes[0])
+        else:
+            self._subtractedMesh = self.mesh.localmesh
+        self._subtractedMeshKey = key
+
+        _log.debug(
+            "LogicalVolume.daughterSubtractedMesh> %s %d of %d daughters",
+            self.name,
+            nDaughters,
+            len(self.daughterVolumes),
+        )
+
+        return self._subtractedMesh
+
     def cullDaughtersOutsideSolid(self, solid, rotation=None, position=None):
         """
         Given a solid with a placement rotation and position inside this logical
@@ -216,7 +490,7 @@ class LogicalVolume:
         """
         # form temporary mesh of solid in the coordinate frame of this solid
         clipMesh = _Mesh(solid)
-        clipMesh = clipMesh.localmesh
+        clipMesh = clipMesh.localmesh.clone()
         if rotation:
             aa = _trans.tbxyz2axisangle(rotation)
             clipMesh.rotate(aa[0], _trans.rad2deg(aa[1]))
@@ -490,7 +764,7 @@ class LogicalVolume:
 
         # prepare clipping mesh from the newSolid
         clipMesh = _Mesh(newSolid)
-        clipMesh = clipMesh.localmesh
+        clipMesh = clipMesh.localmesh.clone()
         if rotation:
             aa = _trans.tbxyz2axisangle(rotation)
             clipMesh.rotate(aa[0], _trans.rad2deg(aa[1]))
@@ -643,7 +917,8 @@ class LogicalVolume:
         recursive=False,
         coplanar=False,
         printOut=True,
-        nOverlapsDetected=[0],
+        nOverlapsDetected=None,
+        nworkers=1,
     ):
         """
         Check based on the meshes in each logical volume if there are any geometrical overlaps. By
@@ -657,7 +932,24 @@ class LogicalVolume:
         :param coplanar: bool - Whether to check for coplanar overlaps
         :param printOut: bool - (internal) Whether to print out a summary of N overlaps detected
         :param nOverlapsDetected: [int] - (internal) counter for recursion - ignore
+        :param nworkers: int - Number of worker processes to check (recursive) logical volumes with in parallel.
         """
+        if nOverlapsDetected is None:
+            nOverlapsDetected = [0]
+
+        if recursive and nworkers > 1:
+            self._checkOverlapsParallel(coplanar, nworkers, nOverlapsDetected)
+        else:
+            self._checkOverlaps(recursive, coplanar, nOverlapsDetected)
+
+        if printOut:
+            _log.log(
+                _logging.ERROR if nOverlapsDetected[0] > 0 else _logging.INFO,
+                "%d overlaps detected",
+                nOverlapsDetected[0],
+            )
+
+    def _checkOverlaps(self, recursive, coplanar, nOverlapsDetected):
         from ..geant4 import IsAReplica as _IsAReplica
 
         _log.debug("LogicalVolume.checkOverlaps> %s", self.name)
@@ -672,6 +964,75 @@ class LogicalVolume:
             self.overlapChecked = True
             return
 
+        overlaps = _findOverlaps(self.name, *self._getOverlapCheckMeshes(), coplanar)
+        for overlap in overlaps:
+            nOverlapsDetected[0] += 1
+            self.mesh.addOverlapMesh(overlap)
+
+        # recursively check entire tree
+        if recursive:
+            for d in self.daughterVolumes:
+                if type(d.logicalVolume) is _AssemblyVolume:
+                    continue  # no specific overlap check - handled by the PV of an assembly
+                d.logicalVolume._checkOverlaps(recursive, coplanar, nOverlapsDetected)
+
+        # ok this logical has been checked
+        self.overlapChecked = True
+
+    def _checkOverlapsParallel(self, coplanar, nworkers, nOverlapsDetected):
+        """
+        Check overlaps for this logical volume and all of its daughters (recursively) with a
+        pool of worker processes. The logical volumes are collected as in a serial check and
+        each is an independent job, with its daughter meshes transformed in the worker. The
+        overlap meshes are returned and added to each logical volume in the same order as a
+        serial check.
+        """
+        from ..geant4 import IsAReplica as _IsAReplica
+
+        # unique logical volumes in the order of a serial recursive check (_checkOverlaps)
+        lvs = []
+        lvsSeen = set()
+
+        def _collect(lv):
+            if lv.overlapChecked or id(lv) in lvsSeen:
+                return
+            lvsSeen.add(id(lv))
+            lvs.append(lv)
+            if _IsAReplica(lv):
+                return  # only the internal overlaps of a replica are checked
+            for d in lv.daughterVolumes:
+                if type(d.logicalVolume) is _AssemblyVolume:
+                    continue
+                _collect(d.logicalVolume)
+
+        _collect(self)
+
+        jobLVs = []
+        jobs = []
+        for lv in lvs:
+            if _IsAReplica(lv):
+                lv.daughterVolumes[0]._checkInternalOverlaps(nOverlapsDetected)
+                lv.overlapChecked = True
+                continue
+            jobLVs.append(lv)
+            jobs.append((lv, coplanar))
+
+        results = _forkMap(_runOverlapJob, jobs, nworkers, "LogicalVolume.checkOverlaps")
+
+        for lv, overlaps in zip(jobLVs, results):
+            for overlapType, vertices, polygons in overlaps:
+                nOverlapsDetected[0] += 1
+                lv.mesh.addOverlapMesh(
+                    [_meshFromVerticesAndPolygons(vertices, polygons), overlapType]
+                )
+            lv.overlapChecked = True
+
+    def _getOverlapCheckMeshes(self):
+        """
+        Meshes required to check the overlaps of this logical volume. All daughter meshes
+        are transformed into the frame of this logical volume.
+        return [daughterMesh,..],[daughterBoundingMesh,..],[daughterName,..],motherMesh,motherBoundingMesh
+        """
         # local meshes
         transformedMeshes = []
         transformedBoundingMeshes = []
@@ -733,123 +1094,13 @@ class LogicalVolume:
                 transformedBoundingMeshes.append(boundingmesh)
                 transformedMeshesNames.append(name)
 
-        # overlap daughter pv checks
-        for i in range(len(transformedMeshes)):
-            for j in range(i + 1, len(transformedMeshes)):
-                _log.debug(
-                    f"LogicalVolume.checkOverlaps> daughter-daughter bounding mesh intersection test: {transformedMeshesNames[i]} {transformedMeshesNames[j]}"
-                )
-
-                # first check if bounding mesh intersects
-                cullIntersection = transformedBoundingMeshes[i].intersect(
-                    transformedBoundingMeshes[j]
-                )
-                if cullIntersection.vertexCount() == 0:
-                    continue
-
-                # bounding meshes collide, so check full mesh properly
-                interMesh = transformedMeshes[i].intersect(transformedMeshes[j])
-                _log.debug(
-                    f"LogicalVolume.checkOverlaps> full daughter-daughter intersection test: {i} {j} {interMesh.vertexCount()} {interMesh.polygonCount()}"
-                )
-                if interMesh.vertexCount() != 0:
-                    nOverlapsDetected[0] += 1
-                    _log.error(
-                        f"OVERLAP DETECTED> overlap between daughters of {self.name} {transformedMeshesNames[i]} {transformedMeshesNames[j]} {interMesh.vertexCount()}"
-                    )
-                    self.mesh.addOverlapMesh([interMesh, _OverlapType.overlap])
-
-        # coplanar daughter pv checks
-        if coplanar:
-            for i in range(len(transformedMeshes)):
-                for j in range(i + 1, len(transformedMeshes)):
-                    _log.debug(
-                        f"LogicalVolume.checkOverlaps> full coplanar test between daughters {transformedMeshesNames[i]} {transformedMeshesNames[j]}"
-                    )
-
-                    # first check if bounding mesh intersects
-                    cullIntersection = transformedBoundingMeshes[i].intersect(
-                        transformedBoundingMeshes[j]
-                    )
-                    cullCoplanar = transformedBoundingMeshes[i].coplanarIntersection(
-                        transformedBoundingMeshes[j]
-                    )
-                    if cullIntersection.vertexCount() == 0 and cullCoplanar.vertexCount() == 0:
-                        continue
-
-                    coplanarMesh = transformedMeshes[i].coplanarIntersection(transformedMeshes[j])
-                    if coplanarMesh.vertexCount() != 0:
-                        nOverlapsDetected[0] += 1
-                        _log.error(
-                            f"OVERLAP DETECTED> coplanar overlap between daughters {transformedMeshesNames[i]} {transformedMeshesNames[j]} {coplanarMesh.vertexCount()}"
-                        )
-                        self.mesh.addOverlapMesh([coplanarMesh, _OverlapType.coplanar])
-
-        # protrusion from mother solid
-        for i in range(len(transformedMeshes)):
-            _log.debug(
-                f"LogicalVolume.checkOverlaps> full daughter-mother intersection test {transformedMeshesNames[i]}"
-            )
-
-            cullIntersection = transformedBoundingMeshes[i].subtract(self.mesh.localboundingmesh)
-            if cullIntersection.vertexCount() == 0:
-                continue
-
-            interMesh = transformedMeshes[i].subtract(self.mesh.localmesh)
-            _log.debug(
-                f"LogicalVolume.checkOverlaps> daughter container {i} {interMesh.vertexCount()} {interMesh.polygonCount()}"
-            )
-
-            if interMesh.vertexCount() != 0:
-                nOverlapsDetected[0] += 1
-                _log.error(
-                    f"OVERLAP DETECTED> overlap with mother {transformedMeshesNames[i]} {interMesh.vertexCount()}"
-                )
-                self.mesh.addOverlapMesh([interMesh, _OverlapType.protrusion])
-
-        # coplanar with solid
-        if coplanar:
-            for i in range(len(transformedMeshes)):
-                _log.debug(
-                    f"LogicalVolume.checkOverlaps> full daughter-mother coplanar test {transformedMeshesNames[i]}"
-                ),
-
-                # cullCoplanar = self.mesh.localboundingmesh.coplanarIntersection(transformedBoundingMeshes[i])
-                # if cullCoplanar.vertexCount() == 0 :
-                #    continue
-                # print(self.mesh.localboundingmesh,transformedBoundingMeshes[i])
-                coplanarMesh = self.mesh.localmesh.coplanarIntersection(
-                    transformedMeshes[i]
-                )  # Need mother.coplanar(daughter) as typically mother is larger
-                if coplanarMesh.vertexCount() != 0:
-                    nOverlapsDetected[0] += 1
-                    _log.error(
-                        f"OVERLAP DETECTED> coplanar overlap between daughter and mother {transformedMeshesNames[i]} {coplanarMesh.vertexCount()}"
-                    )
-                    self.mesh.addOverlapMesh([coplanarMesh, _OverlapType.coplanar])
-
-        # recursively check entire tree
-        if recursive:
-            for d in self.daughterVolumes:
-                if type(d.logicalVolume) is _AssemblyVolume:
-                    continue  # no specific overlap check - handled by the PV of an assembly
-                # don't make any summary print out for a recursive call
-                d.logicalVolume.checkOverlaps(
-                    recursive=recursive,
-                    coplanar=coplanar,
-                    printOut=False,
-                    nOverlapsDetected=nOverlapsDetected,
-                )
-
-        # ok this logical has been checked
-        self.overlapChecked = True
-
-        if printOut:
-            _log.log(
-                _logging.ERROR if nOverlapsDetected[0] > 0 else _logging.INFO,
-                "%d overlaps detected",
-                nOverlapsDetected[0],
-            )
+        return (
+            transformedMeshes,
+            transformedBoundingMeshes,
+            transformedMeshesNames,
+            self.mesh.localmesh,
+            self.mesh.localboundingmesh,
+        )
 
     def setSolid(self, solid):
         """
@@ -147,4 +147,5 @@ class PhysicalVolume:
 
         bm = _Mesh(bs)
 
-        return bm.localmesh
+        # the local mesh may be shared with identical boxes so a copy is returned
+        return bm.localmesh.clone()
@@ -3,6 +3,7 @@ from . import _Material as _mat
 from . import solid
 
 import logging as _log
+import numpy as _np
 from collections import defaultdict as _defaultdict
 
 
@@ -13,6 +14,42 @@ def solidName(var):
         return var
 
 
+def _referencedDefines(obj):
+    """
+    Names of the defines (and units) referenced by a parameter. The parameter can be
+    a number, an expression string, a BasicExpression, a define or a (nested) list of these.
+    """
+    from ..gdml import Defines as _Defines
+
+    names = set()
+    if isinstance(obj, str):
+        # pure numbers (with an optional unit) cannot reference a define
+        if not _Defines._re.match(_Defines._num_w_unit_re, obj):
+            names.update(_Defines._expressionVariables(obj))
+    elif isinstance(obj, _Defines.BasicExpression):
+        names.update(obj.variables())
+    elif isinstance(obj, (_Defines.ScalarBase, _Defines.VectorBase, _Defines.Matrix)):
+        names.add(obj.name)
+        for expression in _defineExpressions(obj):
+            names.update(_referencedDefines(expression))
+    elif isinstance(obj, (list, tuple, _np.ndarray)):
+        for o in obj:
+            names.update(_referencedDefines(o))
+    return names
+
+
+def _defineExpressions(define):
+    from ..gdml import Defines as _Defines
+
+    if isinstance(define, _Defines.ScalarBase):
+        return [define.expression]
+    elif isinstance(define, _Defines.VectorBase):
+        return [define.x, define.y, define.z]
+    elif isinstance(define, _Defines.Matrix):
+        return list(define.values)
+    return []
+
+
 def removeprefix(string: str, prefix: str, /) -> str:
     if string.startswith(prefix):
         return string[len(prefix) :]
@@ -116,6 +153,138 @@ class Registry:
         if solid.name in self.solidDict:
             self.editedSolids.append(solid.name)
 
+    def defineDependencyGraph(self):
+        """
+        Return a dictionary of each define name to the set of names of the defines
+        whose expressions use it directly.
+        """
+        graph = _defaultdict(set)
+        for name, define in self.defineDict.items():
+            for expression in _defineExpressions(define):
+                for variable in _referencedDefines(expression):
+                    if variable != name:
+                        graph[variable].add(name)
+        return graph
+
+    def defineDependents(self, name):
+        """
+        Return all the objects that depend on the define called name, directly or through
+        other defines or (Boolean) solids.
+
+        :param name: name of define
+        :type name: str
+        :return: defines, solids, logical volumes and physical volumes that depend on the define
+        :rtype: list(str), list(SolidBase), list(LogicalVolume), list(PhysicalVolume)
+        """
+        # defines
+        graph = self.defineDependencyGraph()
+        defines = {name}
+        toVisit = [name]
+        while toVisit:
+            for dependent in graph[toVisit.pop()]:
+                if dependent not in defines:
+                    defines.add(dependent)
+                    toVisit.append(dependent)
+
+        # solids that use the defines and any solids built from them
+        parents = _defaultdict(list)
+        for s in self.solidDict.values():
+            for d in getattr(s, "dependents", []):
+                parents[id(s)].append(d)
+            if s.type == "Scaled":
+                parents[id(s.solid)].append(s)
+        solids = {}
+        toVisit = [
+            s
+            for s in self.solidDict.values()
+            if not defines.isdisjoint(_referencedDefines([getattr(s, v) for v in s.varNames]))
+        ]
+        while toVisit:
+            s = toVisit.pop()
+            if id(s) not in solids:
+                solids[id(s)] = s
+                toVisit.extend(parents[id(s)])
+
+        # logical volumes that use the solids
+        logicalVolumes = [
+            lv for lv in self.logicalVolumeDict.values() if id(getattr(lv, "solid", None)) in solids
+        ]
+
+        # placements, replicas etc. that use the defines or whose volumes changed
+        lvIds = {id(lv) for lv in logicalVolumes}
+        physicalVolumes = []
+        for pv in self.physicalVolumeDict.values():
+            if pv.type == "placement":
+                parameters = [pv.position, pv.rotation, pv.scale]
+            elif pv.type == "replica":
+                parameters = [pv.nreplicas, pv.width, pv.offset]
+            elif pv.type == "division":
+                parameters = [pv.ndivisions, pv.width, pv.offset]
+            elif pv.type == "parametrised":
+                parameters = [pv.transforms] + [list(vars(p).values()) for p in pv.paramData]
+            else:
+                parameters = []
+            if (
+                not defines.isdisjoint(_referencedDefines(parameters))
+                or id(pv.logicalVolume) in lvIds
+                or (pv.type != "placement" and id(pv.motherVolume) in lvIds)
+            ):
+                physicalVolumes.append(pv)
+
+        defines.discard(name)
+        return sorted(defines), list(solids.values()), logicalVolumes, physicalVolumes
+
+    def updateDefine(self, name, value):
+        """
+        Change the value (expression) of a define and update only the geometry that
+        depends on it: the meshes of the affected logical volumes and replica, division
+        or parameterised volumes are regenerated and the overlap checks of the mothers of
+        the affected volumes are reset.
+
+        :param name: name of define
+        :type name: str
+        :param value: new value or expression ([x,y,z] for a position, rotation or scale)
+        :type value: float, str, list
+        :return: defines, solids, logical volumes and physical volumes that were affected
+        :rtype: list(str), list(SolidBase), list(LogicalVolume), list(PhysicalVolume)
+        """
+        from ..gdml import Defines as _Defines
+
+        define = self.defineDict[name]
+        if isinstance(define, _Defines.ScalarBase):
+            define.setExpression(value)
+        elif isinstance(define, _Defines.VectorBase):
+            for expression, v in zip([define.x, define.y, define.z], value):
+                expression.expressionString = _Defines.upgradeToStringExpression(self, v)
+        else:
+            msg = f"updateDefine> cannot update define of type {type(define).__name__}"
+            raise TypeError(msg)
+
+        defines, solids, logicalVolumes, physicalVolumes = self.defineDependents(name)
+
+        for lv in logicalVolumes:
+            lv.reMesh()
+
+        staleMothers = []
+        for pv in physicalVolumes:
+            if pv.type == "replica":
+                pv.meshes, pv.transforms = pv.createReplicaMeshes()
+            elif pv.type == "division":
+                pv.meshes, pv.transforms = pv.createDivisionMeshes()
+            elif pv.type == "parametrised":
+                pv.meshes = pv.createParameterisedMeshes()
+            if pv.motherVolume is not None:
+                staleMothers.append(pv.motherVolume)
+
+        for lv in logicalVolumes + staleMothers:
+            if hasattr(lv, "overlapChecked"):
+                lv.overlapChecked = False
+            # do not build deferred meshes just to reset them
+            if getattr(lv, "_mesh", None) is not None:
+                lv._mesh.overlapmeshes = []
+
+        return defines, solids, logicalVolumes, physicalVolumes
+
     def addMaterial(self, material, dontWarnIfAlreadyAdded=False):
         """
         Register a material with this registry.
@@ -1,18 +1,10 @@
 from ... import config as _config
 
 from .SolidBase import SolidBase as _SolidBase
+from .SolidBase import _meshFromArrays
 
-if _config.meshing == _config.meshingType.pycsg:
-    from ...pycsg.core import CSG as _CSG
-    from ...pycsg.geom import Vector as _Vector
-    from ...pycsg.geom import Vertex as _Vertex
-    from ...pycsg.geom import Polygon as _Polygon
-elif _config.meshing == _config.meshingType.cgal_sm:
-    from ...pycgal.core import CSG as _CSG
+if _config.meshing == _config.meshingType.cgal_sm:
     from ...pycgal.core import PolygonProcessing as _PolygonProcessing
-    from ...pycgal.geom import Vector as _Vector
-    from ...pycgal.geom import Vertex as _Vertex
-    from ...pycgal.geom import Polygon as _Polygon
 
 import logging as _log
 import numpy as _np
@@ -115,76 +107,46 @@ class GenericPolyhedra(_SolidBase):
 
         # plotConvex()
 
-        polygons = []
-
-        for i in range(0, len(pZ), 1):
-            i1 = i
-            i2 = (i + 1) % len(pZ)
-
-            zMin = pZ[i1]
-            zMax = pZ[i2]
-
-            for j in range(0, numSide, 1):
-                j1 = j
-                j2 = j + 1
-
-                phi1 = dPhi * j1 + pSPhi
-                phi2 = dPhi * j2 + pSPhi
-
-                xZMinP1 = pR[i1] * _np.cos(phi1)
-                yZMinP1 = pR[i1] * _np.sin(phi1)
-
-                xZMaxP1 = pR[i2] * _np.cos(phi1)
-                yZMaxP1 = pR[i2] * _np.sin(phi1)
-
-                xZMinP2 = pR[i1] * _np.cos(phi2)
-                yZMinP2 = pR[i1] * _np.sin(phi2)
-
-                xZMaxP2 = pR[i2] * _np.cos(phi2)
-                yZMaxP2 = pR[i2] * _np.sin(phi2)
-
-                vFace = []
-                if pR[i1] != 0:
-                    vFace.append(_Vertex([xZMinP1, yZMinP1, zMin]))
-                vFace.append(_Vertex([xZMaxP1, yZMaxP1, zMax]))
-                if pR[i2] != 0:
-                    vFace.append(_Vertex([xZMaxP2, yZMaxP2, zMax]))
-                vFace.append(_Vertex([xZMinP2, yZMinP2, zMin]))
-
-                vFace.reverse()
-                if pR[i1] == 0 and pR[i2] == 0:
-                    pass
-                else:
-                    polygons.append(_Polygon(vFace))
+        # grid of vertices for each (z,r) point and phi (coincident vertices are merged)
+        phi = dPhi * _np.arange(numSide + 1) + pSPhi
+        r = _np.array(pR)
+        z = _np.array(pZ)
+        nPhi = numSide + 1
+        vertices = _np.stack(
+            [
+                _np.outer(r, _np.cos(phi)).ravel(),
+                _np.outer(r, _np.sin(phi)).ravel(),
+                _np.repeat(z, nPhi),
+            ],
+            axis=1,
+        )
+
+        # side faces between consecutive (z,r) points. Where a radius is 0 the two
+        # vertices on the axis are merged, so these reduce to triangles
+        i1 = _np.arange(len(pZ))
+        i2 = (i1 + 1) % len(pZ)
+        edges = (r[i1] != 0) | (r[i2] != 0)
+        i1 = i1[edges, None] * nPhi
+        i2 = i2[edges, None] * nPhi
+        j = _np.arange(numSide)[None, :]
+        polygons = [_np.stack([i1 + j + 1, i2 + j + 1, i2 + j, i1 + j], axis=-1).reshape(-1, 4)]
 
         if pDPhi != 2 * _np.pi:
             for cvPolygon in zrListConvex:
-                vPhi1 = []
-                for cvPolygonPoint in cvPolygon:
-                    z = cvPolygonPoint[0]
-                    r = cvPolygonPoint[1]
-
-                    xP1 = r * _np.cos(pSPhi)
-                    yP1 = r * _np.sin(pSPhi)
-
-                    vPhi1.append(_Vertex([xP1, yP1, z]))
-
-                vPhi1.reverse()
-                polygons.append(_Polygon(vPhi1))
-
-                vPhi2 = []
-                for cvPolygonPoint in reversed(cvPolygon):
-                    z = cvPolygonPoint[0]
-                    r = cvPolygonPoint[1]
-
-                    xP2 = r * _np.cos(pSPhi + pDPhi)
-                    yP2 = r * _np.sin(pSPhi + pDPhi)
-
-                    vPhi2.append(_Vertex([xP2, yP2, z]))
-
-                vPhi2.reverse()
-                polygons.append(_Polygon(vPhi2))
-
-        mesh = _CSG.fromPolygons(polygons)
+                cvPolygon = _np.asarray(cvPolygon)
+                k = len(cvPolygon)
+                for angle, order in [(pSPhi, slice(None, None, -1)), (pSPhi + pDPhi, slice(None))]:
+                    polygons.append(len(vertices) + _np.arange(k)[order][None, :])
+                    end = _np.stack(
+                        [
+                            cvPolygon[:, 1] * _np.cos(angle),
+                            cvPolygon[:, 1] * _np.sin(angle),
+                            cvPolygon[:, 0],
+                        ],
+                        axis=1,
+                    )
+                    vertices = _np.concatenate([vertices, end])
+
+        mesh = _meshFromArrays(vertices, polygons)
 
         return mesh
@@ -1,6 +1,7 @@
 from .SolidBase import SolidBase as _SolidBase
 from ... import exceptions
 from ...transformation import *
+from ...meshutils import MeshUnion as _MeshUnion
 
 import copy as _copy
 import logging as _log
@@ -53,16 +54,8 @@ class MultiUnion(_SolidBase):
     def mesh(self):
         _log.debug("MultiUnion.pycsgmesh>")
 
-        result = self.objects[0].mesh()
-        tra2 = self.transformations[0]
-        rot = tbxyz2axisangle(tra2[0].eval())
-        tlate = tra2[1].eval()
-        result.rotate(rot[0], -rad2deg(rot[1]))
-        result.translate(tlate)
-
-        for idx, (solid, tra2) in enumerate(
-            zip(self.objects[1:], self.transformations[1:]), start=1
-        ):
+        meshes = []
+        for idx, (solid, tra2) in enumerate(zip(self.objects, self.transformations)):
             # tranformation
             rot = tbxyz2axisangle(tra2[0].eval())
             tlate = tra2[1].eval()
@@ -72,11 +65,11 @@ class MultiUnion(_SolidBase):
             _log.debug(f"union.mesh> mesh {idx}")
             mesh = solid.mesh()
 
-            # apply transform to second mesh
+            # apply transform to mesh
             mesh.rotate(rot[0], -rad2deg(rot[1]))
             mesh.translate(tlate)
+            meshes.append(mesh)
 
-            _log.debug("MultiUnion.mesh> union")
-            result = result.union(mesh)
-
-        return result
+        # balanced tree of unions rather than adding one solid at a time
+        _log.debug("MultiUnion.mesh> union")
+        return _MeshUnion(meshes)
@@ -2,6 +2,35 @@ import numpy as _np
 from ... import config as _config
 
 
+def _meshFromArrays(vertices, polygons):
+    """
+    Construct a mesh of the configured backend from an (N,3) array of vertices and an
+    (M,k) integer array of vertex indices of convex faces (or a list of such arrays for
+    faces with different numbers of vertices). This allows solids to generate their
+    meshes with vectorised numpy operations and hand them to the backend in one go.
+    """
+    if _config.meshing == _config.meshingType.cgal_sm:
+        from ...pycgal.core import CSG as _CSG
+
+        return _CSG.fromArrays(vertices, polygons)
+    else:
+        from ...pycsg.core import CSG as _CSG
+        from ...pycsg.geom import Vector as _Vector
+        from ...pycsg.geom import Vertex as _Vertex
+        from ...pycsg.geom import Polygon as _Polygon
+
+        vertices = _np.asarray(vertices, dtype=_np.float64).reshape(-1, 3).tolist()
+        if not isinstance(polygons, (list, tuple)):
+            polygons = [polygons]
+        return _CSG.fromPolygons(
+            [
+                _Polygon([_Vertex(_Vector(*vertices[i])) for i in face])
+                for faces in polygons
+                for face in _np.asarray(faces, dtype=_np.int64).tolist()
+            ]
+        )
+
+
 class SolidBase:
     """
     Base class for all solids
@@ -1,17 +1,7 @@
 from ... import config as _config
 
 from .SolidBase import SolidBase as _SolidBase
-
-if _config.meshing == _config.meshingType.pycsg:
-    from ...pycsg.core import CSG as _CSG
-    from ...pycsg.geom import Vector as _Vector
-    from ...pycsg.geom import Vertex as _Vertex
-    from ...pycsg.geom import Polygon as _Polygon
-elif _config.meshing == _config.meshingType.cgal_sm:
-    from ...pycgal.core import CSG as _CSG
-    from ...pycgal.geom import Vector as _Vector
-    from ...pycgal.geom import Vertex as _Vertex
-    from ...pycgal.geom import Polygon as _Polygon
+from .SolidBase import _meshFromArrays
 
 import sys as _sys
 from copy import deepcopy as _dc
@@ -19,8 +9,6 @@ from copy import deepcopy as _dc
 import numpy as _np
 import logging as _log
 
-# import resource as _resource
-import time as _time
 
 _log = _log.getLogger(__name__)
 
@@ -119,8 +107,6 @@ class Sphere(_SolidBase):
         0 < theta < pi
         """
 
-        tBefore = _time.process_time()
-
         _log.debug("sphere.antlr>")
         from ...gdml import Units as _Units
 
@@ -136,172 +122,70 @@ class Sphere(_SolidBase):
 
         _log.debug("Sphere.pycsgmesh>")
 
-        polygons = []
-
         # changed from d - s/ st
 
         dPhi = (pDPhi) / self.nslice
         dTheta = (pDTheta) / self.nstack
 
-        for i in range(0, self.nslice, 1):
-            i1 = i
-            i2 = i + 1
-
-            p1 = dPhi * i1 + pSPhi
-            p2 = dPhi * i2 + pSPhi
-
-            for j in range(0, self.nstack, 1):
-                j1 = j
-                j2 = j + 1
-
-                t1 = dTheta * j1 + pSTheta
-                t2 = dTheta * j2 + pSTheta
-
-                if pRmin != 0:
-                    xRMinP1T1 = pRmin * _np.sin(t1) * _np.cos(p1)
-                    yRMinP1T1 = pRmin * _np.sin(t1) * _np.sin(p1)
-                    zRMinP1T1 = pRmin * _np.cos(t1)
-
-                    xRMinP2T1 = pRmin * _np.sin(t1) * _np.cos(p2)
-                    yRMinP2T1 = pRmin * _np.sin(t1) * _np.sin(p2)
-                    zRMinP2T1 = pRmin * _np.cos(t1)
-
-                    xRMinP1T2 = pRmin * _np.sin(t2) * _np.cos(p1)
-                    yRMinP1T2 = pRmin * _np.sin(t2) * _np.sin(p1)
-                    zRMinP1T2 = pRmin * _np.cos(t2)
-
-                    xRMinP2T2 = pRmin * _np.sin(t2) * _np.cos(p2)
-                    yRMinP2T2 = pRmin * _np.sin(t2) * _np.sin(p2)
-                    zRMinP2T2 = pRmin * _np.cos(t2)
-                else:
-                    xRMinP1T1 = 0.0
-                    yRMinP1T1 = 0.0
-                    zRMinP1T1 = 0.0
-
-                    xRMinP2T1 = 0.0
-                    yRMinP2T1 = 0.0
-                    zRMinP2T1 = 0.0
-
-                    xRMinP1T2 = 0.0
-                    yRMinP1T2 = 0.0
-                    zRMinP1T2 = 0.0
-
-                    xRMinP2T2 = 0.0
-                    yRMinP2T2 = 0.0
-                    zRMinP2T2 = 0.0
-
-                xRMaxP1T1 = pRmax * _np.sin(t1) * _np.cos(p1)
-                yRMaxP1T1 = pRmax * _np.sin(t1) * _np.sin(p1)
-                zRMaxP1T1 = pRmax * _np.cos(t1)
-
-                xRMaxP2T1 = pRmax * _np.sin(t1) * _np.cos(p2)
-                yRMaxP2T1 = pRmax * _np.sin(t1) * _np.sin(p2)
-                zRMaxP2T1 = pRmax * _np.cos(t1)
-
-                xRMaxP1T2 = pRmax * _np.sin(t2) * _np.cos(p1)
-                yRMaxP1T2 = pRmax * _np.sin(t2) * _np.sin(p1)
-                zRMaxP1T2 = pRmax * _np.cos(t2)
-
-                xRMaxP2T2 = pRmax * _np.sin(t2) * _np.cos(p2)
-                yRMaxP2T2 = pRmax * _np.sin(t2) * _np.sin(p2)
-                zRMaxP2T2 = pRmax * _np.cos(t2)
-
-                ###########################
-                # Curved sphere faces
-                ###########################
-                if t1 == 0:  # if north pole (triangles)
-                    vCurv = []
-                    vCurv.append(_Vertex([xRMaxP1T1, yRMaxP1T1, zRMaxP1T1]))
-                    vCurv.append(_Vertex([xRMaxP1T2, yRMaxP1T2, zRMaxP1T2]))
-                    vCurv.append(_Vertex([xRMaxP2T2, yRMaxP2T2, zRMaxP2T2]))
-                    # print "outer  north pole",len(polygons)
-                    polygons.append(_Polygon(vCurv))
-                elif t2 == _np.pi:  # if south pole (triangleS)
-                    vCurv = []
-                    vCurv.append(_Vertex([xRMaxP1T1, yRMaxP1T1, zRMaxP1T1]))
-                    vCurv.append(_Vertex([xRMaxP2T2, yRMaxP2T2, zRMaxP2T2]))
-                    vCurv.append(_Vertex([xRMaxP2T1, yRMaxP2T1, zRMaxP2T1]))
-                    # print "outer south pole",len(polygons)
-                    polygons.append(_Polygon(vCurv))
-                else:  # normal curved quad
-                    vCurv = []
-                    vCurv.append(_Vertex([xRMaxP1T1, yRMaxP1T1, zRMaxP1T1]))
-                    vCurv.append(_Vertex([xRMaxP1T2, yRMaxP1T2, zRMaxP1T2]))
-                    vCurv.append(_Vertex([xRMaxP2T2, yRMaxP2T2, zRMaxP2T2]))
-                    vCurv.append(_Vertex([xRMaxP2T1, yRMaxP2T1, zRMaxP2T1]))
-                    # print "outer normal quad",len(polygons)
-                    polygons.append(_Polygon(vCurv))
-
-                if pRmin != 0:
-                    if t1 == 0:  # if north pole (triangles)
-                        vCurv = []
-                        vCurv.append(_Vertex([xRMinP2T2, yRMinP2T2, zRMinP2T2]))
-                        vCurv.append(_Vertex([xRMinP1T2, yRMinP1T2, zRMinP1T2]))
-                        vCurv.append(_Vertex([xRMinP1T1, yRMinP1T1, zRMinP1T1]))
-                        # print "inner north pole", len(polygons)
-                        polygons.append(_Polygon(vCurv))
-                    elif t2 == _np.pi:  # if south pole
-                        vCurv = []
-                        vCurv.append(_Vertex([xRMinP2T1, yRMinP2T1, zRMinP2T1]))
-                        vCurv.append(_Vertex([xRMinP2T2, yRMinP2T2, zRMinP2T2]))
-                        vCurv.append(_Vertex([xRMinP1T1, yRMinP1T1, zRMinP1T1]))
-                        # print "inner south pole", len(polygons)
-                        polygons.append(_Polygon(vCurv))
-                    else:  # normal curved quad
-                        vCurv = []
-                        vCurv.append(_Vertex([xRMinP2T1, yRMinP2T1, zRMinP2T1]))
-                        vCurv.append(_Vertex([xRMinP2T2, yRMinP2T2, zRMinP2T2]))
-                        vCurv.append(_Vertex([xRMinP1T2, yRMinP1T2, zRMinP1T2]))
-                        vCurv.append(_Vertex([xRMinP1T1, yRMinP1T1, zRMinP1T1]))
-                        # print "inner quad ", len(polygons)
-                        polygons.append(_Polygon(vCurv))
-                if pDPhi != 2 * _np.pi:
-                    if i == 0 and pSPhi != 0:
-                        vEnd = []
-                        if pRmin != 0:
-                            vEnd.append(_Vertex([xRMinP1T1, yRMinP1T1, zRMinP1T1]))
-                        vEnd.append(_Vertex([xRMinP1T2, yRMinP1T2, zRMinP1T2]))
-                        vEnd.append(_Vertex([xRMaxP1T2, yRMaxP1T2, zRMaxP1T2]))
-                        vEnd.append(_Vertex([xRMaxP1T1, yRMaxP1T1, zRMaxP1T1]))
-                        # print "theta low end ", len(polygons)
-                        polygons.append(_Polygon(vEnd))
-
-                    if i == self.nslice - 1 and pSPhi + pDPhi != 2 * _np.pi:
-                        vEnd = []
-                        if pRmin != 0:
-                            vEnd.append(_Vertex([xRMinP2T1, yRMinP2T1, zRMinP2T1]))
-                        vEnd.append(_Vertex([xRMaxP2T1, yRMaxP2T1, zRMaxP2T1]))
-                        vEnd.append(_Vertex([xRMaxP2T2, yRMaxP2T2, zRMaxP2T2]))
-                        vEnd.append(_Vertex([xRMinP2T2, yRMinP2T2, zRMinP2T2]))
-                        # print "theta low end ", len(polygons)
-                        polygons.append(_Polygon(vEnd))
-
-                if pDTheta != _np.pi:
-                    if j == 0 and pSTheta != 0:
-                        vEnd = []
-                        if pRmin != 0:
-                            vEnd.append(_Vertex([xRMinP1T1, yRMinP1T1, zRMinP1T1]))
-                        vEnd.append(_Vertex([xRMaxP1T1, yRMaxP1T1, zRMaxP1T1]))
-                        vEnd.append(_Vertex([xRMaxP2T1, yRMaxP2T1, zRMaxP2T1]))
-                        vEnd.append(_Vertex([xRMinP2T1, yRMinP2T1, zRMinP2T1]))
-                        # print "theta low end ", len(polygons)
-                        polygons.append(_Polygon(vEnd))
-
-                    if j == self.nstack - 1 and pSTheta + pDTheta != _np.pi:
-                        vEnd = []
-                        if pRmin != 0:
-                            vEnd.append(_Vertex([xRMinP1T2, yRMinP1T2, zRMinP1T2]))
-                        vEnd.append(_Vertex([xRMinP2T2, yRMinP2T2, zRMinP2T2]))
-                        vEnd.append(_Vertex([xRMaxP2T2, yRMaxP2T2, zRMaxP2T2]))
-                        vEnd.append(_Vertex([xRMaxP1T2, yRMaxP1T2, zRMaxP1T2]))
-                        # print "theta low end ", len(polygons)
-                        polygons.append(_Polygon(vEnd))
-        tAfter = _time.process_time()
-
-        # mBefore = _resource.getrusage(_resource.RUSAGE_SELF).ru_maxrss
-        mesh = _CSG.fromPolygons(polygons)
-        # mAfter = _resource.getrusage(_resource.RUSAGE_SELF).ru_maxrss
-        # _log.debug(
-        #    f"Sphere.pycsgmesh> profile {self.nstack} {self.nslice} {mesh.getNumberPolys()} {mAfter - mBefore} {tAfter - tBefore}"
-        # )
+        # grids of vertices (nslice+1, nstack+1) on the outer and inner surface, coincident
+        # vertices (poles, inner surface for pRmin = 0) are merged
+        phi = dPhi * _np.arange(self.nslice + 1) + pSPhi
+        theta = dTheta * _np.arange(self.nstack + 1) + pSTheta
+        unit = _np.stack(
+            [
+                _np.outer(_np.cos(phi), _np.sin(theta)),
+                _np.outer(_np.sin(phi), _np.sin(theta)),
+                _np.outer(_np.ones(self.nslice + 1), _np.cos(theta)),
+            ],
+            axis=-1,
+        ).reshape(-1, 3)
+        vertices = _np.concatenate([pRmax * unit, pRmin * unit])
+
+        nTheta = self.nstack + 1
+        i = _np.arange(self.nslice)[:, None]
+        j = _np.arange(self.nstack)[None, :]
+        # outer and inner vertex indices of the cell corners (p1/p2, t1/t2)
+        O11 = i * nTheta + j
+        O12 = O11 + 1
+        O21 = O11 + nTheta
+        O22 = O21 + 1
+        I11, I12, I21, I22 = [o + len(unit) for o in [O11, O12, O21, O22]]
+
+        def faces(*corners):
+            return _np.stack(_np.broadcast_arrays(*corners), axis=-1).reshape(-1, len(corners))
+
+        t1 = theta[:-1]
+        t2 = theta[1:]
+        north = t1 == 0
+        south = (t2 == _np.pi) & ~north
+        quad = ~north & ~south
+
+        ###########################
+        # Curved sphere faces
+        ###########################
+        polygons = []
+        polygons.append(faces(O11[:, north], O12[:, north], O22[:, north]))
+        polygons.append(faces(O11[:, south], O22[:, south], O21[:, south]))
+        polygons.append(faces(O11[:, quad], O12[:, quad], O22[:, quad], O21[:, quad]))
+        if pRmin != 0:
+            polygons.append(faces(I22[:, north], I12[:, north], I11[:, north]))
+            polygons.append(faces(I21[:, south], I22[:, south], I11[:, south]))
+            polygons.append(faces(I21[:, quad], I22[:, quad], I12[:, quad], I11[:, quad]))
+
+        # the inner vertex is dropped from the end faces for pRmin = 0
+        first = 0 if pRmin != 0 else 1
+
+        if pDPhi != 2 * _np.pi:
+            if pSPhi != 0:
+                polygons.append(faces(I11[0], I12[0], O12[0], O11[0])[:, first:])
+            if pSPhi + pDPhi != 2 * _np.pi:
+                polygons.append(faces(I21[-1], O21[-1], O22[-1], I22[-1])[:, first:])
+
+        if pDTheta != _np.pi:
+            if pSTheta != 0:
+                polygons.append(faces(I11[:, 0], O11[:, 0], O21[:, 0], I21[:, 0])[:, first:])
+            if pSTheta + pDTheta != _np.pi:
+                polygons.append(faces(I12[:, -1], I22[:, -1], O22[:, -1], O12[:, -1])[:, first:])
+
+        mesh = _meshFromArrays(vertices, polygons)
         return mesh
@@ -119,7 +119,7 @@ class TessellatedSolid(_SolidBase):
         # print(meshtess0)
         # print(meshtess1)
 
-    def mesh(self):
+    def _verticesAndFacets(self):
         #############################################
         # render GDML mesh
         #############################################
@@ -176,6 +176,11 @@ class TessellatedSolid(_SolidBase):
             msg = f"Urecognised mesh type: {self.meshtype}"
             raise ValueError(msg)
 
+        return verts, facet
+
+    def mesh(self):
+        verts, facet = self._verticesAndFacets()
+
         #############################################
         # Convert verts and facets to polygons
         #############################################
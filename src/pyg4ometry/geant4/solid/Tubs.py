@@ -1,17 +1,7 @@
 from ... import config as _config
 
 from .SolidBase import SolidBase as _SolidBase
-
-if _config.meshing == _config.meshingType.pycsg:
-    from ...pycsg.core import CSG as _CSG
-    from ...pycsg.geom import Vector as _Vector
-    from ...pycsg.geom import Vertex as _Vertex
-    from ...pycsg.geom import Polygon as _Polygon
-elif _config.meshing == _config.meshingType.cgal_sm:
-    from ...pycgal.core import CSG as _CSG
-    from ...pycgal.geom import Vector as _Vector
-    from ...pycgal.geom import Vertex as _Vertex
-    from ...pycgal.geom import Polygon as _Polygon
+from .SolidBase import _meshFromArrays
 
 import numpy as _np
 import logging as _log
@@ -102,97 +92,46 @@ class Tubs(_SolidBase):
 
         _log.debug("tubs.pycsgmesh> mesh")
 
-        polygons = []
-
-        dPhi = pDPhi / self.nslice
-
-        for i in range(0, self.nslice, 1):
-            i1 = i
-            i2 = i + 1
-
-            p1 = dPhi * i1 + pSPhi
-            p2 = dPhi * i2 + pSPhi
-
-            xRMinP1 = pRMin * _np.cos(p1)
-            yRMinP1 = pRMin * _np.sin(p1)
-            xRMinP2 = pRMin * _np.cos(p2)
-            yRMinP2 = pRMin * _np.sin(p2)
-
-            xRMaxP1 = pRMax * _np.cos(p1)
-            yRMaxP1 = pRMax * _np.sin(p1)
-            xRMaxP2 = pRMax * _np.cos(p2)
-            yRMaxP2 = pRMax * _np.sin(p2)
-
-            ###########################
-            # wedge ends
-            ###########################
-            if pDPhi != 2 * _np.pi and i == 0:
-                vWedg = []
-                vWedg.append(_Vertex([xRMinP1, yRMinP1, -pDz]))
-                vWedg.append(_Vertex([xRMinP1, yRMinP1, pDz]))
-                vWedg.append(_Vertex([xRMaxP1, yRMaxP1, pDz]))
-                vWedg.append(_Vertex([xRMaxP1, yRMaxP1, -pDz]))
-                vWedg.reverse()
-                polygons.append(_Polygon(vWedg))
-
-            if pDPhi != 2 * _np.pi and i == self.nslice - 1:
-                vWedg = []
-                vWedg.append(_Vertex([xRMinP2, yRMinP2, -pDz]))
-                vWedg.append(_Vertex([xRMaxP2, yRMaxP2, -pDz]))
-                vWedg.append(_Vertex([xRMaxP2, yRMaxP2, pDz]))
-                vWedg.append(_Vertex([xRMinP2, yRMinP2, pDz]))
-                vWedg.reverse()
-                polygons.append(_Polygon(vWedg))
-
-            ###########################
-            # tube ends
-            ###########################
-            if pRMin == 0:
-                vEnd = []
-                vEnd.append(_Vertex([0, 0, -pDz]))
-                vEnd.append(_Vertex([xRMaxP2, yRMaxP2, -pDz]))
-                vEnd.append(_Vertex([xRMaxP1, yRMaxP1, -pDz]))
-                polygons.append(_Polygon(vEnd))
-
-                vEnd = []
-                vEnd.append(_Vertex([0, 0, pDz]))
-                vEnd.append(_Vertex([xRMaxP1, yRMaxP1, pDz]))
-                vEnd.append(_Vertex([xRMaxP2, yRMaxP2, pDz]))
-                polygons.append(_Polygon(vEnd))
-
-            else:
-                vEnd = []
-                vEnd.append(_Vertex([xRMinP1, yRMinP1, -pDz]))
-                vEnd.append(_Vertex([xRMinP2, yRMinP2, -pDz]))
-                vEnd.append(_Vertex([xRMaxP2, yRMaxP2, -pDz]))
-                vEnd.append(_Vertex([xRMaxP1, yRMaxP1, -pDz]))
-                polygons.append(_Polygon(vEnd))
-
-                vEnd = []
-                vEnd.append(_Vertex([xRMinP1, yRMinP1, pDz]))
-                vEnd.append(_Vertex([xRMaxP1, yRMaxP1, pDz]))
-                vEnd.append(_Vertex([xRMaxP2, yRMaxP2, pDz]))
-                vEnd.append(_Vertex([xRMinP2, yRMinP2, pDz]))
-                polygons.append(_Polygon(vEnd))
-
-            ###########################
-            # Curved cylinder faces
-            ###########################
-            vCurv = []
-            vCurv.append(_Vertex([xRMaxP1, yRMaxP1, -pDz]))
-            vCurv.append(_Vertex([xRMaxP2, yRMaxP2, -pDz]))
-            vCurv.append(_Vertex([xRMaxP2, yRMaxP2, pDz]))
-            vCurv.append(_Vertex([xRMaxP1, yRMaxP1, pDz]))
-            polygons.append(_Polygon(vCurv))
-
-            if pRMin != 0:
-                vCurv = []
-                vCurv.append(_Vertex([xRMinP1, yRMinP1, -pDz]))
-                vCurv.append(_Vertex([xRMinP1, yRMinP1, pDz]))
-                vCurv.append(_Vertex([xRMinP2, yRMinP2, pDz]))
-                vCurv.append(_Vertex([xRMinP2, yRMinP2, -pDz]))
-                polygons.append(_Polygon(vCurv))
-
-        mesh = _CSG.fromPolygons(polygons)
+        n = self.nslice
+        phi = pDPhi / n * _np.arange(n + 1) + pSPhi
+        x = _np.cos(phi)
+        y = _np.sin(phi)
+        z = _np.ones(n + 1)
+
+        # rings of vertices: inner -z, inner +z, outer -z, outer +z (coincident vertices,
+        # e.g. the inner rings for pRMin = 0 or the seam of a full tube, are merged)
+        vertices = _np.concatenate(
+            [
+                _np.stack([r * x, r * y, dz * z], axis=1)
+                for r, dz in [(pRMin, -pDz), (pRMin, pDz), (pRMax, -pDz), (pRMax, pDz)]
+            ]
+        )
+        i = _np.arange(n)
+        iMinLo, iMinHi, iMaxLo, iMaxHi = [i + k * (n + 1) for k in range(4)]
+
+        def quads(a, b, c, d):
+            return _np.stack([a, b, c, d], axis=1)
+
+        # curved cylinder faces
+        polygons = [quads(iMaxLo, iMaxLo + 1, iMaxHi + 1, iMaxHi)]
+        if pRMin != 0:
+            polygons.append(quads(iMinLo, iMinHi, iMinHi + 1, iMinLo + 1))
+
+        # tube ends
+        if pRMin == 0:
+            polygons.append(_np.stack([iMinLo, iMaxLo + 1, iMaxLo], axis=1))
+            polygons.append(_np.stack([iMinHi, iMaxHi, iMaxHi + 1], axis=1))
+        else:
+            polygons.append(quads(iMinLo, iMinLo + 1, iMaxLo + 1, iMaxLo))
+            polygons.append(quads(iMinHi, iMaxHi, iMaxHi + 1, iMinHi + 1))
+
+        # wedge ends
+        if pDPhi != 2 * _np.pi:
+            polygons.append(quads(iMaxLo[:1], iMaxHi[:1], iMinHi[:1], iMinLo[:1]))
+            polygons.append(
+                quads(iMinHi[-1:] + 1, iMaxHi[-1:] + 1, iMaxLo[-1:] + 1, iMinLo[-1:] + 1)
+            )
+
+        mesh = _meshFromArrays(vertices, polygons)
 
         return mesh
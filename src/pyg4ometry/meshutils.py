@@ -61,3 +61,104 @@ def MeshShrink(m, shrinkFactor=1e-5):
     m.append(vertnormals)
 
     return vertnormals
+
+
+def MeshExtent(m):
+    """
+    Axis-aligned extent of a mesh as a (2,3) array of [min, max], or None for an empty mesh.
+    """
+    if hasattr(m, "toArrays"):
+        verts = m.toArrays()[0]
+    else:
+        verts = _np.array(m.toVerticesAndPolygons()[0], dtype=float).reshape(-1, 3)
+    if len(verts) == 0:
+        return None
+    return _np.array([verts.min(axis=0), verts.max(axis=0)])
+
+
+def _extentsOverlap(e1, e2):
+    return e1 is not None and e2 is not None and (e1[0] <= e2[1]).all() and (e2[0] <= e1[1]).all()
+
+
+def SweepAndPrune(extents):
+    """
+    Broad phase for overlap checks. Given a list of axis-aligned extents
+    ([min, max] for each object) return a sorted list of index pairs (i,j), i < j,
+    whose extents overlap. Touching extents are considered overlapping so coplanar
+    surfaces are still candidates. The extents are sorted along x and only those
+    still active in the sweep are tested in y and z, so for typical geometry this
+    is much cheaper than testing all n^2 pairs.
+
+    :param extents: list of extents, each [[xmin, ymin, zmin], [xmax, ymax, zmax]]
+    :type extents: list or numpy.ndarray (n,2,3)
+    """
+    if len(extents) < 2:
+        return []
+
+    extents = _np.asarray(extents, dtype=float)
+    order = _np.argsort(extents[:, 0, 0], kind="stable")
+
+    pairs = []
+    active = []
+    for i in order:
+        i = int(i)
+        lower, upper = extents[i]
+        # drop anything that finishes before this one starts in x
+        active = [j for j in active if extents[j, 1, 0] >= lower[0]]
+        for j in active:
+            if _np.all(extents[j, 0, 1:] <= upper[1:]) and _np.all(lower[1:] <= extents[j, 1, 1:]):
+                pairs.append((min(i, j), max(i, j)))
+        active.append(i)
+
+    pairs.sort()
+    return pairs
+
+
+def MeshUnion(meshes):
+    """
+    Union of a list of meshes evaluated as a balanced tree of pairwise unions,
+    so each union operates on meshes of similar size rather than on an ever
+    growing intermediate mesh. Returns None for an empty list.
+    """
+    meshes = list(meshes)
+    if len(meshes) == 0:
+        return None
+    while len(meshes) > 1:
+        merged = [meshes[i].union(meshes[i + 1]) for i in range(0, len(meshes) - 1, 2)]
+        if len(meshes) % 2 == 1:
+            merged.append(meshes[-1])
+        meshes = merged
+    return meshes[0]
+
+
+def MeshBoolean(intersections, subtractions=()):
+    """
+    Intersection of the meshes intersections minus the union of the meshes subtractions.
+    If the extents of the intersected meshes do not overlap the result is empty without
+    evaluating any boolean. Subtracted meshes whose extents do not overlap the intersection
+    are dropped and the rest are unioned (see MeshUnion) and subtracted in one operation.
+    The meshes given may be modified.
+    """
+    intersections = list(intersections)
+
+    extents = [MeshExtent(m) for m in intersections]
+    if any(e is None for e in extents):
+        return type(intersections[0])()
+    extent = _np.array(
+        [_np.max([e[0] for e in extents], axis=0), _np.min([e[1] for e in extents], axis=0)]
+    )
+    if (extent[0] > extent[1]).any():
+        return type(intersections[0])()
+
+    result = intersections[0]
+    for m in intersections[1:]:
+        result = result.intersect(m)
+
+    extent = MeshExtent(result)
+    if extent is None:
+        return result
+
+    subtractions = [m for m in subtractions if _extentsOverlap(extent, MeshExtent(m))]
+    if len(subtractions) > 0:
+        result = result.subtract(MeshUnion(subtractions))
+    return result
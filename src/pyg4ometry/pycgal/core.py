@@ -5,6 +5,7 @@ from . import geom
 from . import Aff_transformation_3
 from . import Vector_3
 from . import Point_2
+from . import Point_3
 from . import Partition_traits_2_Polygon_2
 from . import Polygon_2
 from . import Polygon_with_holes_2
@@ -29,9 +30,74 @@ class CSG:
         Polygon_mesh_processing.triangulate_faces(csg.sm)
         return csg
 
+    @classmethod
+    def fromArrays(cls, vertices, polygons):
+        """
+        Construct a mesh in bulk from arrays. vertices is an (N,3) array of coordinates
+        and polygons an (M,k) integer array of vertex indices of convex planar faces, or
+        a list of such arrays for faces with different numbers of vertices. As in
+        fromPolygons, coincident vertices are merged and the faces triangulated. Vertices
+        not used by any face are dropped.
+        """
+        vertices = _np.asarray(vertices, dtype=_np.float64).reshape(-1, 3)
+        if not isinstance(polygons, (list, tuple)):
+            polygons = [polygons]
+
+        # merge coincident vertices (as toCGALSurfaceMesh, also for -0)
+        rounded = _np.round(vertices, 11) + 0.0
+        _, first, inverse = _np.unique(rounded, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+        # fan triangulation of the (convex) faces
+        triangles = [_np.zeros((0, 3), dtype=_np.int64)]
+        for faces in polygons:
+            faces = _np.asarray(faces, dtype=_np.int64)
+            if faces.size == 0:
+                continue
+            faces = inverse[faces]
+            fan = [faces[:, [0, k, k + 1]] for k in range(1, faces.shape[1] - 1)]
+            # keep the triangles of each face together and the faces in order
+            triangles.append(_np.stack(fan, axis=1).reshape(-1, 3))
+        triangles = _np.concatenate(triangles)
+
+        # faces with merged vertices leave degenerate triangles
+        degenerate = (
+            (triangles[:, 0] == triangles[:, 1])
+            | (triangles[:, 1] == triangles[:, 2])
+            | (triangles[:, 2] == triangles[:, 0])
+        )
+        triangles = triangles[~degenerate]
+
+        # only keep vertices that are used by a face
+        used = _np.unique(triangles)
+        index = _np.zeros(len(first), dtype=_np.int64)
+        index[used] = _np.arange(len(used))
+        triangles = index[triangles]
+        vertices = vertices[first[used]]
+
+        csg = CSG()
+        vertexIndices = [csg.sm.add_vertex(Point_3.Point_3_EPECK(*v)) for v in vertices.tolist()]
+        for t in triangles.tolist():
+            csg.sm.add_face(vertexIndices[t[0]], vertexIndices[t[1]], vertexIndices[t[2]])
+        return csg
+
     def toVerticesAndPolygons(self):
         return Surface_mesh.toVerticesAndPolygons(self.sm)
 
+    def toArrays(self):
+        """
+        Vertices and triangles of the mesh as numpy arrays, the counterpart of fromArrays.
+        Faces that are not triangles are fan triangulated.
+
+        :returns: (vertices, triangles) as (N,3) float64 coordinates and (M,3) int32 vertex indices
+        """
+        vertices, polygons, _ = Surface_mesh.toVerticesAndPolygons(self.sm)
+        vertices = _np.array(vertices, dtype=_np.float64).reshape(-1, 3)
+        if not self.isTriangleMesh():
+            polygons = [[p[0], p[i], p[i + 1]] for p in polygons for i in range(1, len(p) - 1)]
+        triangles = _np.array(polygons, dtype=_np.int32).reshape(-1, 3)
+        return vertices, triangles
+
     def clone(self):
         csg = CSG()
         csg.sm = self.sm.clone()
@@ -368,49 +434,18 @@ class CSG:
     def area(self):
         return Polygon_mesh_processing.area(self.sm)
 
+    def _edgeLengths(self):
+        vertices, triangles = self.toArrays()
+        edges = vertices[_np.roll(triangles, -1, axis=1)] - vertices[triangles]
+        return _np.sqrt((edges * edges).sum(axis=2))
+
     def minEdgeLength(self):
-        vAp = self.toVerticesAndPolygons()
-        v = vAp[0]
-        p = vAp[1]
-        n = vAp[2]
-
-        minEdge = 9e99
-        maxEdge = -9e99
-
-        for i, tri in enumerate(p):
-            for j, vertInd in enumerate(tri):
-                v1 = _np.array(v[j])
-                v2 = _np.array(v[(j + 1) % 3])
-                dv = v2 - v1
-                mdv = _np.sqrt((dv * dv).sum())
-
-                if mdv < minEdge:
-                    minEdge = mdv
-                if mdv > maxEdge:
-                    maxEdge = mdv
-        return minEdge
+        lengths = self._edgeLengths()
+        return lengths.min() if lengths.size else 9e99
 
     def maxEdgeLength(self):
-        vAp = self.toVerticesAndPolygons()
-        v = vAp[0]
-        p = vAp[1]
-        n = vAp[2]
-
-        minEdge = 9e99
-        maxEdge = -9e99
-
-        for i, tri in enumerate(p):
-            for j, vertInd in enumerate(tri):
-                v1 = _np.array(v[j])
-                v2 = _np.array(v[(j + 1) % 3])
-                dv = v2 - v1
-                mdv = _np.sqrt((dv * dv).sum())
-
-                if mdv < minEdge:
-                    minEdge = mdv
-                if mdv > maxEdge:
-                    maxEdge = mdv
-        return maxEdge
+        lengths = self._edgeLengths()
+        return lengths.max() if lengths.size else -9e99
 
     def isNull(self):
         return self.sm.number_of_faces() == 0
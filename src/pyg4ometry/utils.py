@@ -17,6 +17,51 @@ def _load_pickle(path):
         return pickle.load(f)
 
 
+# function and jobs of forkMap, inherited by forked worker processes
+_forkJobs = None
+
+
+def _runForkJob(iJob):
+    function, jobs = _forkJobs
+    return function(jobs[iJob])
+
+
+def forkMap(function, jobs, nworkers, name):
+    """
+    Map function over jobs with a pool of nworkers forked processes. The forked workers
+    inherit the jobs (i.e. the geometry) so only the job index and results are pickled.
+    With one worker or job, or if fork is not available (logged as name), the jobs are run
+    serially. Returns the results in the order of the jobs.
+
+    :param function: module level function of one job
+    :type function: callable
+    :param jobs: arguments of each call of function
+    :type jobs: list
+    :param nworkers: number of worker processes
+    :type nworkers: int
+    :param name: name of the caller for the log
+    :type name: str
+    """
+    import multiprocessing as _multiprocessing
+
+    global _forkJobs
+
+    jobs = list(jobs)
+    if nworkers > 1 and "fork" not in _multiprocessing.get_all_start_methods():
+        _log.warning(f"{name}> fork not available - running serially")
+        nworkers = 1
+
+    if nworkers <= 1 or len(jobs) <= 1:
+        return [function(job) for job in jobs]
+
+    _forkJobs = (function, jobs)
+    try:
+        with _multiprocessing.get_context("fork").Pool(min(nworkers, len(jobs))) as pool:
+            return pool.map(_runForkJob, range(len(jobs)), chunksize=1)
+    finally:
+        _forkJobs = None
+
+
 class Samples:
     def __init__(self, **metadata):
         self.metadata = metadata
@@ -1,7 +1,13 @@
 import vtk as _vtk
+import vtk.util.numpy_support as _numpy_support
 import copy as _copy
 import numpy as _np
 
+from .MeshCache import _meshToArrays, _meshFromArrays
+
+# numpy type matching vtkIdType (64 bit unless vtk is built with 32 bit ids)
+_idType = _numpy_support.get_vtk_to_numpy_typemap()[_vtk.VTK_ID_TYPE]
+
 
 # python iterable to vtkIdList
 def mkVtkIdList(it):
@@ -16,20 +22,20 @@ def pycsgMeshToVtkPolyData(mesh):
     # refine mesh
     # mesh.refine()
 
-    verts, cells, count = mesh.toVerticesAndPolygons()
+    vertices, indices, offsets = _meshToArrays(mesh)
     meshPolyData = _vtk.vtkPolyData()
     points = _vtk.vtkPoints()
     polys = _vtk.vtkCellArray()
-    scalars = _vtk.vtkFloatArray()
-
-    for v in verts:
-        points.InsertNextPoint(v)
-
-    for p in cells:
-        polys.InsertNextCell(mkVtkIdList(p))
 
-    for i in range(count):
-        scalars.InsertTuple1(i, 1)
+    # bulk copies of the arrays (deep so vtk does not refer to numpy memory)
+    points.SetData(_numpy_support.numpy_to_vtk(vertices, deep=1))
+    polys.SetData(
+        _numpy_support.numpy_to_vtkIdTypeArray(offsets.astype(_idType), deep=1),
+        _numpy_support.numpy_to_vtkIdTypeArray(indices.astype(_idType), deep=1),
+    )
+    scalars = _numpy_support.numpy_to_vtk(
+        _np.ones(len(vertices), dtype=_np.float32), deep=1, array_type=_vtk.VTK_FLOAT
+    )
 
     meshPolyData.SetPoints(points)
     meshPolyData.SetPolys(polys)
@@ -42,6 +48,15 @@ def pycsgMeshToVtkPolyData(mesh):
     return meshPolyData
 
 
+# convert the polygons of vtkPolyData to a pycsg (or cgal) mesh
+def vtkPolyDataToPycsgMesh(polydata):
+    vertices = _numpy_support.vtk_to_numpy(polydata.GetPoints().GetData()).astype(_np.float64)
+    polys = polydata.GetPolys()
+    offsets = _numpy_support.vtk_to_numpy(polys.GetOffsetsArray()).astype(_np.int64)
+    indices = _numpy_support.vtk_to_numpy(polys.GetConnectivityArray()).astype(_np.int32)
+    return _meshFromArrays(vertices, indices, offsets)
+
+
 def vtkPolyDataToNumpy(data):
     conFlt = _vtk.vtkConnectivityFilter()
     if type(data) is str:
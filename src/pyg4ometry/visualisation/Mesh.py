@@ -2,6 +2,8 @@ import copy as _copy
 
 from .. import config as _config
 from .. import exceptions
+from .MeshCache import meshCache as _meshCache
+from .MeshCache import _meshToArrays
 
 if _config.meshing == _config.meshingType.pycsg:
     from ..pycsg.core import CSG as _CSG
@@ -29,8 +31,8 @@ class Mesh:
         # solid which contains the mesh
         self.solid = solid
 
-        # mesh in local coordinates
-        self.localmesh = self.solid.mesh()
+        # mesh in local coordinates (possibly shared with identical solids)
+        self.localmesh = self._getMesh()
 
         # bounding mesh in local coordinates
         self.localboundingmesh = self.getBoundingBoxMesh()
@@ -38,22 +40,101 @@ class Mesh:
         # overlap meshes (protrusion, overlap, coplanar)
         self.overlapmeshes = []
 
+        # level of detail variants and vtkPolyData of localmesh (made on first use)
+        self._clearDerived()
+
+    def __getstate__(self):
+        # meshes derived from localmesh are not copied or pickled, they are remade when needed
+        state = self.__dict__.copy()
+        state["_lodMeshes"] = {}
+        state["_vtkPolyData"] = {}
+        state["_derivedFrom"] = None
+        return state
+
+    def _clearDerived(self):
+        self._lodMeshes = {}
+        self._vtkPolyData = {}
+        self._derivedFrom = None
+
     def remesh(self):
         # existing overlaps become invalid
         self.overlapmeshes = []
 
         # recreate mesh
-        self.localmesh = self.solid.mesh().clone()
+        self.localmesh = self._getMesh()
+        self._clearDerived()
 
         # recreate bounding mesh
         self.localboundingmesh = self.getBoundingBoxMesh()
 
+    def _getMesh(self):
+        if _config.meshCache:
+            return _meshCache.mesh(self.solid)
+        return self.solid.mesh()
+
     def addOverlapMesh(self, mesh):
         self.overlapmeshes.append(mesh)
 
     def getLocalMesh(self):
         return self.localmesh
 
+    def _derived(self):
+        # derived meshes are only valid for the localmesh they were made from
+        if self._derivedFrom is not self.localmesh:
+            self._clearDerived()
+            self._derivedFrom = self.localmesh
+
+    def lodLevels(self):
+        """
+        Number of level of detail variants (including the full mesh, level 0).
+        """
+        return len(_config.lodReductions) + 1
+
+    def lodMesh(self, level=0):
+        """
+        Level of detail variant of the local mesh. Level 0 is the local mesh and level i
+        has the fraction config.lodReductions[i-1] of its triangles removed by quadric
+        decimation (but keeps at least config.lodMinPolygons). Levels beyond the last are
+        the last. Variants are made on first use and kept until the mesh changes. A level
+        that would not remove any triangles (including every level of an empty mesh) is the
+        same mesh object as the level before.
+        """
+        self._derived()
+        level = min(max(int(level), 0), self.lodLevels() - 1)
+        if level == 0 or self.localmesh.polygonCount() == 0:
+            return self.localmesh
+        if level not in self._lodMeshes:
+            previous = self.lodMesh(level - 1)
+            nPolygons = self.localmesh.polygonCount()
+            reduction = min(
+                _config.lodReductions[level - 1], 1 - _config.lodMinPolygons / nPolygons
+            )
+            if previous is not self.localmesh:
+                nPreviousPolygons = previous.polygonCount()
+            else:
+                nPreviousPolygons = nPolygons
+            if (1 - reduction) * nPolygons >= nPreviousPolygons:
+                self._lodMeshes[level] = previous
+            else:
+                self._lodMeshes[level] = _decimateMesh(self.localmesh, reduction)
+        return self._lodMeshes[level]
+
+    def vtkPolyData(self, level=0):
+        """
+        vtkPolyData of the local mesh (or a level of detail variant, see lodMesh). It is
+        converted once and cached until the mesh changes, so it is shared and must not be
+        modified (add arrays to a ShallowCopy).
+        """
+        mesh = self.lodMesh(level)
+        level = min(max(int(level), 0), self.lodLevels() - 1)
+        if level > 0 and mesh is self.lodMesh(level - 1):
+            return self.vtkPolyData(level - 1)
+        if level not in self._vtkPolyData:
+            from .Convert import pycsgMeshToVtkPolyData as _pycsgMeshToVtkPolyData
+
+            self._vtkPolyData[level] = _pycsgMeshToVtkPolyData(mesh)
+        return self._vtkPolyData[level]
+
     def getBoundingBox(self, rotationMatrix=None, translation=None):
         """
         Axes aligned bounding box. Can also provide a rotation and
@@ -71,30 +152,51 @@ def _getBoundingBox(aMesh, rotationMatrix=None, translation=None, nameForError="
     Axes aligned bounding box. Can also provide a rotation and
     a translation (applied in that order) to the vertices.
     """
-    vertices, _, _ = aMesh.toVerticesAndPolygons()
-    if not vertices:
+    vertices = _meshToArrays(aMesh)[0]
+    if len(vertices) == 0:
         _log.warning("getBoundingBox null mesh error : %s", nameForError)
         if _config.meshingNullException:
             raise exceptions.NullMeshError(nameForError)
         else:
             return [[-1e-9, -1e-9, -1e-9], [1e9, 1e9, 1e9]]
-    vertices = _np.vstack(vertices)
 
     if rotationMatrix is not None:
-        vertices = rotationMatrix.dot(vertices.T).T
+        vertices = _np.asarray(rotationMatrix.dot(vertices.T).T)
     if translation is not None:
         vertices[..., 0] += translation[0]
         vertices[..., 1] += translation[1]
         vertices[..., 2] += translation[2]
 
-    vMin = [min(vertices[..., 0]), min(vertices[..., 1]), min(vertices[..., 2])]
-    vMax = [max(vertices[..., 0]), max(vertices[..., 1]), max(vertices[..., 2])]
+    vMin = vertices.min(axis=0).tolist()
+    vMax = vertices.max(axis=0).tolist()
 
     _log.debug("visualisation.Mesh.getBoundingBox> %s %s", vMin, vMax)
 
     return [vMin, vMax]
 
 
+def _decimateMesh(aMesh, reduction):
+    """
+    Copy of a mesh with the fraction reduction of its triangles removed by quadric
+    decimation (vtkQuadricDecimation, preserving the volume).
+    """
+    import vtk as _vtk
+    from .Convert import pycsgMeshToVtkPolyData as _pycsgMeshToVtkPolyData
+    from .Convert import vtkPolyDataToPycsgMesh as _vtkPolyDataToPycsgMesh
+
+    triFlt = _vtk.vtkTriangleFilter()
+    triFlt.SetInputData(_pycsgMeshToVtkPolyData(aMesh))
+    decFlt = _vtk.vtkQuadricDecimation()
+    decFlt.SetInputConnection(triFlt.GetOutputPort())
+    decFlt.SetTargetReduction(reduction)
+    decFlt.VolumePreservationOn()
+    decFlt.Update()
+
+    _log.debug("visualisation.Mesh._decimateMesh> %s %s", reduction, aMesh.polygonCount())
+
+    return _vtkPolyDataToPycsgMesh(decFlt.GetOutput())
+
+
 def _getBoundingBoxMesh(boundingBox):
     bb = boundingBox
     x0 = (bb[1][0] + bb[0][0]) / 2.0
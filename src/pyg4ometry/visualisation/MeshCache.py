@@ -0,0 +1,264 @@
+import collections as _collections
+import hashlib as _hashlib
+import os as _os
+import threading as _threading
+
+from .. import config as _config
+
+if _config.meshing == _config.meshingType.pycsg:
+    from ..pycsg.core import CSG as _CSG
+    from ..pycsg.geom import Vector as _Vector
+    from ..pycsg.geom import Vertex as _Vertex
+    from ..pycsg.geom import Polygon as _Polygon
+elif _config.meshing == _config.meshingType.cgal_sm:
+    from ..pycgal.core import CSG as _CSG
+    from ..pycgal import Point_3 as _Point_3
+
+import logging as _log
+import numpy as _np
+
+_log = _log.getLogger(__name__)
+
+# mesh settings that are not part of varNames for all solids
+_meshSettings = ["nslice", "nstack", "refine"]
+
+
+def _freeze(value):
+    """
+    Convert an evaluated parameter (float or nested list of floats) into a hashable value.
+    """
+    if isinstance(value, (list, tuple, _np.ndarray)):
+        return tuple(_freeze(v) for v in value)
+    return float(value)
+
+
+def meshKey(solid):
+    """
+    Content address of the mesh of a solid. For primitive solids this is the solid type,
+    the evaluated parameters with units applied and the mesh settings (nslice, nstack,
+    refine). Boolean, multi-union and scaled solids are keyed on the keys of their
+    constituent solids and their evaluated transformations, and tessellated solids on a
+    digest of their vertices and facets. Returns None if the mesh of this solid cannot be
+    cached.
+    """
+    try:
+        return _meshKey(solid)
+    except Exception as e:
+        _log.debug("meshKey> cannot form key for solid %s : %s", solid.name, e)
+        return None
+
+
+def _meshKey(solid):
+    if solid.type in ("Union", "Subtraction", "Intersection"):
+        return _booleanKey(solid)
+    elif solid.type == "MultiUnion":
+        return _multiUnionKey(solid)
+    elif solid.type == "Scaled":
+        return _scaledKey(solid)
+    elif solid.type == "TessellatedSolid":
+        return _tessellatedKey(solid)
+    elif not hasattr(solid, "varNames"):
+        return None
+
+    from ..gdml import Units as _Units
+
+    parameters = []
+    for varName, varUnit in zip(solid.varNames, solid.varUnits):
+        value = solid.evaluateParameter(getattr(solid, varName))
+        unit = _Units.unit(getattr(solid, varUnit)) if varUnit else 1
+        if isinstance(value, (list, tuple, _np.ndarray)):
+            # units are not always applied to every element of a list so keep them apart
+            parameters.append((_freeze(value), float(unit)))
+        else:
+            parameters.append(float(value) * unit)
+    for setting in _meshSettings:
+        if hasattr(solid, setting) and setting not in solid.varNames:
+            parameters.append((setting, _freeze(solid.evaluateParameter(getattr(solid, setting)))))
+
+    return (solid.type, tuple(parameters))
+
+
+def _transformationKey(tra):
+    return (_freeze(tra[0].eval()), _freeze(tra[1].eval()))
+
+
+def _booleanKey(solid):
+    key1 = _meshKey(solid.object1())
+    key2 = _meshKey(solid.object2())
+    if key1 is None or key2 is None:
+        return None
+    return (solid.type, key1, key2, _transformationKey(solid.tra2))
+
+
+def _multiUnionKey(solid):
+    keys = [_meshKey(obj) for obj in solid.objects]
+    if None in keys:
+        return None
+    transformations = [_transformationKey(tra) for tra in solid.transformations]
+    return (solid.type, tuple(keys), tuple(transformations))
+
+
+def _scaledKey(solid):
+    key = _meshKey(solid.solid)
+    if key is None:
+        return None
+    scale = tuple(float(solid.evaluateParameter(getattr(solid, v))) for v in solid.varNames)
+    return (solid.type, key, scale)
+
+
+def _tessellatedKey(solid):
+    vertices, facets = solid._verticesAndFacets()
+    digest = _hashlib.sha1()
+    digest.update(_np.array(vertices, dtype=_np.float64).tobytes())
+    digest.update(_np.array([len(f) for f in facets], dtype=_np.int64).tobytes())
+    digest.update(_np.array([i for f in facets for i in f], dtype=_np.int64).tobytes())
+    return (solid.type, digest.hexdigest())
+
+
+def _meshToArrays(mesh):
+    """
+    Vertices of a mesh as an (N,3) float64 array and its polygons as a flat int32 array
+    of vertex indices with int64 offsets to the start of each polygon (and the end).
+    """
+    if hasattr(mesh, "toArrays"):
+        vertices, triangles = mesh.toArrays()
+        offsets = _np.arange(0, 3 * len(triangles) + 1, 3, dtype=_np.int64)
+        return vertices, triangles.ravel(), offsets
+
+    vertices, polygons, _ = mesh.toVerticesAndPolygons()
+    vertices = _np.array(vertices, dtype=_np.float64).reshape(-1, 3)
+    offsets = _np.cumsum([0] + [len(p) for p in polygons], dtype=_np.int64)
+    indices = _np.array([i for p in polygons for i in p], dtype=_np.int32)
+    return vertices, indices, offsets
+
+
+def _meshFromArrays(vertices, indices, offsets):
+    polygons = [indices[offsets[i] : offsets[i + 1]] for i in range(len(offsets) - 1)]
+    return _meshFromVerticesAndPolygons(vertices.tolist(), polygons)
+
+
+def _meshFromVerticesAndPolygons(vertices, polygons):
+    """
+    Construct a mesh from a list of vertices and a list of polygons (each a list
+    of vertex indices) as returned by toVerticesAndPolygons. The vertices are not
+    merged so the mesh is reproduced as it was.
+    """
+    if _config.meshing == _config.meshingType.cgal_sm:
+        csg = _CSG()
+        vertexIndices = [csg.sm.add_vertex(_Point_3.Point_3_EPECK(*v)) for v in vertices]
+        for polygon in polygons:
+            csg.sm.add_face(*[vertexIndices[i] for i in polygon])
+        return csg
+    else:
+        return _CSG.fromPolygons(
+            [_Polygon([_Vertex(_Vector(*vertices[i])) for i in polygon]) for polygon in polygons]
+        )
+
+
+class MeshCache:
+    """
+    Content-addressed cache of solid meshes. Solids of the same type with the same
+    evaluated parameters and mesh settings share a single mesh, which must therefore
+    be treated as immutable (clone it before transforming it). The least recently used
+    meshes are evicted beyond maxSize entries. If a directory is given, meshes are also
+    written there and read back on a miss, so they persist between sessions.
+
+    :param maxSize: maximum number of meshes held in memory (None for config.meshCacheSize)
+    :type maxSize: int or None
+    :param directory: directory to back the cache on disk (None for config.meshCacheDirectory)
+    :type directory: str or None
+    """
+
+    def __init__(self, maxSize=None, directory=None):
+        self._maxSize = maxSize
+        self._directory = directory
+        self._meshes = _collections.OrderedDict()
+        self._lock = _threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxSize(self):
+        return self._maxSize if self._maxSize is not None else _config.meshCacheSize
+
+    @property
+    def directory(self):
+        return self._directory if self._directory is not None else _config.meshCacheDirectory
+
+    def __len__(self):
+        return len(self._meshes)
+
+    def __contains__(self, key):
+        return key in self._meshes
+
+    def clear(self):
+        """
+        Remove all meshes held in memory and reset the statistics. Files on disk are kept.
+        """
+        with self._lock:
+            self._meshes.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def mesh(self, solid):
+        """
+        Return the (shared) mesh for a solid, meshing it only if no identical solid
+        has been meshed before.
+        """
+        key = meshKey(solid)
+        if key is None:
+            return solid.mesh()
+
+        with self._lock:
+            if key in self._meshes:
+                self._meshes.move_to_end(key)
+                self.hits += 1
+                return self._meshes[key]
+            self.misses += 1
+
+        mesh = self._load(key)
+        if mesh is None:
+            mesh = solid.mesh()
+            self._save(key, mesh)
+
+        with self._lock:
+            # another thread may have inserted the same key meanwhile - keep the first one
+            mesh = self._meshes.setdefault(key, mesh)
+            self._meshes.move_to_end(key)
+            while len(self._meshes) > max(self.maxSize, 0):
+                self._meshes.popitem(last=False)
+        return mesh
+
+    def _fileName(self, key):
+        from .. import __version__
+
+        # meshes may change between versions and backends
+        digest = _hashlib.sha1(repr((__version__, _config.backendName(), key)).encode())
+        return _os.path.join(self.directory, digest.hexdigest() + ".npz")
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        fileName = self._fileName(key)
+        if not _os.path.exists(fileName):
+            return None
+        try:
+            with _np.load(fileName) as f:
+                return _meshFromArrays(f["vertices"], f["indices"], f["offsets"])
+        except Exception as e:
+            _log.warning("MeshCache> cannot read %s : %s", fileName, e)
+            return None
+
+    def _save(self, key, mesh):
+        if not self.directory:
+            return
+        _os.makedirs(self.directory, exist_ok=True)
+        fileName = self._fileName(key)
+        vertices, indices, offsets = _meshToArrays(mesh)
+        # write to a temporary file first so a concurrent reader never sees a partial file
+        tempFileName = fileName + "." + str(_os.getpid()) + ".tmp.npz"
+        _np.savez(tempFileName, vertices=vertices, indices=indices, offsets=offsets)
+        _os.replace(tempFileName, fileName)
+
+
+meshCache = MeshCache()
@@ -4,20 +4,18 @@ except ImportError:
     Usd = None
 
 from .ViewerHierarchyBase import ViewerHierarchyBase as _ViewerHierarchyBase
+from .MeshCache import _meshToArrays
 import numpy as _np
 import os as _os
 from .. import geant4 as _g4
 
 
 def mesh2Prim(mesh, meshPrim, scale=1000):
-    m = mesh.toVerticesAndPolygons()
-    pointsInMeters = _np.array(m[0])
-    pointsInMeters = pointsInMeters / scale
+    vertices, indices, offsets = _meshToArrays(mesh)
+    pointsInMeters = vertices / scale
     meshPrim.GetAttribute("points").Set(pointsInMeters)
-    meshPrim.GetAttribute("faceVertexCounts").Set([len(vl) for vl in m[1]])
-    inds = _np.array(m[1])
-    inds.reshape(inds.shape[0] * inds.shape[1])
-    meshPrim.GetAttribute("faceVertexIndices").Set(inds)
+    meshPrim.GetAttribute("faceVertexCounts").Set(_np.diff(offsets).astype(_np.int32))
+    meshPrim.GetAttribute("faceVertexIndices").Set(indices)
 
 
 def visOptions2MaterialPrim(stage, visOptions, materialPrim):
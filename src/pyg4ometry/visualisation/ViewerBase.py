@@ -1,41 +1,89 @@
 import base64 as _base64
 import copy as _copy
+import hashlib as _hashlib
+import heapq as _heapq
 import numpy as _np
 import random as _random
 import logging as _log
+import pathlib as _pathlib
+from .. import config as _config
 from .. import pycgal as _pycgal
 from .. import transformation as _transformation
 from .VisualisationOptions import (
     VisualisationOptions as _VisOptions,
 )
 from .Mesh import OverlapType as _OverlapType
+from .MeshCache import _meshToArrays
 
 _log = _log.getLogger(__name__)
 
 
-def _daughterSubtractedMesh(lv):
-    mm = lv.mesh.localmesh.clone()  # mother mesh
+def _fanTriangles(indices, offsets):
+    # (n,3) triangles of polygons (flat indices with offsets as from _meshToArrays)
+    counts = _np.diff(offsets)
+    nTriangles = _np.maximum(counts - 2, 0)
+    first = _np.repeat(offsets[:-1], nTriangles)
+    k = _np.arange(nTriangles.sum()) - _np.repeat(_np.cumsum(nTriangles) - nTriangles, nTriangles)
+    return _np.stack([indices[first], indices[first + k + 1], indices[first + k + 2]], axis=1)
+
+
+def _rotationsToQuaternions(rotations):
+    # (n,3,3) rotation matrices to (n,4) quaternions (w, x, y, z)
+    r = rotations
+    q = _np.zeros((len(r), 4))
+    trace = r[:, 0, 0] + r[:, 1, 1] + r[:, 2, 2]
+    diagonal = _np.argmax(_np.stack([r[:, 0, 0], r[:, 1, 1], r[:, 2, 2]], axis=1), axis=1)
+
+    m = trace > 0
+    w = _np.sqrt(1 + trace[m]) / 2
+    q[m] = _np.stack(
+        [
+            w,
+            (r[m, 2, 1] - r[m, 1, 2]) / (4 * w),
+            (r[m, 0, 2] - r[m, 2, 0]) / (4 * w),
+            (r[m, 1, 0] - r[m, 0, 1]) / (4 * w),
+        ],
+        axis=1,
+    )
+
+    # largest diagonal element for the others, i is the axis and j, k the next ones
+    for i, j, k in [(0, 1, 2), (1, 2, 0), (2, 0, 1)]:
+        m = (trace <= 0) & (diagonal == i)
+        v = _np.sqrt(1 + r[m, i, i] - r[m, j, j] - r[m, k, k]) / 2
+        q[m, 0] = (r[m, k, j] - r[m, j, k]) / (4 * v)
+        q[m, 1 + i] = v
+        q[m, 1 + j] = (r[m, i, j] + r[m, j, i]) / (4 * v)
+        q[m, 1 + k] = (r[m, i, k] + r[m, k, i]) / (4 * v)
+
+    return q
+
+
+def _decomposePlacements(placements):
+    """
+    Decompose the instance placements into translations, quaternions (w, x, y, z)
+    and (possibly negative) scales, applied as scale, rotate, translate (as by
+    vtkGlyph3DMapper and glTF nodes). Returns those arrays and a mask of the
+    placements that can be decomposed, i.e. whose matrix is a rotation times a
+    diagonal scale.
+    """
+    matrices = _np.array([_np.asarray(p["transformation"], dtype=float) for p in placements])
+    translations = _np.array([_np.asarray(p["translation"], dtype=float) for p in placements])
+    matrices = matrices.reshape(-1, 3, 3)
+    translations = translations.reshape(-1, 3)
 
-    for d in lv.daughterVolumes:
-        # skip over assemblies
-        if d.logicalVolume.type == "assembly":
-            continue
+    scales = _np.linalg.norm(matrices, axis=1)
+    scales[scales == 0] = 1
+    rotations = matrices / scales[:, None, :]
 
-        dp = d.position.eval()
-        dr = d.rotation.eval()
-        if d.scale is not None:
-            ds = d.scale.eval()
-        else:
-            ds = [1, 1, 1]
-        dm = d.logicalVolume.mesh.localmesh.clone()
+    # reflections as a negative scale of the first axis
+    reflected = _np.linalg.det(rotations) < 0
+    scales[reflected, 0] *= -1
+    rotations[reflected, :, 0] *= -1
 
-        daa = _transformation.tbxyz2axisangle(dr)
-        dm.rotate(daa[0], _transformation.rad2deg(daa[1]))
-        dm.translate(dp)
+    orthonormal = _np.einsum("nji,njk->nik", rotations, rotations)
+    decomposable = _np.all(_np.abs(orthonormal - _np.eye(3)) < 1e-9, axis=(1, 2))
 
-        mm = mm.subtract(dm)
-
-    return mm
+    return translations, _rotationsToQuaternions(rotations), scales, decomposable
 
 
 class ViewerBase:
@@ -66,6 +114,8 @@ class ViewerBase:
         # basic instancing structure
         self.localmeshes = {}  # unique meshes in scene
         self.localmeshesoverlap = {}  # unique overlap meshes in scene
+        self.localmeshSources = {}  # logical volume Mesh of a localmeshes entry
+        self.localmeshLevels = {}  # level of detail of a localmeshes entry (default 0)
         self.instancePlacements = {}  # instance placements
         self.instanceVisOptions = {}  # instance vis options
         self.instancePbrOptions = {}  # instance pbr options
@@ -143,13 +193,14 @@ class ViewerBase:
             # add mesh
             if not self.bSubtractDaughters:
                 self.addMesh(lv.name, lv.mesh.localmesh)
+                self.localmeshSources.setdefault(lv.name, lv.mesh)
             else:
-                self.addMesh(lv.name, _daughterSubtractedMesh(lv))
+                self.addMesh(lv.name, lv.daughterSubtractedMesh())
 
             # add instance
             if name is None:
                 name = "world"
-            self.addInstance(lv.name, mtra, tra, name)
+            self.addInstance(lv.name, mtra, tra, name, depth)
 
             vo = self.getVisOptionsLV(lv)
             self.addVisOptions(lv.name, vo)
@@ -267,7 +318,7 @@ class ViewerBase:
         else:
             self.localmeshes[name] = mesh
 
-    def addInstance(self, name, transformation, translation, instanceName=""):
+    def addInstance(self, name, transformation, translation, instanceName="", depth=0):
         """
         Add a new instance for mesh with name
 
@@ -279,6 +330,8 @@ class ViewerBase:
         :type translation: array(3)
         :param instanceName: Name of the instance e.g PV
         :type instanceName: str
+        :param depth: Depth of the instance in the placement hierarchy
+        :type depth: int
 
         """
 
@@ -288,6 +341,7 @@ class ViewerBase:
                     "transformation": transformation,
                     "translation": translation,
                     "name": instanceName,
+                    "depth": depth,
                 }
             )
         else:
@@ -296,6 +350,7 @@ class ViewerBase:
                     "transformation": transformation,
                     "translation": translation,
                     "name": instanceName,
+                    "depth": depth,
                 }
             ]
 
@@ -400,20 +455,163 @@ class ViewerBase:
 
         for k in toRemove:
             self.localmeshes.pop(k)
+            self.localmeshSources.pop(k, None)
+            self.localmeshLevels.pop(k, None)
             self.instancePlacements.pop(k)
             self.instanceVisOptions.pop(k)
 
+    def setLevelOfDetail(
+        self, screenFractions=None, depth=None, polygonBudget=None, viewPoint=None, viewAngle=30
+    ):
+        """
+        Use level of detail variants (see :meth:`Mesh.lodMesh`) of the logical volume meshes so
+        that large scenes can be viewed interactively and exported. Call after adding the
+        logical volumes and before building pipelines or exporting. Each mesh takes the coarsest
+        of the levels given by the screen size and the placement depth of its instances. Then,
+        if the scene has more than polygonBudget polygons, the meshes with the most polygons in
+        the scene are made coarser until it fits. Calling it again starts from the full meshes.
+
+        :param screenFractions: screen size (fraction of the view height) below which level 1, 2, ... is used. True for config.lodScreenFractions and None to ignore the screen size
+        :type screenFractions: list(float), bool or None
+        :param depth: placement depth up to which the full mesh is used, each further level of the hierarchy uses the next coarser level (None to ignore depth)
+        :type depth: int or None
+        :param polygonBudget: maximum number of polygons of all instances in the scene
+        :type polygonBudget: int or None
+        :param viewPoint: camera position for the screen size, None to view the whole scene (as when the camera is reset)
+        :type viewPoint: array(3) or None
+        :param viewAngle: vertical view angle of the camera in degrees
+        :type viewAngle: float
+        """
+        if screenFractions is True:
+            screenFractions = _config.lodScreenFractions
+
+        levels = {}
+        for k, source in self.localmeshSources.items():
+            levels[k] = 0
+            if depth is not None:
+                minDepth = min(p.get("depth", 0) for p in self.instancePlacements[k])
+                levels[k] = max(minDepth - depth, 0)
+
+        if screenFractions:
+            screenFraction = self._screenFractions(viewPoint, _np.radians(viewAngle))
+            for k in levels:
+                level = sum(screenFraction.get(k, 0) < f for f in screenFractions)
+                levels[k] = max(levels[k], level)
+
+        for k in levels:
+            levels[k] = min(levels[k], self.localmeshSources[k].lodLevels() - 1)
+
+        def polygons(k):
+            if k in levels:
+                mesh = self.localmeshSources[k].lodMesh(levels[k])
+            else:
+                mesh = self.localmeshes[k]
+            return mesh.polygonCount() * len(self.instancePlacements[k])
+
+        if polygonBudget is not None:
+            scenePolygons = {k: polygons(k) for k in self.localmeshes}
+            total = sum(scenePolygons.values())
+            heap = [(-scenePolygons[k], k) for k in levels]
+            _heapq.heapify(heap)
+            while total > polygonBudget and heap:
+                _, k = _heapq.heappop(heap)
+                source = self.localmeshSources[k]
+                if source.lodMesh(levels[k] + 1) is source.lodMesh(levels[k]):
+                    continue  # at the coarsest level
+                levels[k] += 1
+                n = polygons(k)
+                total -= scenePolygons[k] - n
+                scenePolygons[k] = n
+                _heapq.heappush(heap, (-n, k))
+            if total > polygonBudget:
+                _log.warning("setLevelOfDetail> %d polygons over budget %d", total, polygonBudget)
+
+        for k, level in levels.items():
+            self.localmeshes[k] = self.localmeshSources[k].lodMesh(level)
+            self.localmeshLevels[k] = level
+
+    def _screenFractions(self, viewPoint, viewAngle):
+        # largest fraction of the view height covered by an instance of each mesh
+        centres = {}
+        radii = {}
+        for k in self.localmeshes:
+            vertices = _meshToArrays(self.localmeshes[k])[0]
+            if len(vertices) == 0 or len(self.instancePlacements.get(k, [])) == 0:
+                continue
+            vMin, vMax = vertices.min(axis=0), vertices.max(axis=0)
+            mtra = _np.array([p["transformation"] for p in self.instancePlacements[k]], dtype=float)
+            tra = _np.array([p["translation"] for p in self.instancePlacements[k]], dtype=float)
+            # bounding spheres of the instances
+            centres[k] = mtra @ ((vMin + vMax) / 2) + tra.reshape(-1, 3)
+            radii[k] = _np.linalg.norm(vMax - vMin) / 2 * _np.linalg.norm(mtra, ord=2, axis=(1, 2))
+
+        if not centres:
+            return {}
+
+        if viewPoint is None:
+            # the whole scene in view, as vtkRenderer.ResetCamera
+            allCentres = _np.concatenate(list(centres.values()))
+            allRadii = _np.concatenate(list(radii.values()))
+            sMin = (allCentres - allRadii[:, None]).min(axis=0)
+            sMax = (allCentres + allRadii[:, None]).max(axis=0)
+            distance = _np.linalg.norm(sMax - sMin) / 2 / _np.sin(viewAngle / 2)
+            distances = dict.fromkeys(centres, distance)
+        else:
+            viewPoint = _np.array(viewPoint, dtype=float)
+            distances = {k: _np.linalg.norm(centres[k] - viewPoint, axis=1) for k in centres}
+
+        viewHeight = 2 * _np.tan(viewAngle / 2)
+        screenFraction = {}
+        for k in centres:
+            # an instance containing the view point fills the screen
+            distance = _np.maximum(distances[k] - radii[k], 0)
+            with _np.errstate(divide="ignore"):
+                fraction = 2 * radii[k] / (viewHeight * distance)
+            screenFraction[k] = float(fraction.max())
+        return screenFraction
+
+    def _meshPolyData(self, k):
+        # polydata cached on the logical volume mesh unless the scene mesh is different
+        source = self.localmeshSources.get(k)
+        level = self.localmeshLevels.get(k, 0)
+        if source is not None and source.lodMesh(level) is self.localmeshes[k]:
+            return source.vtkPolyData(level)
+        from .Convert import pycsgMeshToVtkPolyData as _pycsgMeshToVtkPolyData
+
+        return _pycsgMeshToVtkPolyData(self.localmeshes[k])
+
     def scaleScene(self, scaleFactor):
         for k in self.localmeshes:
+            # meshes are shared with the logical volumes so scale a copy
+            self.localmeshes[k] = self.localmeshes[k].clone()
             self.localmeshes[k].scale([scaleFactor, scaleFactor, scaleFactor])
 
         for k in self.instancePlacements:
             for p in self.instancePlacements[k]:
                 p["translation"] = p["translation"] * scaleFactor
 
-    def exportGLTFScene(self, gltfFileName="test.gltf", singleInstance=False):
+    def exportGLTFScene(
+        self,
+        gltfFileName="test.gltf",
+        singleInstance=False,
+        normals=False,
+        quantise=False,
+        gpuInstancing=False,
+    ):
         """Export entire scene as gltf file, filename extension dictates binary (glb) or readable json (gltf)
-        singleInstance is a Boolean flag to supress all but one instance"""
+        singleInstance is a Boolean flag to supress all but one instance
+
+        All the data is written to a single buffer (the binary chunk of a glb file). Meshes with
+        the same vertices and triangles are written once and every instance is a node referring
+        to its mesh. The meshes of the viewer are not modified.
+
+        :param normals: write vertex normals (split at edges sharper than 30 degrees)
+        :type normals: bool
+        :param quantise: write positions as 16 bit and normals as 8 bit integers (KHR_mesh_quantization)
+        :type quantise: bool
+        :param gpuInstancing: write the instances of each mesh as a single node (EXT_mesh_gpu_instancing)
+        :type gpuInstancing: bool
+        """
 
         try:
             from pygltflib import (
@@ -430,184 +628,269 @@ class ViewerBase:
                 Node,
                 ARRAY_BUFFER,
                 ELEMENT_ARRAY_BUFFER,
+                BYTE,
+                SHORT,
+                UNSIGNED_SHORT,
                 FLOAT,
                 UNSIGNED_INT,
                 SCALAR,
                 VEC3,
+                VEC4,
             )
         except ImportError:
             _log.error("pygltflib needs to be installed for export : 'pip install pygltflib'")
             return
 
-        materials = []
-        buffers = []
+        suffix = _pathlib.Path(gltfFileName).suffix.lower()
+        binary = suffix == ".glb"
+        if not binary and suffix != ".gltf":
+            _log.error("ViewerBase::exportGLTFScene> unknown gltf extension")
+            return
+
+        blob = bytearray()
         bufferViews = []
         accessors = []
-        meshes = []
-        nodes = []
-        scenes = []
-
-        # loop over meshes
-        iBuffer = 0
-        key_iBuffer = {}
-        for k in self.localmeshes:
-            key_iBuffer[k] = iBuffer
-
-            # get mesh
-            csg = self.localmeshes[k]
-
-            scale = 1 - 0.001 * self.instanceVisOptions[k][0].depth
-            csg.scale([scale, scale, scale])
-
-            inf = csg.info()
-
-            vAndPs = csg.toVerticesAndPolygons()
-            verts = vAndPs[0]
-            tris = vAndPs[1]
-
-            verts = _np.array(verts).astype(_np.float32)
-            tris = _np.array(tris).astype(_np.uint32)
-
-            verts_binary_blob = verts.flatten().tobytes()
-            tris_binary_blob = tris.flatten().tobytes()
-
-            pyg4VisOpt = self.instanceVisOptions[k][0]
-
-            pyg4_color = pyg4VisOpt.colour
-            pyg4_alpha = pyg4VisOpt.alpha
-            pyg4_rep = pyg4VisOpt.representation
-
-            pbrMetallicRoughness = PbrMetallicRoughness(
-                baseColorFactor=[
-                    _random.random(),
-                    _random.random(),
-                    _random.random(),
-                    1.0,
-                ],
-                metallicFactor=_random.random(),
-                roughnessFactor=_random.random(),
-            )
-            # alphaMode = "OPAQUE"
-
-            # if pyg4_rep == "wireframe" :
-            #    alphaMode = "BLEND"
-            #    alphaCutoff = pyg4_alpha
-
-            materials.append(Material(pbrMetallicRoughness=pbrMetallicRoughness))
-
-            buffers.append(
-                Buffer(
-                    uri="data:application/octet-stream;base64,"
-                    + str(_base64.b64encode(tris_binary_blob + verts_binary_blob).decode("utf-8")),
-                    byteLength=len(tris_binary_blob) + len(verts_binary_blob),
-                )
-            )
 
+        def addAccessor(array, componentType, type, target=None, normalized=False, minMax=False):
+            # views start on a 4 byte boundary and vertex attributes are padded to 4 bytes
+            blob.extend(b"\0" * (-len(blob) % 4))
+            data = _np.ascontiguousarray(array)
+            byteStride = None
+            if target == ARRAY_BUFFER and data.shape[1] * data.itemsize % 4 != 0:
+                nComponents = -(-data.shape[1] * data.itemsize // 4) * 4 // data.itemsize
+                padding = _np.zeros((len(data), nComponents - data.shape[1]), dtype=data.dtype)
+                data = _np.hstack([data, padding])
+                byteStride = data.shape[1] * data.itemsize
             bufferViews.append(
                 BufferView(
-                    buffer=iBuffer,
-                    byteLength=len(tris_binary_blob),
-                    target=ELEMENT_ARRAY_BUFFER,
-                )
-            )
-            bufferViews.append(
-                BufferView(
-                    buffer=iBuffer,
-                    byteOffset=len(tris_binary_blob),
-                    byteLength=len(verts_binary_blob),
-                    target=ARRAY_BUFFER,
+                    buffer=0,
+                    byteOffset=len(blob),
+                    byteLength=data.nbytes,
+                    byteStride=byteStride,
+                    target=target,
                 )
             )
+            blob.extend(data.tobytes())
             accessors.append(
                 Accessor(
-                    bufferView=2 * iBuffer,
-                    componentType=UNSIGNED_INT,
-                    count=tris.size,
-                    type=SCALAR,
-                    max=[int(tris.max())],
-                    min=[int(tris.min())],
+                    bufferView=len(bufferViews) - 1,
+                    componentType=componentType,
+                    normalized=normalized,
+                    count=len(array),
+                    type=type,
+                    max=array.max(axis=0).tolist() if minMax else None,
+                    min=array.min(axis=0).tolist() if minMax else None,
                 )
             )
-            accessors.append(
-                Accessor(
-                    bufferView=2 * iBuffer + 1,
-                    componentType=FLOAT,
-                    count=int(verts.size / 3),
-                    type=VEC3,
-                    max=verts.max(axis=0).tolist(),
-                    min=verts.min(axis=0).tolist(),
+            return len(accessors) - 1
+
+        # unique geometries (by content) with their accessors and dequantisation transform
+        geometries = {}
+        key_geometry = {}
+        for k in self.localmeshes:
+            vertices, triangles, vertexNormals = self._gltfArrays(k, normals)
+            if len(triangles) == 0:
+                continue
+
+            digest = _hashlib.sha1(vertices.tobytes())
+            digest.update(triangles.tobytes())
+            if normals:
+                digest.update(vertexNormals.tobytes())
+            digest = digest.hexdigest()
+            key_geometry[k] = digest
+            if digest in geometries:
+                continue
+
+            if quantise:
+                # positions are stored in [-1, 1] and the node scales and translates them
+                vMin, vMax = vertices.min(axis=0), vertices.max(axis=0)
+                offset = (vMin + vMax) / 2
+                scale = float((vMax - vMin).max() / 2) or 1.0
+                quantised = _np.round((vertices - offset) / scale * 32767).astype(_np.int16)
+                position = addAccessor(quantised, SHORT, VEC3, ARRAY_BUFFER, True, True)
+            else:
+                offset, scale = _np.zeros(3), 1.0
+                verts = vertices.astype(_np.float32)
+                position = addAccessor(verts, FLOAT, VEC3, ARRAY_BUFFER, minMax=True)
+
+            attributes = Attributes(POSITION=position)
+            if normals and quantise:
+                quantisedNormals = _np.round(vertexNormals * 127).astype(_np.int8)
+                attributes.NORMAL = addAccessor(quantisedNormals, BYTE, VEC3, ARRAY_BUFFER, True)
+            elif normals:
+                attributes.NORMAL = addAccessor(
+                    vertexNormals.astype(_np.float32), FLOAT, VEC3, ARRAY_BUFFER
                 )
-            )
-            meshes.append(
-                Mesh(
-                    primitives=[
-                        Primitive(
-                            attributes=Attributes(POSITION=2 * iBuffer + 1),
-                            indices=2 * iBuffer,
-                            material=iBuffer,
-                        )
-                    ]
+
+            if len(vertices) < 2**16:
+                indices = addAccessor(
+                    triangles.reshape(-1, 1).astype(_np.uint16),
+                    UNSIGNED_SHORT,
+                    SCALAR,
+                    ELEMENT_ARRAY_BUFFER,
                 )
-            )
+            else:
+                indices = addAccessor(
+                    triangles.reshape(-1, 1).astype(_np.uint32),
+                    UNSIGNED_INT,
+                    SCALAR,
+                    ELEMENT_ARRAY_BUFFER,
+                )
+            geometries[digest] = (attributes, indices, offset, scale)
 
-            iBuffer += 1
+        # materials from the vis options and meshes for each geometry and material
+        materials = []
+        material_index = {}
+        meshes = []
+        mesh_index = {}
+        for k in key_geometry:
+            pyg4VisOpt = self.instanceVisOptions[k][0]
+            colour = [float(c) for c in pyg4VisOpt.colour[0:3]] + [float(pyg4VisOpt.alpha)]
+            if tuple(colour) not in material_index:
+                material_index[tuple(colour)] = len(materials)
+                materials.append(
+                    Material(
+                        pbrMetallicRoughness=PbrMetallicRoughness(
+                            baseColorFactor=colour, metallicFactor=0.0, roughnessFactor=0.5
+                        ),
+                        alphaMode="BLEND" if colour[3] < 1 else "OPAQUE",
+                        doubleSided=True,
+                    )
+                )
+            meshKey = (key_geometry[k], material_index[tuple(colour)])
+            if meshKey not in mesh_index:
+                attributes, indices = geometries[key_geometry[k]][0:2]
+                mesh_index[meshKey] = len(meshes)
+                meshes.append(
+                    Mesh(
+                        primitives=[
+                            Primitive(attributes=attributes, indices=indices, material=meshKey[1])
+                        ]
+                    )
+                )
+            key_geometry[k] = meshKey
 
         # loop over instances
-        iMesh = 0
+        nodes = []
         for k in self.instancePlacements:
-            iInstance = 0
-            for p in self.instancePlacements[k]:
-                t = p["translation"]
-                r = p["transformation"]
-                aa = _transformation.matrix2axisangle(r)
-                axis = aa[0]
-                angle = aa[1]
-
+            if k not in key_geometry:
+                continue
+            placements = self.instancePlacements[k]
+            if singleInstance:
+                placements = placements[0:1]
+            iMesh = mesh_index[key_geometry[k]]
+            offset, scale = geometries[key_geometry[k][0]][2:4]
+
+            # overlapping surfaces are made visible by shrinking deeper meshes
+            depthScale = 1 - 0.001 * self.instanceVisOptions[k][0].depth
+            offset, scale = offset * depthScale, scale * depthScale
+
+            translations, quaternions, scales, decomposable = _decomposePlacements(placements)
+            matrices = _np.array(
+                [_np.asarray(p["transformation"], dtype=float) for p in placements]
+            )
+            matrices = matrices.reshape(-1, 3, 3)
+            # dequantisation offset in the mesh frame
+            translations = translations + matrices @ offset
+            scales = scales * scale
+            # glTF quaternions are (x, y, z, w)
+            quaternions = quaternions[:, [1, 2, 3, 0]]
+
+            if gpuInstancing and decomposable.any():
+                attributes = {
+                    "TRANSLATION": translations[decomposable],
+                    "ROTATION": quaternions[decomposable],
+                    "SCALE": scales[decomposable],
+                }
+                for name, type in [("TRANSLATION", VEC3), ("ROTATION", VEC4), ("SCALE", VEC3)]:
+                    attributes[name] = addAccessor(
+                        attributes[name].astype(_np.float32), FLOAT, type
+                    )
                 nodes.append(
                     Node(
-                        name=k + "_" + str(iInstance),
+                        name=k,
                         mesh=iMesh,
-                        translation=[float(t[0]), float(t[1]), float(t[2])],
-                        rotation=[
-                            axis[0] * _np.sin(angle / 2),
-                            axis[1] * _np.sin(angle / 2),
-                            axis[2] * _np.sin(angle / 2),
-                            _np.cos(angle / 2),
-                        ],
+                        extensions={"EXT_mesh_gpu_instancing": {"attributes": attributes}},
                     )
                 )
 
-                # Only make a single instance
-                if singleInstance:
-                    break
-
-                iInstance += 1
-
-            iMesh += 1
+            for i in range(len(placements)):
+                if decomposable[i] and gpuInstancing:
+                    continue
+                elif decomposable[i]:
+                    nodes.append(
+                        Node(
+                            name=k + "_" + str(i),
+                            mesh=iMesh,
+                            translation=translations[i].tolist(),
+                            rotation=quaternions[i].tolist(),
+                            scale=scales[i].tolist(),
+                        )
+                    )
+                else:
+                    matrix = _np.identity(4)
+                    matrix[0:3, 0:3] = matrices[i] * scale
+                    matrix[0:3, 3] = translations[i]
+                    nodes.append(
+                        Node(
+                            name=k + "_" + str(i),
+                            mesh=iMesh,
+                            matrix=matrix.T.ravel().tolist(),  # column major
+                        )
+                    )
 
-        scene = Scene(nodes=list(range(0, len(nodes), 1)))
-        scenes.append(scene)
+        extensionsUsed = []
+        if quantise:
+            extensionsUsed.append("KHR_mesh_quantization")
+        if any(n.extensions for n in nodes):
+            extensionsUsed.append("EXT_mesh_gpu_instancing")
 
         gltf = GLTF2(
             scene=0,
-            scenes=scenes,
+            scenes=[Scene(nodes=list(range(0, len(nodes), 1)))],
             nodes=nodes,
             meshes=meshes,
             accessors=accessors,
             bufferViews=bufferViews,
-            buffers=buffers,
+            buffers=[Buffer(byteLength=len(blob))],
             materials=materials,
+            extensionsUsed=extensionsUsed,
+            extensionsRequired=list(extensionsUsed),
         )
 
-        if str(gltfFileName).find("gltf") != -1:
-            gltf.save_json(gltfFileName)
-        elif str(gltfFileName).find("glb") != -1:
-            glb = b"".join(gltf.save_to_bytes())
-            f = open(gltfFileName, "wb")
-            f.write(glb)
-            f.close()
+        if binary:
+            gltf.set_binary_blob(bytes(blob))
+            gltf.save_binary(str(gltfFileName))
         else:
-            _log.error("ViewerBase::exportGLTFScene> unknown gltf extension")
+            gltf.buffers[0].uri = "data:application/octet-stream;base64," + str(
+                _base64.b64encode(bytes(blob)).decode("utf-8")
+            )
+            gltf.save_json(str(gltfFileName))
+
+    def _gltfArrays(self, k, normals=False):
+        # triangles of a scene mesh (and split vertex normals) for export
+        if not normals:
+            vertices, indices, offsets = _meshToArrays(self.localmeshes[k])
+            return vertices, _fanTriangles(indices, offsets), None
+
+        import vtk as _vtk
+        from vtk.util.numpy_support import vtk_to_numpy as _vtk_to_numpy
+
+        triFlt = _vtk.vtkTriangleFilter()
+        triFlt.SetInputData(self._meshPolyData(k))
+        normFlt = _vtk.vtkPolyDataNormals()
+        normFlt.SetInputConnection(triFlt.GetOutputPort())
+        normFlt.SetFeatureAngle(30)
+        normFlt.SplittingOn()
+        normFlt.ConsistencyOff()
+        normFlt.Update()
+        pd = normFlt.GetOutput()
+        if pd.GetNumberOfPolys() == 0:
+            return _np.zeros((0, 3)), _np.zeros((0, 3), dtype=_np.int64), _np.zeros((0, 3))
+        vertices = _vtk_to_numpy(pd.GetPoints().GetData()).astype(_np.float64)
+        triangles = _vtk_to_numpy(pd.GetPolys().GetConnectivityArray()).reshape(-1, 3)
+        vertexNormals = _vtk_to_numpy(pd.GetPointData().GetNormals()).astype(_np.float64)
+        return vertices, triangles, vertexNormals
 
     def exportGLTFAssets(self, gltfFileName="test.gltf"):
         """Export all the assets (meshes) without all the instances. The position of the asset is
@@ -9,6 +9,7 @@ from .VisualisationOptions import (
     getPredefinedMaterialVisOptions as _getPredefinedMaterialVisOptions,
 )
 from . import Convert as _Convert
+from .MeshCache import _meshToArrays
 import logging as _log
 import random as _random
 
@@ -375,8 +376,7 @@ class VtkViewer:
 
     def addLogicalVolumeBounding(self, logical):
         # add logical solid as wireframe
-        lvm = logical.mesh.localmesh
-        lvmPD = _Convert.pycsgMeshToVtkPolyData(lvm)
+        lvmPD = logical.mesh.vtkPolyData()
         lvmFLT = _vtk.vtkTriangleFilter()
         lvmFLT.AddInputData(lvmPD)
         lvmMAP = _vtk.vtkPolyDataMapper()
@@ -522,14 +522,8 @@ class VtkViewer:
     def addMeshSimple(self, csgMesh, visOptions=_VisOptions(), clip=False, name="mesh"):
         if clip:
             csgMesh = csgMesh.clone()
-            verts, _, _ = csgMesh.toVerticesAndPolygons()
-            x = _np.array([v[0] for v in verts])
-            y = _np.array([v[1] for v in verts])
-            z = _np.array([v[2] for v in verts])
-            xsize = max(x) - min(x)
-            ysize = max(y) - min(y)
-            zsize = max(z) - min(z)
-            t = -_np.array([min(x) + xsize / 2.0, min(y) + ysize / 2.0, min(z) + ysize / 2.0])
+            vertices = _meshToArrays(csgMesh)[0]
+            t = -(vertices.min(axis=0) + vertices.max(axis=0)) / 2.0
             csgMesh.translate(t)
 
         self.addMesh(
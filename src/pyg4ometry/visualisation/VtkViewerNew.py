@@ -1,9 +1,13 @@
+import numpy as _np
 import vtk as _vtk
+import vtk.util.numpy_support as _numpy_support
+from vtk.util.vtkAlgorithm import VTKPythonAlgorithmBase as _VTKPythonAlgorithmBase
 
 from .. import transformation as _transformation
 from . import ViewerBase as _ViewerBase
 from . import Convert as _Convert
 from . import VisualisationOptions as _VisOptions
+from .ViewerBase import _decomposePlacements
 from .VisualisationOptions import (
     getPredefinedMaterialVisOptions as _getPredefinedMaterialVisOptions,
 )
@@ -11,6 +15,98 @@ from .VisualisationOptions import (
 # from pyg4ometry.pycgal.Polygon_mesh_processing import isotropic_remeshing as _isotropic_remeshing
 
 
+class _InstancedCutter(_VTKPythonAlgorithmBase):
+    """
+    Cut lines (in world coordinates) of all the instances of a triangulated polydata
+    with the plane GetCutFunction(). Used in place of a vtkCutter per instance.
+    """
+
+    def __init__(self, pd, placements):
+        super().__init__(nInputPorts=0, nOutputPorts=1, outputType="vtkPolyData")
+
+        self.vertices = _numpy_support.vtk_to_numpy(pd.GetPoints().GetData()).astype(float)
+        self.triangles = _numpy_support.vtk_to_numpy(pd.GetPolys().GetConnectivityArray()).reshape(
+            -1, 3
+        )
+        self.matrices = _np.array(
+            [_np.asarray(p["transformation"], dtype=float) for p in placements]
+        ).reshape(-1, 3, 3)
+        self.translations = _np.array(
+            [_np.asarray(p["translation"], dtype=float) for p in placements]
+        ).reshape(-1, 3)
+
+        self.plane = _vtk.vtkPlane()
+        self.plane.AddObserver("ModifiedEvent", lambda obj, event: self.Modified())
+
+    def GetCutFunction(self):
+        return self.plane
+
+    def cutLines(self):
+        normal = _np.array(self.plane.GetNormal())
+        origin = _np.array(self.plane.GetOrigin())
+
+        segments = []
+        chunk = max(1, 10000000 // max(1, len(self.vertices)))
+        for start in range(0, len(self.matrices), chunk):
+            matrices = self.matrices[start : start + chunk]
+            translations = self.translations[start : start + chunk]
+
+            # signed distances of the local vertices to the plane of each instance
+            localNormals = _np.einsum("nji,j->ni", matrices, normal)
+            distances = self.vertices @ localNormals.T - (origin - translations) @ normal
+            side = distances >= 0
+
+            # (triangle, instance) pairs crossing the plane
+            tSide = side[self.triangles]
+            iTri, iInst = _np.nonzero(tSide.any(axis=1) & ~tSide.all(axis=1))
+            if len(iTri) == 0:
+                continue
+
+            # crossing point of each edge, the two crossing edges of each triangle
+            points = []
+            crossing = []
+            for a, b in [(0, 1), (1, 2), (2, 0)]:
+                va = self.triangles[iTri, a]
+                vb = self.triangles[iTri, b]
+                da = distances[va, iInst]
+                db = distances[vb, iInst]
+                crossing.append(side[va, iInst] != side[vb, iInst])
+                with _np.errstate(divide="ignore", invalid="ignore"):
+                    f = _np.where(crossing[-1], da / (da - db), 0)
+                points.append(
+                    self.vertices[va] + f[:, None] * (self.vertices[vb] - self.vertices[va])
+                )
+            points = _np.stack(points, axis=1)
+            edges = _np.argsort(~_np.stack(crossing, axis=1), axis=1, kind="stable")[:, :2]
+            local = _np.take_along_axis(points, edges[:, :, None], axis=1)
+
+            # to world coordinates
+            world = _np.einsum("nij,nkj->nki", matrices[iInst], local) + translations[iInst, None]
+            segments.append(world.reshape(-1, 3))
+
+        return _np.concatenate(segments) if segments else _np.zeros((0, 3))
+
+    def RequestData(self, request, inInfo, outInfo):
+        points = self.cutLines()
+        nLines = len(points) // 2
+        idType = _numpy_support.get_vtk_to_numpy_typemap()[_vtk.VTK_ID_TYPE]
+
+        pnts = _vtk.vtkPoints()
+        pnts.SetData(_numpy_support.numpy_to_vtk(points, deep=1))
+        lines = _vtk.vtkCellArray()
+        lines.SetData(
+            _numpy_support.numpy_to_vtkIdTypeArray(
+                _np.arange(0, 2 * nLines + 1, 2, dtype=idType), deep=1
+            ),
+            _numpy_support.numpy_to_vtkIdTypeArray(_np.arange(2 * nLines, dtype=idType), deep=1),
+        )
+
+        output = _vtk.vtkPolyData.GetData(outInfo)
+        output.SetPoints(pnts)
+        output.SetLines(lines)
+        return 1
+
+
 class VtkViewerNew(_ViewerBase):
     """
     Visualiser.
@@ -72,6 +168,8 @@ class VtkViewerNew(_ViewerBase):
         self.axes = []  # axes actors
 
         self.instanceNameDict = {}  # instance transformation to PV name
+        self.instanceActors = {}  # instanced actor to mesh name and instance indices
+        self.clipperPlanes = []  # clipping planes of instanced mappers
 
         self.bBuiltPipelines = False
 
@@ -216,11 +314,18 @@ class VtkViewerNew(_ViewerBase):
             self.addCutter("clipperCutter", origin, normal)
 
     def setClipper(self, origin, normal):
+        self.clipperOrigin = origin
+        self.clipperNormal = normal
+
         for c in self.clippers:
             p = c.GetClipFunction()
             p.SetOrigin(*origin)
             p.SetNormal(*normal)
 
+        for p in self.clipperPlanes:
+            p.SetOrigin(*origin)
+            p.SetNormal(*(-_np.asarray(normal, dtype=float)))
+
         if self.bClipperCutter:
             self.setCutter("clipperCutter", origin, normal)
 
@@ -235,15 +340,15 @@ class VtkViewerNew(_ViewerBase):
             )
             raise RuntimeError(msg)
 
-        if len(self.clippers) == 0:
+        if len(self.clippers) == 0 and len(self.clipperPlanes) == 0:
             msg = "Need to add a clipping plane adding clipper widget e.g. v.addClipper([0, 0, 0], [0, 0, 1], True"
             raise RuntimeError(msg)
 
         plaRep = _vtk.vtkImplicitPlaneRepresentation()
         # plaRep.SetPlaceFactor(1.25)
         plaRep.PlaceWidget(next(iter(self.actors.values())).GetBounds())
-        plaRep.SetNormal(self.clippers[0].GetClipFunction().GetNormal())
-        plaRep.SetOrigin(self.clippers[0].GetClipFunction().GetOrigin())
+        plaRep.SetNormal(self.clipperNormal)
+        plaRep.SetOrigin(self.clipperOrigin)
 
         self.clipperPlaneWidget = _vtk.vtkImplicitPlaneWidget2()
         self.clipperPlaneWidget.SetInteractor(self.iren)
@@ -267,7 +372,7 @@ class VtkViewerNew(_ViewerBase):
     def buildPipelinesSeparate(self):
         # loop over meshes and create polydata
         for k in self.localmeshes:
-            pd = _Convert.pycsgMeshToVtkPolyData(self.localmeshes[k])
+            pd = self._meshPolyData(k)
             self.polydata[k] = pd
 
         # loop over polydata and create actors for instances
@@ -346,7 +451,7 @@ class VtkViewerNew(_ViewerBase):
     def buildPipelinesAppend(self):
         # loop over meshes and create polydata
         for k in self.localmeshes:
-            pd = _Convert.pycsgMeshToVtkPolyData(self.localmeshes[k])
+            pd = self._meshPolyData(k)
             # pd.SetObjectName(k)
             self.polydata[k] = pd
 
@@ -503,6 +608,129 @@ class VtkViewerNew(_ViewerBase):
 
         self.bBuiltPipelines = True
 
+    def buildPipelinesInstanced(self):
+        """
+        Build pipelines with one polydata per unique mesh. The instances are drawn by a
+        vtkGlyph3DMapper from their translations, rotations (quaternions) and scales, so
+        memory and build time scale with the number of unique meshes rather than
+        instances. Placements that are not a rotation times a scale get their own actor.
+
+        The cutters cut the unique polydata with the cutting plane in the frame of each
+        instance and so only the cut lines are made per instance. The clipper clips the
+        rendered instances (the clipped surfaces are not closed).
+        """
+        # loop over meshes and create triangulated polydata
+        for k in self.localmeshes:
+            triFlt = _vtk.vtkTriangleFilter()
+            triFlt.SetInputData(self._meshPolyData(k))
+            triFlt.Update()
+            self.polydata[k] = triFlt.GetOutput()
+
+        # mappers keep the side of the plane that vtkClipPolyData clips away
+        if self.clipperNormal is not None:
+            clipperPlane = _vtk.vtkPlane()
+            clipperPlane.SetOrigin(*self.clipperOrigin)
+            clipperPlane.SetNormal(*(-_np.asarray(self.clipperNormal, dtype=float)))
+            self.clipperPlanes.append(clipperPlane)
+
+        for k in self.instancePlacements:
+            vos = self.instanceVisOptions[k]  # (v)isualisation (o)ption(s)
+            ips = self.instancePlacements[k]  # (i)nstance (p)placement(s)
+            pd = self.polydata[k]
+
+            # instances with the same vis options share an actor
+            groups = {}
+            for i in range(len(ips)):
+                groups.setdefault(str(vos[i]), []).append(i)
+
+            for iGroup, indices in enumerate(groups.values()):
+                visOpt = vos[indices[0]]
+                name = k + "_instances_" + str(iGroup)
+                translations, quaternions, scales, glyph = _decomposePlacements(
+                    [ips[i] for i in indices]
+                )
+                glyphIndices = [i for i, g in zip(indices, glyph) if g]
+
+                actors = []
+                if glyphIndices:
+                    pnts = _vtk.vtkPoints()
+                    pnts.SetData(_numpy_support.numpy_to_vtk(translations[glyph], deep=1))
+                    instances = _vtk.vtkPolyData()
+                    instances.SetPoints(pnts)
+                    for arrayName, array in [
+                        ("orientation", quaternions[glyph]),
+                        ("scale", scales[glyph]),
+                    ]:
+                        vtkArray = _numpy_support.numpy_to_vtk(array, deep=1)
+                        vtkArray.SetName(arrayName)
+                        instances.GetPointData().AddArray(vtkArray)
+
+                    map = _vtk.vtkGlyph3DMapper()
+                    map.SetInputData(instances)
+                    map.SetSourceData(pd)
+                    map.SetOrientationArray("orientation")
+                    map.SetOrientationModeToQuaternion()
+                    map.SetScaleArray("scale")
+                    map.SetScaleModeToScaleByVectorComponents()
+                    map.ScalingOn()
+                    actor = _vtk.vtkActor()
+                    actor.SetMapper(map)
+                    actors.append(actor)
+                    self.instanceActors[actor] = (k, glyphIndices)
+                    self.actors[name] = actor
+
+                # general placements
+                for i in (i for i, g in zip(indices, glyph) if not g):
+                    map = _vtk.vtkPolyDataMapper()
+                    map.SetInputData(pd)
+                    actor = _vtk.vtkActor()
+                    actor.SetMapper(map)
+                    actor.SetUserMatrix(
+                        _Convert.pyg42VtkTransformation(
+                            ips[i]["transformation"], ips[i]["translation"]
+                        )
+                    )
+                    actors.append(actor)
+                    self.instanceActors[actor] = (k, [i])
+                    self.actors[name + "_" + str(i)] = actor
+
+                for actor in actors:
+                    map = actor.GetMapper()
+                    map.ScalarVisibilityOff()
+                    map.SetResolveCoincidentTopologyToPolygonOffset()
+                    map.SetRelativeCoincidentTopologyPolygonOffsetParameters(0, 3 * visOpt.depth)
+                    for clipperPlane in self.clipperPlanes:
+                        map.AddClippingPlane(clipperPlane)
+
+                    if visOpt.representation == "wireframe":
+                        actor.GetProperty().SetRepresentationToWireframe()
+
+                    actor.GetProperty().SetOpacity(visOpt.alpha)
+                    actor.GetProperty().SetColor(*visOpt.colour)
+
+                    self.ren.AddActor(actor)
+
+                # Add cutters
+                for ck in self.cutterOrigins:
+                    cutFlt = _InstancedCutter(pd, [ips[i] for i in indices])
+                    cutFlt.GetCutFunction().SetOrigin(*self.cutterOrigins[ck])
+                    cutFlt.GetCutFunction().SetNormal(*self.cutterNormals[ck])
+                    self.cutters.setdefault(ck, []).append(cutFlt)
+
+                    cutMap = _vtk.vtkPolyDataMapper()
+                    cutMap.ScalarVisibilityOff()
+                    cutMap.SetInputConnection(cutFlt.GetOutputPort())
+
+                    cutActor = _vtk.vtkActor()  # vtk(Actor)
+                    cutActor.SetMapper(cutMap)
+                    cutActor.GetProperty().SetLineWidth(2)
+                    cutActor.GetProperty().SetColor(*self.cutterColors[ck])
+                    cutActor.GetProperty().SetRepresentationToSurface()
+                    self.actors[name + "_" + ck] = cutActor
+                    self.ren.AddActor(cutActor)
+
+        self.bBuiltPipelines = True
+
     def buildPipelinesTransformed(self):
         pass
 
@@ -678,6 +906,11 @@ class MouseInteractorNamePhysicalVolume(_vtk.vtkInteractorStyleTrackballCamera):
         picker.Pick(clickPos[0], clickPos[1], 0, self.ren)
         actor = picker.GetActor()
 
+        # instanced actors are not cell pickable
+        if actor in self.vtkviewer.instanceActors:
+            self.pickInstance(actor, picker.GetPickPosition())
+            return
+
         pointPicker = _vtk.vtkPointPicker()
         pointPicker.Pick(clickPos[0], clickPos[1], 0, self.ren)
         # print("pointId>", pointPicker.GetPointId())
@@ -742,11 +975,52 @@ class MouseInteractorNamePhysicalVolume(_vtk.vtkInteractorStyleTrackballCamera):
 
         # print("minimum pd>", di, dmin, lvName, pvName, tba, tra, localExtent, globalExtent)
 
+        self.showHighLight(
+            appPolyData.GetInput(di), lvName, pvName, tba, tra, localExtent, globalExtent
+        )
+
+    def pickInstance(self, actor, point):
+        # closest instance of an instanced actor to the picked point
+        lvName, indices = self.vtkviewer.instanceActors[actor]
+        pd = self.vtkviewer.polydata[lvName]
+        placements = self.vtkviewer.instancePlacements[lvName]
+
+        pdd = _vtk.vtkImplicitPolyDataDistance()
+        pdd.SetInput(pd)
+        dmin = 1e99
+        for i in indices:
+            mtra = _np.asarray(placements[i]["transformation"], dtype=float)
+            tra = _np.asarray(placements[i]["translation"], dtype=float)
+            dist = abs(pdd.EvaluateFunction(*_np.linalg.solve(mtra, _np.array(point) - tra)))
+            if dist < dmin:
+                dmin = dist
+                placement = placements[i]
+
+        vtrans = _Convert.pyg42VtkTransformation(
+            placement["transformation"], placement["translation"]
+        )
+        traFlt = _vtk.vtkTransformFilter()
+        traFlt.SetInputData(pd)
+        traFlt.SetTransform(_vtk.vtkTransform())
+        traFlt.GetTransform().SetMatrix(vtrans)
+        traFlt.Update()
+
+        self.showHighLight(
+            traFlt.GetOutput(),
+            lvName,
+            placement["name"],
+            _transformation.matrix2tbxyz(placement["transformation"]),
+            placement["translation"],
+            pd.GetBounds(),
+            traFlt.GetOutput().GetBounds(),
+        )
+
+    def showHighLight(self, pd, lvName, pvName, tba, tra, localExtent, globalExtent):
         if self.highLightActor:
             self.ren.RemoveActor(self.highLightActor)
 
         highLightMapper = _vtk.vtkPolyDataMapper()
-        highLightMapper.SetInputData(appPolyData.GetInput(di))
+        highLightMapper.SetInputData(pd)
 
         self.highLightActor = _vtk.vtkActor()
         self.highLightActor.SetMapper(highLightMapper)
@@ -2,6 +2,7 @@ from .Mesh import Mesh
 from .Mesh import OverlapType
 from .Mesh import _getBoundingBox
 from .Mesh import _getBoundingBoxMesh
+from .MeshCache import MeshCache, meshCache
 from .VisualisationOptions import *
 from .VtkViewer import *
 from .ViewerBase import ViewerBase
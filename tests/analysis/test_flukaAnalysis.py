@@ -5,3 +5,353 @@ import T001_simple_dump
 
 def test_T001_simple_dump(tmptestdir):
     T001_simple_dump.Test(vis=False, interactive=False, fluka=True, outputPath=tmptestdir)
+
+
+def _writeUsrbin(fileName, grids, errors=None):
+    import struct
+    import numpy as np
+
+    def record(fd, data):
+        fd.write(struct.pack("=i", len(data)) + data + struct.pack("=i", len(data)))
+
+    with open(fileName, "wb") as fd:
+        record(fd, struct.pack("=80s32sfii", b"title", b"time", 1.0, 100, 1))
+        for i, grid in enumerate(grids):
+            n1, n2, n3 = grid.shape
+            header = struct.pack(
+                "=i10siiffifffifffififff",
+                i + 1,
+                b"det%d" % i,
+                0,
+                208,
+                -1,
+                1,
+                n1,
+                2.0 / n1,
+                -2,
+                2,
+                n2,
+                4.0 / n2,
+                -3,
+                3,
+                n3,
+                6.0 / n3,
+                0,
+                0,
+                0,
+                0,
+            )
+            record(fd, header)
+            record(fd, np.asarray(grid, dtype=np.float32).tobytes(order="F"))
+        if errors is not None:
+            record(fd, b"STATISTICS" + struct.pack("=i", 1))
+            for error in errors:
+                record(fd, np.asarray(error, dtype=np.float32).tobytes(order="F"))
+
+
+def test_UsrbinLazy(tmptestdir):
+    import numpy as np
+    from pyg4ometry.analysis.flukaData import Usrbin, sumUsrbin
+
+    rng = np.random.default_rng(1)
+    grids = [rng.random((4, 5, 6)), rng.random((3, 2, 7))]
+    errors = [rng.random((4, 5, 6)), rng.random((3, 2, 7))]
+    fileName = str(tmptestdir / "usrbinLazy_001_fort.21")
+    _writeUsrbin(fileName, grids, errors)
+
+    with open(fileName, "rb") as fd:
+        eager = Usrbin(fd)
+    lazy = Usrbin(fileName, lazy=True)
+
+    assert len(lazy.detector) == 2
+    assert lazy.stat_pos == eager.stat_pos
+    for e, l, grid in zip(eager.detector, lazy.detector, grids):
+        assert isinstance(l.data, np.memmap)
+        assert l.data.shape == e.data.shape == grid.shape
+        assert (l.data == e.data).all()
+        assert (l.errors == e.errors).all()
+        assert (l.data[1:3, :, 2] == grid.astype(np.float32)[1:3, :, 2]).all()
+        assert l.e2n == e.e2n
+        assert l.e3high == e.e3high
+
+    # no statistics
+    fileName2 = str(tmptestdir / "usrbinLazy_002_fort.21")
+    _writeUsrbin(fileName2, [2 * g for g in grids])
+    with open(fileName2, "rb") as fd:
+        assert Usrbin(fd).detector[0].errors is None
+    assert Usrbin(fileName2, lazy=True).detector[1].errors is None
+
+    summed = sumUsrbin([fileName, fileName2])
+    averaged = sumUsrbin([fileName, fileName2], average=True)
+    for s, a, grid in zip(summed, averaged, grids):
+        expected = 3 * grid.astype(np.float32).astype(np.float64)
+        assert np.allclose(s.data, expected)
+        assert s.errors is None
+        assert np.allclose(a.data, expected / 2)
+        assert np.allclose(a.errors, 1 / 3)
+
+
+def test_UsrbinLazyTruncated(tmptestdir):
+    import struct
+    import numpy as np
+    from pyg4ometry.analysis.flukaData import Usrbin
+
+    grids = [np.ones((4, 5, 6)), np.ones((3, 2, 7))]
+    fileName = str(tmptestdir / "usrbinTruncated_fort.21")
+    _writeUsrbin(fileName, grids, grids)
+    with open(fileName, "rb") as fd:
+        contents = fd.read()
+
+    # cut in a record, in a record marker and at the end of a record (a header without
+    # its data and statistics without the errors of the last detector)
+    titleSize = 4 + struct.calcsize("=80s32sfii") + 4
+    lastErrorsSize = 4 + 4 * 3 * 2 * 7 + 4
+    for size in [
+        len(contents) - 10,
+        len(contents) - lastErrorsSize + 2,
+        len(contents) - lastErrorsSize,
+        titleSize + 4 + 86 + 4,
+    ]:
+        with open(fileName, "wb") as fd:
+            fd.write(contents[:size])
+        with pytest.raises(OSError, match="fortran|record"):
+            Usrbin(fileName, lazy=True)
+
+    # a header that does not match its data record (e3n 5 rather than 6)
+    contents = bytearray(contents)
+    struct.pack_into("=i", contents, titleSize + 4 + struct.calcsize("=i10siiffifffifff"), 5)
+    with open(fileName, "wb") as fd:
+        fd.write(contents)
+    for lazy in [False, True]:
+        with pytest.raises(ValueError, match="shape"):
+            Usrbin(fileName, lazy=lazy)
+
+
+def test_UsrbdxLazyTruncated(tmptestdir):
+    import struct
+    import numpy as np
+    from pyg4ometry.analysis.flukaData import Usrbdx
+
+    def record(fd, data):
+        fd.write(struct.pack("=i", len(data)) + data + struct.pack("=i", len(data)))
+
+    def write(fileName, ne, data):
+        header = struct.pack(
+            "=i10siiiifiiiffifffif",
+            1,
+            b"bdx",
+            0,
+            1,
+            2,
+            3,
+            1.0,
+            1,
+            1,
+            0,
+            0.0,
+            1.0,
+            ne,
+            0.5,
+            0.0,
+            1.0,
+            2,
+            0.5,
+        )
+        with open(fileName, "wb") as fd:
+            record(fd, struct.pack("=80s32sfii", b"title", b"time", 1.0, 100, 1))
+            record(fd, header)
+            fd.write(data)
+
+    fileName = str(tmptestdir / "usrbdxTruncated_fort.22")
+    data = np.arange(6, dtype=np.float32).tobytes(order="F")
+    dataRecord = struct.pack("=i", len(data)) + data + struct.pack("=i", len(data))
+
+    write(fileName, 3, dataRecord)
+    with open(fileName, "rb") as fd:
+        eager = Usrbdx(fd)
+    lazy = Usrbdx(fileName, lazy=True)
+    assert (lazy.detector[0].data == eager.detector[0].data).all()
+
+    # a header without its data, a cut record marker and a cut record
+    for cut in [b"", dataRecord[:2], dataRecord[:-6]]:
+        write(fileName, 3, cut)
+        with pytest.raises(OSError, match="fortran|record"):
+            Usrbdx(fileName, lazy=True)
+
+    # a header that does not match its data record
+    write(fileName, 4, dataRecord)
+    for lazy in [False, True]:
+        with pytest.raises(ValueError, match="shape"):
+            Usrbdx(fileName, lazy=lazy)
+
+
+def _writeUsrdump(fileName, nEvents):
+    import struct
+    import numpy as np
+
+    def record(fd, data):
+        fd.write(struct.pack("=i", len(data)) + data + struct.pack("=i", len(data)))
+
+    with open(fileName, "wb") as fd:
+        for iEvent in range(nEvents):
+            # source, two tracks of iEvent + 1 and 2 segments with one deposit less than their
+            # segments, one energy deposit
+            record(fd, struct.pack("=iiiff", -(iEvent + 1), 1, 0, 10.0, 1.0))
+            record(fd, struct.pack("=i8f", 1, 10.0, 1.0, iEvent, 0, 0, 0, 0, 1))
+            for ntrack in [iEvent + 1, 2]:
+                record(fd, struct.pack("=iiiff", ntrack, ntrack - 1, 7, 5.0, 1.0))
+                points = np.arange(3 * (ntrack + 1), dtype=np.float32) + iEvent
+                deposits = 0.5 * np.arange(1, ntrack, dtype=np.float32)
+                ctrack = struct.pack("=f", 1.5 * ntrack)
+                record(fd, points.tobytes() + deposits.tobytes() + ctrack)
+            record(fd, struct.pack("=iiiff", 0, 11, 3, 2.0, 1.0))
+            record(fd, struct.pack("=4f", 1, 2, iEvent, 0.25))
+
+
+def test_UsrdumpIndex(tmptestdir):
+    import numpy as np
+    from pyg4ometry.analysis.flukaData import Usrdump
+
+    fileName = str(tmptestdir / "usrdumpIndex_001_MGDRAW")
+    indexFile = str(tmptestdir / "usrdumpIndex_001_MGDRAW.idx")
+    _writeUsrdump(fileName, 5)
+
+    dump = Usrdump(fileName, indexFile=indexFile)
+    assert len(dump) == 5
+    assert Usrdump(fileName, 3).event_seek.shape == (4,)
+
+    # sidecar index is read back
+    with open(fileName, "rb") as fd:
+        dump2 = Usrdump(fd, indexFile=indexFile)
+    assert (dump2.event_seek == dump.event_seek).all()
+
+    tracks, energy, sources, dtrack = dump.event(3)
+    assert len(tracks) == 4 + 2
+    assert (tracks["track"] == [0, 0, 0, 0, 1, 1]).all()
+    assert (tracks["jtrack"] == 7).all()
+    assert (tracks["ctrack"] == [6, 6, 6, 6, 3, 3]).all()
+    assert (dtrack["track"] == [0, 0, 0, 1]).all()
+    assert (dtrack["dtrack"] == [0.5, 1, 1.5, 0.5]).all()
+    assert (tracks["start"][1] == [6, 7, 8]).all()
+    assert (tracks["end"][1] == [9, 10, 11]).all()
+    assert len(energy) == 1
+    assert energy["icode"][0] == 11
+    assert (energy["position"][0] == [1, 2, 3]).all()
+    assert sources["ncase"][0] == 4
+    assert (sources["position"][0] == [3, 0, 0]).all()
+    assert (sources["direction"][0] == [0, 0, 1]).all()
+
+    with pytest.raises(IndexError):
+        dump.event(5)
+
+    dump.read_event(None, 0)
+    assert len(dump.track_data) == 3
+    assert (dump.dtrack_data["track"] == [1]).all()
+
+    pd = dump.trackDataToPolydata(np.concatenate([dump.event(i)[0] for i in range(len(dump))]))
+    assert pd.GetNumberOfLines() == 3 + 4 + 5 + 6 + 7
+    assert pd.GetNumberOfPoints() == 2 * pd.GetNumberOfLines()
+    assert pd.GetPoint(3) == (30, 40, 50)
+
+
+def test_UsrdumpStaleIndex(tmptestdir):
+    import os
+    import numpy as np
+    from pyg4ometry.analysis.flukaData import Usrdump
+
+    fileName = str(tmptestdir / "usrdumpStaleIndex_001_MGDRAW")
+    indexFile = str(tmptestdir / "usrdumpStaleIndex_001_MGDRAW.idx")
+    _writeUsrdump(fileName, 5)
+    seek = Usrdump(fileName, indexFile=indexFile).event_seek
+
+    def tamper():
+        # keep the key of the sidecar index but not its offsets
+        index = np.load(indexFile)
+        index[4:] += 1
+        with open(indexFile, "wb") as f:
+            np.save(f, index)
+
+    tamper()
+    assert (Usrdump(fileName, indexFile=indexFile).event_seek == seek + 1).all()
+
+    # same size and contents, newer modification time
+    stat = os.stat(fileName)
+    os.utime(fileName, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert (Usrdump(fileName, indexFile=indexFile).event_seek == seek).all()
+
+    # same size and modification time, different contents
+    tamper()
+    stat = os.stat(fileName)
+    with open(fileName, "r+b") as fd:
+        fd.seek(12)
+        fd.write(b"\x00\x00\x20\x41")
+    os.utime(fileName, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert (Usrdump(fileName, indexFile=indexFile).event_seek == seek).all()
+
+
+def test_UsrdumpPartialIndex(tmptestdir):
+    from pyg4ometry.analysis.flukaData import Usrdump
+
+    fileName = str(tmptestdir / "usrdumpPartialIndex_001_MGDRAW")
+    indexFile = str(tmptestdir / "usrdumpPartialIndex_001_MGDRAW.idx")
+    _writeUsrdump(fileName, 5)
+    seek = Usrdump(fileName).event_seek
+
+    # an index of fewer events than asked for is rebuilt, a larger one is sliced
+    assert len(Usrdump(fileName, 2, indexFile=indexFile)) == 2
+    assert (Usrdump(fileName, 10000, indexFile=indexFile).event_seek == seek).all()
+    assert (Usrdump(fileName, 3, indexFile=indexFile).event_seek == seek[:4]).all()
+    assert (Usrdump(fileName, 3).event_seek == seek[:4]).all()
+
+
+def test_MergeUsrbin(tmptestdir, monkeypatch):
+    import numpy as np
+    from pyg4ometry.analysis import flukaData
+    from pyg4ometry.analysis.flukaData import mergeUsrbin
+
+    rng = np.random.default_rng(2)
+    runs = [[rng.random((4, 5, 6)) + 1, rng.random((3, 2, 7)) + 1] for i in range(5)]
+    files = []
+    for i, grids in enumerate(runs):
+        files.append(str(tmptestdir / f"mergeUsrbin_{i:03d}_fort.21"))
+        _writeUsrbin(files[-1], grids)
+
+    # each file is indexed once rather than once per detector
+    nRead = []
+
+    class CountingUsrbin(flukaData.Usrbin):
+        def __init__(self, file, *args, **kwargs):
+            if type(file) is str:
+                nRead.append(file)
+            super().__init__(file, *args, **kwargs)
+
+    monkeypatch.setattr(flukaData, "Usrbin", CountingUsrbin)
+    merged = mergeUsrbin(files)
+    assert nRead == files
+    monkeypatch.undo()
+
+    for iDet, det in enumerate(merged):
+        x = np.array([grids[iDet].astype(np.float32) for grids in runs], dtype=np.float64)
+        mean = x.mean(axis=0)
+        error = x.std(axis=0, ddof=0) / np.sqrt(len(runs) - 1) / mean
+        assert np.allclose(det.data, mean)
+        assert np.allclose(det.errors, error)
+        assert det.ncase == 5 * 100
+        assert det.weight == 5
+
+    parallel = mergeUsrbin(files, nworkers=2)
+    for det, det2 in zip(merged, parallel):
+        assert np.allclose(det.data, det2.data)
+        assert np.allclose(det.errors, det2.errors)
+
+    other = str(tmptestdir / "mergeUsrbin_other_fort.21")
+    _writeUsrbin(other, [runs[0][0]])
+    with pytest.raises(ValueError, match="different detectors"):
+        mergeUsrbin([*files, other])
+
+    # feeds vtk directly, e1 fastest
+    grid = merged[0].binToVtkGrid()
+    assert grid.GetDimensions() == (4, 5, 6)
+    assert np.isclose(
+        grid.GetPointData().GetScalars().GetValue(1), np.log10(merged[0].data[1, 0, 0])
+    )
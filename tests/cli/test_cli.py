@@ -81,6 +81,10 @@ def test_cli_checkoverlaps_long(testdata):
     _cli.main(["-i", testdata["gdml/001_box.gdml"], "--checkoverlaps"], testing=True)
 
 
+def test_cli_checkoverlaps_jobs(testdata):
+    _cli.main(["-i", testdata["gdml/001_box.gdml"], "-c", "-j", "2"], testing=True)
+
+
 def test_cli_clip_short(testdata):
     _cli.main(
         ["-i", testdata["gdml/CompoundExamples/bdsim/vkickers.gdml"], "-C", "50,70,200"],
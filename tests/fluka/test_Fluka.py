@@ -1418,3 +1418,365 @@ def test_fluka_vis(tmptestdir, testdata):
     v = _VtkViewerNew()
     v.addFlukaRegions(r)
     v.buildPipelinesAppend()
+
+
+def test_BodyMeshCache():
+    from pyg4ometry.fluka import RPP, XYP, AABB
+
+    freg = FlukaRegistry()
+    rpp = RPP("RPP_BODY", 0, 10, 0, 10, 0, 10, flukaregistry=freg)
+    xyp = XYP("XYP_BODY", 5, flukaregistry=freg)
+    cache = freg.bodyMeshCache
+
+    # meshed once, copies are returned
+    m1 = rpp.mesh()
+    m2 = rpp.mesh()
+    assert m1 is not m2
+    assert cache.misses == 1
+    assert cache.hits == 1
+    m1.translate([100, 0, 0])
+    assert rpp.mesh().volume() == m2.volume()
+
+    # the aabb is part of the key for infinite bodies
+    aabb1 = AABB([0, 0, 0], [10, 10, 10])
+    aabb2 = AABB([0, 0, 0], [20, 20, 20])
+    xyp.mesh(aabb=aabb1)
+    xyp.mesh(aabb=aabb2)
+    xyp.mesh(aabb=AABB([0, 0, 0], [10, 10, 10]))
+    assert cache.misses == 3
+    assert cache.hits == 3
+
+    # editing a body gives a new mesh
+    rpp.upper = rpp.upper * 2
+    assert abs(rpp.mesh().volume() - 8000) < 1e-6
+    assert cache.misses == 4
+
+    # only the meshes of the body as it is now
+    assert len(cache) == 4
+    cache.invalidate(rpp)
+    assert len(cache) == 3
+
+
+def test_ZoneMeshBalancedBoolean():
+    from pyg4ometry.fluka import RPP, SPH, Zone, Region
+
+    freg = FlukaRegistry()
+    box = RPP("BOX", 0, 10, 0, 10, 0, 10, flukaregistry=freg)
+    z = Zone()
+    z.addIntersection(box)
+    for i in range(5):
+        z.addSubtraction(RPP(f"CUT{i}", 2 * i, 2 * i + 1, 0, 10, 0, 10, flukaregistry=freg))
+    # disjoint from the box so dropped
+    z.addSubtraction(SPH("FAR", [100, 0, 0], 1, flukaregistry=freg))
+    assert abs(z.mesh().volume() - 500) < 1e-6
+
+    # disjoint intersection is empty without any boolean
+    z2 = Zone()
+    z2.addIntersection(box)
+    z2.addIntersection(freg.getBody("FAR"))
+    assert z2.mesh().isNull()
+
+    region = Region("REG")
+    region.addZone(z)
+    z3 = Zone()
+    z3.addIntersection(RPP("BOX2", 20, 30, 0, 10, 0, 10, flukaregistry=freg))
+    region.addZone(z3)
+    region.addZone(z2)
+    assert abs(region.mesh().volume() - 1500) < 1e-6
+
+
+def test_RegionAABBsParallel():
+    from pyg4ometry.fluka import RPP, Zone, Region, AABB
+    import pyg4ometry.convert as convert
+
+    freg = FlukaRegistry()
+    for i in range(3):
+        box = RPP(f"BOX{i}", 0, 10, 0, 10, 20 * i, 20 * i + 10, flukaregistry=freg)
+        z1 = Zone()
+        z1.addIntersection(box)
+        # a subtraction so the zone is meshed rather than given its analytic extent
+        z1.addSubtraction(RPP(f"HOLE{i}", 2, 3, 2, 3, 20 * i + 2, 20 * i + 3, flukaregistry=freg))
+        z2 = Zone()
+        z2.addIntersection(RPP(f"TOP{i}", 0, 5, 0, 5, 20 * i + 10, 20 * i + 15, flukaregistry=freg))
+        region = Region(f"REG{i}")
+        region.addZone(z1)
+        region.addZone(z2)
+        freg.addRegion(region)
+        freg.assignma("COPPER", region)
+
+    serial = freg.regionAABBs()
+    parallel = freg.regionAABBs(nworkers=2)
+    assert list(parallel) == list(serial) == ["REG0", "REG1", "REG2"]
+    for name in serial:
+        assert serial[name] == parallel[name]
+    assert parallel["REG1"] == AABB([0, 0, 20], [10, 10, 35])
+
+    greg = convert.fluka2Geant4(freg, nworkers=2)
+    assert len(greg.logicalVolumeDict) == 4
+
+
+def test_AnalyticExtent():
+    from pyg4ometry.fluka import RPP, SPH, RCC, XYP, PLA, ZCC, QUA, Zone, Region, AABB
+    from pyg4ometry.fluka.region import regionZoneAABBs
+
+    freg = FlukaRegistry()
+    sph = SPH("SPH", [1, 2, 3], 5, flukaregistry=freg)
+    assert np.allclose(sph.analyticExtent(), [[-4, -3, -2], [6, 7, 8]])
+    rcc = RCC("RCC", [0, 0, 0], [0, 0, 10], 2, flukaregistry=freg)
+    assert np.allclose(rcc.analyticExtent(), [[-2, -2, 0], [2, 2, 10]])
+
+    # the mesh is contained in the analytic extent
+    rcc2 = RCC("RCC2", [0, 0, 0], [1, 2, 3], 2, flukaregistry=freg)
+    extent = rcc2.analyticExtent()
+    meshAABB = AABB.fromMesh(rcc2.mesh())
+    meshExtent = np.array([list(meshAABB.lower), list(meshAABB.upper)])
+    assert (extent[0] <= meshExtent[0] + 1e-9).all()
+    assert (extent[1] >= meshExtent[1] - 1e-9).all()
+    assert np.allclose(extent, meshExtent, atol=0.05)
+
+    # half spaces and infinite cylinders are only bounded perpendicular to them
+    xyp = XYP("XYP", 3, flukaregistry=freg)
+    assert np.allclose(xyp.analyticExtent(), [[-np.inf] * 3, [np.inf, np.inf, 3]])
+    pla = PLA("PLA", [0, 1, 1], [0, 0, 0], flukaregistry=freg)
+    assert np.isinf(pla.analyticExtent()).all()
+    zcc = ZCC("ZCC", 1, 1, 2, flukaregistry=freg)
+    assert np.allclose(zcc.analyticExtent(), [[-1, -1, -np.inf], [3, 3, np.inf]])
+    ellipsoid = QUA("QUA", 1, 1 / 4, 1 / 9, 0, 0, 0, 0, 0, 0, -1, flukaregistry=freg)
+    assert np.allclose(ellipsoid.analyticExtent(), [[-1, -2, -3], [1, 2, 3]])
+
+    # zones are the overlap of their intersections
+    z1 = Zone()
+    z1.addIntersection(zcc)
+    z1.addIntersection(xyp)
+    z1.addIntersection(RPP("RPP", -10, 10, -10, 10, 0, 10, flukaregistry=freg))
+    assert np.allclose(z1.analyticExtent(), [[-1, -1, 0], [3, 3, 3]])
+    z2 = Zone()
+    z2.addIntersection(rcc)
+    z2.addIntersection(SPH("FAR", [100, 0, 0], 1, flukaregistry=freg))
+    assert z2.analyticExtent() is None
+    z3 = Zone()
+    z3.addIntersection(RPP("RPP2", 0, 1, 0, 1, 0, 1, flukaregistry=freg))
+    z3.addIntersection(xyp)
+    region = Region("REG")
+    for zone in [z1, z2, z3]:
+        region.addZone(zone)
+    assert np.allclose(region.analyticExtent(), [[-1, -1, 0], [3, 3, 3]])
+
+    # empty and exact zones are not meshed
+    z2.mesh = z3.mesh = None
+    aabbs = regionZoneAABBs([region])["REG"]
+    assert aabbs[1] is None
+    assert aabbs[2] == AABB([0, 0, 0], [1, 1, 1])
+    assert np.allclose(list(aabbs[0].upper), [3, 3, 3], atol=0.05)
+
+
+def test_RegionConnectedZones():
+    from pyg4ometry.fluka import RPP, SPH, Zone, Region
+
+    freg = FlukaRegistry()
+    region = Region("REG")
+    # a chain of touching boxes, a separate pair of overlapping spheres and a lone box
+    for i in range(6):
+        z = Zone()
+        z.addIntersection(RPP(f"BOX{i}", 10 * i, 10 * i + 10, 0, 10, 0, 10, flukaregistry=freg))
+        region.addZone(z)
+    for i in range(2):
+        z = Zone()
+        z.addIntersection(SPH(f"SPH{i}", [5 * i, 100, 0], 4, flukaregistry=freg))
+        region.addZone(z)
+    z = Zone()
+    z.addIntersection(RPP("LONE", 0, 10, 0, 10, 50, 60, flukaregistry=freg))
+    region.addZone(z)
+
+    connected = sorted(sorted(c) for c in region.connectedZones())
+    assert connected == [[0, 1, 2, 3, 4, 5], [6, 7], [8]]
+
+    # the zone chain needs only one intersection per zone
+    graph = region.zoneGraph()
+    assert graph.number_of_edges() == 6
+
+    single = Region("SINGLE")
+    single.addZone(z)
+    assert single.connectedZones() == [{0}]
+
+
+def test_WriterStreams(tmptestdir):
+    import gzip
+    import io
+    from pyg4ometry.fluka import RPP, Zone, Region, Writer
+    from pyg4ometry.fluka.card import Card
+
+    freg = FlukaRegistry()
+    for i in range(3):
+        z = Zone()
+        z.addIntersection(RPP(f"BOX{i}", 0, 10, 0, 10, 10 * i, 10 * i + 10, flukaregistry=freg))
+        region = Region(f"REG{i}")
+        region.addZone(z)
+        freg.addRegion(region)
+        freg.assignma("COPPER", region)
+    freg.addTitle("A title longer than a FIXED format field")
+    freg.addDefaults()
+    freg.addCard(Card("BEAM", -1.23456789012345e-7, sdum="PROTON"))
+    freg.addCard(Card("USRBIN", 10.0, "ENERGY", -21.0, 1.0, 1.0, 1.0, "EDEP"))
+
+    w = Writer()
+    w.addDetector(freg)
+    fileName = tmptestdir / "writerStreams.inp"
+    w.write(fileName)
+    text = fileName.read_text()
+    assert text.splitlines() == list(w.lines())
+    assert text.count("BEAM") == 1
+
+    # any text or binary file-like object
+    stream = io.StringIO()
+    w.write(stream)
+    assert stream.getvalue() == text
+    binaryStream = io.BytesIO()
+    w.write(binaryStream)
+    assert binaryStream.getvalue().decode() == text
+
+    w.write(str(fileName) + ".gz")
+    with gzip.open(str(fileName) + ".gz", "rt") as f:
+        assert f.read() == text
+
+    # fixed format cards
+    lines = list(w.lines(fixed=True))
+    assert "FREE" not in lines
+    iTitle = lines.index("TITLE")
+    assert lines[iTitle + 1] == "A title longer than a FIXED format field"
+    assert Card.fromFixed(lines[iTitle + 2]).toList()[::7] == ["DEFAULTS", "EM-CASCA"]
+    fixedCards = [Card.fromFixed(l) for l in lines if l.startswith(("BEAM", "USRBIN", "ASSIGNMA"))]
+    assert [c.keyword for c in fixedCards] == ["BEAM", "ASSIGNMA", "ASSIGNMA", "ASSIGNMA", "USRBIN"]
+    assert abs(fixedCards[0].what1 + 1.23456789012345e-7) < 1e-10
+    assert fixedCards[0].sdum == "PROTON"
+    assert fixedCards[1].toList()[:3] == ["ASSIGNMA", "COPPER", "REG0"]
+    assert fixedCards[-1].toList() == ["USRBIN", 10.0, "ENERGY", -21.0, 1.0, 1.0, 1.0, "EDEP"]
+
+
+def test_WriterTransforms(tmptestdir):
+    from pyg4ometry.fluka import Reader, Writer
+
+    inp = tmptestdir / "writerTransforms.inp"
+    inp.write_text(
+        "GEOBEGIN                                                              COMBNAME\n"
+        "    0    0\n"
+        "$start_expansion 2.0\n"
+        "$start_translat 1.0 0.0 0.0\n"
+        "$start_transform ROTA\n"
+        "$start_transform -ROTB\n"
+        "RPP AA 0 1 0 2 0 3\n"
+        "$end_transform\n"
+        "$end_transform\n"
+        "$end_translat\n"
+        "$end_expansion\n"
+        "$start_transform ROTB\n"
+        "RPP BB 0 1 0 1 0 1\n"
+        "$end_transform\n"
+        "RPP WORLD -100 100 -100 100 -100 100\n"
+        "END\n"
+        "REGA 5 +AA\n"
+        "REGB 5 +BB\n"
+        "REGW 5 +WORLD -AA -BB\n"
+        "END\n"
+        "GEOEND\n"
+        "ROT-DEFI         3.0       0.0      30.0       0.0       0.0       0.0ROTA\n"
+        "ROT-DEFI       201.0       0.0       0.0       5.0       0.0       0.0ROTA\n"
+        "ROT-DEFI         2.0       0.0      45.0       0.0       1.0       0.0ROTB\n"
+    )
+    freg = Reader(str(inp)).flukaregistry
+
+    w = Writer()
+    w.addDetector(freg)
+    w.write(tmptestdir / "writerTransforms_out.inp")
+    freg2 = Reader(str(tmptestdir / "writerTransforms_out.inp")).flukaregistry
+
+    assert sorted(freg2.rotoTranslations) == ["ROTA", "ROTB"]
+    for name in ["AA", "BB", "WORLD"]:
+        transform = freg.bodyDict[name].transform
+        transform2 = freg2.bodyDict[name].transform
+        assert transform2.expansion == transform.expansion
+        assert transform2.invertRotoTranslation == transform.invertRotoTranslation
+        assert [r.name for r in transform2.rotoTranslation] == [
+            r.name for r in transform.rotoTranslation
+        ]
+        assert np.allclose(transform2.to4DMatrix(), transform.to4DMatrix())
+
+
+def test_RegionExpressionParser(tmptestdir):
+    import antlr4
+    from pyg4ometry.fluka import RPP, Reader
+    from pyg4ometry.fluka.region import Intersection, Zone
+    from pyg4ometry.fluka.reader import RegionExpressionParser, RegionSyntaxError, RegionVisitor
+    from pyg4ometry.fluka.RegionExpression import RegionLexer, RegionParser
+
+    def registry():
+        freg = FlukaRegistry()
+        for name in ["AA", "BB", "CC", "DD"]:
+            RPP(name, 0, 1, 0, 1, 0, 1, flukaregistry=freg)
+        return freg
+
+    def subZoneNames(zone):
+        names = []
+        for boolean in zone.intersections + zone.subtractions:
+            if isinstance(boolean.body, Zone):
+                names += [boolean.body.name, *subZoneNames(boolean.body)]
+        return names
+
+    # the same zone and subzone names as the ANTLR visitor
+    regionsBlock = (
+        "UNION 5 | +AA -( +BB -(+CC -DD) )\n"
+        "        | CC -DD\n"
+        "NESTED 5 | +AA -( BB -( +CC -(+DD -AA) ) +( +CC -DD) ) -(+CC -DD)\n"
+    )
+    regions = RegionExpressionParser(registry()).parse(regionsBlock)
+    fregANTLR = registry()
+    tokens = antlr4.CommonTokenStream(RegionLexer(antlr4.InputStream(regionsBlock)))
+    RegionVisitor(fregANTLR).visit(RegionParser(tokens).regions())
+    for region in regions:
+        regionANTLR = fregANTLR.regionDict[region.name]
+        assert [z.name for z in region.zones] == [z.name for z in regionANTLR.zones]
+        for zone, zoneANTLR in zip(region.zones, regionANTLR.zones):
+            assert subZoneNames(zone) == subZoneNames(zoneANTLR)
+            assert zone.dumps() == zoneANTLR.dumps()
+
+    freg = registry()
+    regions = RegionExpressionParser(freg).parse(
+        "* comment\n"
+        "SIMPLE 5 +AA -BB ! inline comment\n"
+        "UNION 5 | +AA -( +BB -(+CC -DD) )\n"
+        "        | CC -DD\n"
+        "ONESUB 5 | +( +AA -BB)\n"
+    )
+    assert [r.name for r in regions] == ["SIMPLE", "UNION", "ONESUB"]
+    simple, union, onesub = regions
+    assert [z.name for z in simple.zones] == ["SIMPLE_zone"]
+    assert simple.zones[0].dumps() == " +AA -BB"
+
+    assert [z.name for z in union.zones] == ["UNION_zone0", "UNION_zone1"]
+    subzone = union.zones[0].subtractions[0].body
+    assert isinstance(subzone, Zone)
+    assert subzone.name == "UNION_subzone2"
+    assert subzone.subtractions[0].body.name == "UNION_subzone2"
+    assert union.zones[0].dumps() == " +AA -( +BB -( +CC -DD))"
+    assert union.zones[1].dumps() == " +CC -DD"
+
+    assert isinstance(onesub.zones[0].intersections[0], Intersection)
+    assert onesub.zones[0].intersections[0].body.dumps() == " +AA -BB"
+
+    for bad in ["REG 5 +AA -", "REG 5 +AA |", "REG 5 +AA -(+BB", "REG +AA", "REG 5 +AA $"]:
+        with pytest.raises(RegionSyntaxError):
+            RegionExpressionParser(freg).parse(bad)
+
+    # syntax errors are reported by the ANTLR parser
+    inp = tmptestdir / "regionSyntaxError.inp"
+    inp.write_text(
+        "GEOBEGIN                                                              COMBNAME\n"
+        "    0    0\n"
+        "RPP AA 0 1 0 1 0 1\n"
+        "END\n"
+        "REG 5 +AA -\n"
+        "END\n"
+        "GEOEND\n"
+    )
+    with pytest.raises(antlr4.error.Errors.ParseCancellationException):
+        Reader(str(inp))
@@ -646,3 +646,43 @@ def test_GdmlDefine_MatrixGetItemInRegistry():
     mat = pyg4ometry.gdml.Matrix("mat", 2, [1, 2, 3, 4, 5, 6, 7, 8, 9, 10], r, True)
     v = mat[0, 0]
     assert v.expression.expressionString == "mat[1,1]"
+
+
+# #############################
+# Compiled expressions
+# #############################
+def test_GdmlDefine_CompiledExpressionMatchesParseTree():
+    r = pyg4ometry.geant4.Registry()
+    pyg4ometry.gdml.Constant("a", "-2", r)
+    pyg4ometry.gdml.Constant("b", "3*cm", r)
+    pyg4ometry.gdml.Matrix("mat", 2, [1, 2, 3, 4, 5, 6, 7, 8, 9, 10], r, True)
+
+    parser = r.getExpressionParser()
+    for expressionString in [
+        "1.5e3",
+        "2*mm",
+        "-a",
+        "a+b-3*a/b",
+        "a^2^0.5",
+        "-(a+b)*2",
+        "sin(pi/4)+cos(a)*tan(0.1)",
+        "pow(b,2)+sqrt(abs(a))+log10(b)+log(b)+exp(a)",
+        "mat[2,3]*mat[1,1]+b",
+        "min(a,b)+max(a,b)",
+    ]:
+        expected = parser.evaluate(parser.parse(expressionString), r.defineDict)
+        assert pyg4ometry.gdml.Defines.BasicExpression("", expressionString, r).eval() == expected
+
+
+def test_GdmlDefine_CompiledExpressionDefineChange():
+    r = pyg4ometry.geant4.Registry()
+    a = pyg4ometry.gdml.Constant("a", "2", r)
+    b = pyg4ometry.gdml.Constant("b", "a*a+1", r)
+    assert b.eval() == 5
+
+    # the compiled expression of b picks up the new value of a
+    a.setExpression("3")
+    assert b.eval() == 10
+
+    b.expression.expressionString = "a*a-1"
+    assert b.eval() == 8
@@ -815,6 +815,168 @@ def test_GdmlLoad_Entity(testdata):
     # registry, writtenFilename = pyg4ometryLoadWriteTest(testdata["gdml/203_temp.gdml"])
 
 
+_streamingGdml = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE gdml [
+<!ENTITY materials SYSTEM "streaming_materials.xml">
+]>
+<gdml xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <define>
+    <constant name="hx" value="50"/>
+    <expression name="hy">
+      2*hx
+    </expression>
+    <position name="p1" x="10" y="0" z="0" unit="mm"/>
+  </define>
+  &materials;
+  <solids>
+    <box name="ws" x="1000" y="1000" z="1000" lunit="mm"/>
+    <box name="bs" x="hx" y="hy" z="100" lunit="mm"/>
+  </solids>
+  <structure>
+    <volume name="bl">
+      <materialref ref="mat"/>
+      <solidref ref="bs"/>
+    </volume>
+    <volume name="wl">
+      <materialref ref="G4_Galactic"/>
+      <solidref ref="ws"/>
+      <physvol name="bp">
+        <volumeref ref="bl"/>
+        <positionref ref="p1"/>
+      </physvol>
+    </volume>
+  </structure>
+  <userinfo>
+    <auxiliary auxtype="Property" auxvalue="Value"/>
+  </userinfo>
+  <setup name="Default" version="1.0">
+    <world ref="wl"/>
+  </setup>
+</gdml>
+"""
+
+_streamingMaterials = """<materials>
+  <element name="H" formula="H" Z="1"><atom value="1.01"/></element>
+  <material name="mat" state="solid">
+    <D value="1.0" unit="g/cm3"/>
+    <fraction n="1.0" ref="H"/>
+  </material>
+</materials>
+"""
+
+
+def test_GdmlLoad_Streaming(tmptestdir):
+    with open(tmptestdir / "streaming_materials.xml", "w") as f:
+        f.write(_streamingMaterials)
+    filename = str(tmptestdir / "streaming.gdml")
+    with open(filename, "w") as f:
+        f.write(_streamingGdml)
+
+    r1 = pyg4ometry.gdml.Reader(filename).getRegistry()
+    r2 = pyg4ometry.gdml.Reader(filename, streaming=True).getRegistry()
+
+    for r in [r1, r2]:
+        assert r.getWorldVolume().name == "wl"
+        assert r.defineDict["hy"].eval() == 100
+        assert r.logicalVolumeDict["bl"].material.name == "mat"
+        assert len(r.userInfo) == 1
+    for d in ["defineDict", "materialDict", "solidDict", "logicalVolumeDict", "physicalVolumeDict"]:
+        assert list(getattr(r1, d)) == list(getattr(r2, d))
+
+
+_streamingReplicaGdml = """<?xml version="1.0" encoding="UTF-8"?>
+<gdml xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <define>
+    <rotation name="r1" x="0" y="0" z="0" unit="rad"/>
+    <position name="p1" x="0" y="0" z="-50" unit="mm"/>
+    <rotation name="r2" x="0" y="0" z="0.1" unit="rad"/>
+    <position name="p2" x="0" y="0" z="50" unit="mm"/>
+  </define>
+  <materials/>
+  <solids>
+    <box name="ws" x="1000" y="1000" z="1000" lunit="mm"/>
+    <box name="bs" x="100" y="100" z="100" lunit="mm"/>
+    <box name="ms" x="100" y="400" z="100" lunit="mm"/>
+    <box name="ps" x="10" y="10" z="10" lunit="mm"/>
+    <box name="cs" x="300" y="300" z="300" lunit="mm"/>
+  </solids>
+  <structure>
+    <volume name="bl">
+      <materialref ref="G4_Fe"/>
+      <solidref ref="bs"/>
+    </volume>
+    <volume name="ml">
+      <materialref ref="G4_Galactic"/>
+      <solidref ref="ms"/>
+      <replicavol number="4">
+        <volumeref ref="bl"/>
+        <replicate_along_axis>
+          <direction y="1"/>
+          <width value="100.0" unit="mm"/>
+          <offset value="0.0" unit="mm"/>
+        </replicate_along_axis>
+      </replicavol>
+    </volume>
+    <volume name="pl">
+      <materialref ref="G4_Fe"/>
+      <solidref ref="ps"/>
+    </volume>
+    <volume name="cl">
+      <materialref ref="G4_Galactic"/>
+      <solidref ref="cs"/>
+      <paramvol ncopies="2">
+        <volumeref ref="pl"/>
+        <parameterised_position_size>
+          <parameters number="1">
+            <positionref ref="p1"/>
+            <rotationref ref="r1"/>
+            <box_dimensions x="10" y="10" z="10" lunit="mm"/>
+          </parameters>
+          <parameters number="2">
+            <positionref ref="p2"/>
+            <rotationref ref="r2"/>
+            <box_dimensions x="20" y="20" z="20" lunit="mm"/>
+          </parameters>
+        </parameterised_position_size>
+      </paramvol>
+    </volume>
+    <volume name="wl">
+      <materialref ref="G4_Galactic"/>
+      <solidref ref="ws"/>
+      <physvol name="mp">
+        <volumeref ref="ml"/>
+        <position name="mp_pos" x="0" y="200" z="0" unit="mm"/>
+      </physvol>
+      <physvol name="cp">
+        <volumeref ref="cl"/>
+        <position name="cp_pos" x="0" y="-200" z="0" unit="mm"/>
+      </physvol>
+    </volume>
+  </structure>
+  <setup name="Default" version="1.0">
+    <world ref="wl"/>
+  </setup>
+</gdml>
+"""
+
+
+def test_GdmlLoad_StreamingReplicaParameterised(tmptestdir):
+    filename = str(tmptestdir / "streaming_replica.gdml")
+    with open(filename, "w") as f:
+        f.write(_streamingReplicaGdml)
+
+    r1 = pyg4ometry.gdml.Reader(filename).getRegistry()
+    r2 = pyg4ometry.gdml.Reader(filename, streaming=True).getRegistry()
+
+    for r in [r1, r2]:
+        replica = r.logicalVolumeDict["ml"].daughterVolumes[0]
+        assert replica.axis == pyg4ometry.geant4.ReplicaVolume.Axis.kYAxis
+        parameterised = r.logicalVolumeDict["cl"].daughterVolumes[0]
+        assert parameterised.paramData[1].pX.eval() == 20
+    for d in ["defineDict", "solidDict", "logicalVolumeDict", "physicalVolumeDict"]:
+        assert list(getattr(r1, d)) == list(getattr(r2, d))
+
+
 def test_GdmlLoad_300_MalformedGdml(testdata):
     import xml.parsers.expat as _expat
 
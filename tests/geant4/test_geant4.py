@@ -293,6 +293,214 @@ def test_Python_ExceptionIdenticalNameError():
         pass
 
 
+# #############################
+# Overlap checking
+# #############################
+def test_Python_OverlapSweepAndPrune():
+    from pyg4ometry.meshutils import SweepAndPrune
+
+    extents = [
+        [[0, 0, 0], [1, 1, 1]],
+        [[5, 5, 5], [6, 6, 6]],
+        [[0.5, 0.5, 0.5], [2, 2, 2]],
+        [[1, 0.4, 0.4], [1.5, 0.6, 0.6]],  # touches 0, overlaps 2
+        [[0.5, 3, 0], [1, 4, 1]],  # overlaps in x only
+    ]
+    assert SweepAndPrune(extents) == [(0, 2), (0, 3), (2, 3)]
+    assert SweepAndPrune(extents[:1]) == []
+
+
+def _overlapRow(reg):
+    import pyg4ometry
+
+    ws = pyg4ometry.geant4.solid.Box("ws", 1000, 100, 100, reg, "mm")
+    bs = pyg4ometry.geant4.solid.Box("bs", 10, 10, 10, reg, "mm")
+    wl = pyg4ometry.geant4.LogicalVolume(ws, "G4_Galactic", "wl", reg)
+    bl = pyg4ometry.geant4.LogicalVolume(bs, "G4_Fe", "bl", reg)
+    for i in range(20):
+        pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [-400 + 20 * i, 0, 0], bl, f"b{i}", wl, reg)
+    # overlaps b0 and protrudes from the mother
+    pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [-395, 0, 0], bl, "bo1", wl, reg)
+    pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [498, 0, 0], bl, "bo2", wl, reg)
+    return wl
+
+
+def test_Python_OverlapBroadPhase():
+    import pyg4ometry
+
+    reg = pyg4ometry.geant4.Registry()
+    wl = _overlapRow(reg)
+
+    nOverlaps = [0]
+    wl.checkOverlaps(nOverlapsDetected=nOverlaps)
+    assert nOverlaps[0] == 2
+    overlapTypes = sorted(m[1] for m in wl.mesh.overlapmeshes)
+    assert overlapTypes == [
+        pyg4ometry.visualisation.OverlapType.protrusion,
+        pyg4ometry.visualisation.OverlapType.overlap,
+    ]
+
+
+def test_Python_OverlapParallel():
+    import pyg4ometry
+
+    def overlaps(nworkers):
+        reg = pyg4ometry.geant4.Registry()
+        wl = _overlapRow(reg)
+        # place the row twice (overlapping) so there are two logical volumes to check
+        world = pyg4ometry.geant4.solid.Box("world", 2000, 1000, 1000, reg, "mm")
+        worldl = pyg4ometry.geant4.LogicalVolume(world, "G4_Galactic", "worldl", reg)
+        pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [0, -200, 0], wl, "w1", worldl, reg)
+        pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [0, -120, 0], wl, "w2", worldl, reg)
+
+        # a replica (the replicated volume is not checked) of a volume with overlapping daughters
+        rs = pyg4ometry.geant4.solid.Box("rs", 100, 100, 100, reg, "mm")
+        rl = pyg4ometry.geant4.LogicalVolume(rs, "G4_Galactic", "rl", reg)
+        ds = pyg4ometry.geant4.solid.Box("ds", 60, 60, 60, reg, "mm")
+        dl = pyg4ometry.geant4.LogicalVolume(ds, "G4_Fe", "dl", reg)
+        pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [-10, 0, 0], dl, "d1", rl, reg)
+        pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [10, 0, 0], dl, "d2", rl, reg)
+        ms = pyg4ometry.geant4.solid.Box("ms", 400, 100, 100, reg, "mm")
+        ml = pyg4ometry.geant4.LogicalVolume(ms, "G4_Galactic", "ml", reg)
+        pyg4ometry.geant4.ReplicaVolume(
+            "rr", rl, ml, pyg4ometry.geant4.ReplicaVolume.Axis.kXAxis, 4, 100, 0, reg, True
+        )
+        pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [0, 300, 0], ml, "m1", worldl, reg)
+
+        nOverlaps = [0]
+        worldl.checkOverlaps(recursive=True, nOverlapsDetected=nOverlaps, nworkers=nworkers)
+        return nOverlaps[0], [
+            [(m[1], m[0].vertexCount(), m[0].polygonCount()) for m in lv.mesh.overlapmeshes]
+            for lv in [worldl, wl, ml, rl]
+        ]
+
+    serial = overlaps(1)
+    assert serial[0] == 3
+    assert serial[1][3] == []
+    assert overlaps(2) == serial
+
+
+# #############################
+# Define dependencies
+# #############################
+def _defineRegistry():
+    import pyg4ometry
+
+    reg = pyg4ometry.geant4.Registry()
+    r = pyg4ometry.gdml.Constant("r", "10", reg)
+    l = pyg4ometry.gdml.Constant("l", "2*r", reg)
+    x = pyg4ometry.gdml.Constant("x", "100", reg)
+    ws = pyg4ometry.geant4.solid.Box("ws", 1000, 1000, 1000, reg)
+    wl = pyg4ometry.geant4.LogicalVolume(ws, "G4_Galactic", "wl", reg)
+    t = pyg4ometry.geant4.solid.Tubs("t", 0, r, 100, 0, "2*pi", reg)
+    b = pyg4ometry.geant4.solid.Box("b", l, 10, 10, reg)
+    bb = pyg4ometry.geant4.solid.Box("bb", 20, 20, 20, reg)
+    u = pyg4ometry.geant4.solid.Union("u", bb, b, [[0, 0, 0], [0, 0, 10]], reg)
+    tl = pyg4ometry.geant4.LogicalVolume(t, "G4_Fe", "tl", reg)
+    ul = pyg4ometry.geant4.LogicalVolume(u, "G4_Fe", "ul", reg)
+    bbl = pyg4ometry.geant4.LogicalVolume(bb, "G4_Fe", "bbl", reg)
+    pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [-200, 0, 0], tl, "tp", wl, reg)
+    pyg4ometry.geant4.PhysicalVolume([0, 0, 0], ["x", 0, 0], ul, "up", wl, reg)
+    pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [0, 200, 0], bbl, "bbp", wl, reg)
+    return reg
+
+
+def test_Python_DefineDependents():
+    reg = _defineRegistry()
+
+    defines, solids, lvs, pvs = reg.defineDependents("r")
+    assert defines == ["l"]
+    assert sorted(s.name for s in solids) == ["b", "t", "u"]
+    assert sorted(lv.name for lv in lvs) == ["tl", "ul"]
+    assert sorted(pv.name for pv in pvs) == ["tp", "up"]
+
+    defines, solids, lvs, pvs = reg.defineDependents("x")
+    assert defines == []
+    assert solids == []
+    assert lvs == []
+    assert [pv.name for pv in pvs] == ["up"]
+
+
+def test_Python_UpdateDefine():
+    reg = _defineRegistry()
+    lvs = reg.logicalVolumeDict
+    meshes = {name: lv.mesh for name, lv in lvs.items()}
+
+    reg.updateDefine("l", 40)
+    assert lvs["ul"].mesh is not meshes["ul"]
+    for name in ["wl", "tl", "bbl"]:
+        assert lvs[name].mesh is meshes[name]
+    assert lvs["ul"].mesh.getBoundingBox()[1][0] == 20
+
+    reg.updateDefine("r", 20)
+    assert reg.defineDict["l"].eval() == 40
+    assert lvs["tl"].mesh.getBoundingBox()[1][0] == 20
+    assert lvs["wl"].mesh is meshes["wl"]
+
+
+# #############################
+# Lazy meshing
+# #############################
+def test_Python_LazyMeshing():
+    import threading
+    import pyg4ometry
+
+    pyg4ometry.config.lazyMeshing = True
+    try:
+        reg = _defineRegistry()
+    finally:
+        pyg4ometry.config.lazyMeshing = False
+    lvs = reg.logicalVolumeDict
+
+    # nothing is meshed on construction
+    assert all(lv._mesh is None for lv in lvs.values())
+
+    # built once on first access, also when accessed from several threads
+    meshes = []
+    threads = [threading.Thread(target=lambda: meshes.append(lvs["tl"].mesh)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert meshes[0] is not None
+    assert all(m is meshes[0] for m in meshes)
+
+    # extent meshes the volumes it needs
+    assert lvs["wl"].extent(includeBoundingSolid=True)[1][0] == 500
+    lvs["wl"].extent()
+    assert lvs["ul"]._mesh is not None
+
+
+# #############################
+# Daughter subtracted mesh
+# #############################
+def test_Python_DaughterSubtractedMesh():
+    import pyg4ometry
+
+    reg = pyg4ometry.geant4.Registry()
+    ms = pyg4ometry.geant4.solid.Box("ms", 100, 100, 100, reg)
+    ds = pyg4ometry.geant4.solid.Box("ds", 10, 20, 30, reg)
+    ml = pyg4ometry.geant4.LogicalVolume(ms, "G4_Galactic", "ml", reg)
+    dl = pyg4ometry.geant4.LogicalVolume(ds, "G4_Fe", "dl", reg)
+    pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [-30, 0, 0], dl, "d0", ml, reg)
+    pyg4ometry.geant4.PhysicalVolume([0, 0, 0.5], [30, 0, 0], dl, "d1", ml, reg)
+    # outside the extent of the mother so skipped
+    pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [300, 0, 0], dl, "d2", ml, reg)
+
+    mesh = ml.daughterSubtractedMesh()
+    assert abs(mesh.volume() - (100**3 - 2 * 10 * 20 * 30)) < 1e-6
+    assert ml.mesh.localmesh.volume() == 100**3
+    assert ml.daughterSubtractedMesh() is mesh
+
+    # remade when the daughters change
+    pv = pyg4ometry.geant4.PhysicalVolume([0, 0, 0], [0, 30, 0], dl, "d3", ml, reg)
+    mesh2 = ml.daughterSubtractedMesh()
+    assert mesh2 is not mesh
+    assert abs(mesh2.volume() - (100**3 - 3 * 10 * 20 * 30)) < 1e-6
+    pv.position = pyg4ometry.gdml.Defines.Position("p3", 0, 300, 0, "mm", reg, False)
+    assert abs(ml.daughterSubtractedMesh().volume() - mesh.volume()) < 1e-6
+
+
 ##############################
 # VtkVisualisation
 ##############################
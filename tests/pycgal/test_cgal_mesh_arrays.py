@@ -0,0 +1,60 @@
+import numpy as _np
+import pyg4ometry
+import pyg4ometry.pycgal as _cgal
+
+
+def test_cgal_fromArrays_cube():
+    # each face has its own vertices, coincident vertices are merged
+    corners = _np.array([[x, y, z] for x in [-1, 1] for y in [-1, 1] for z in [-1, 1]])
+    quads = _np.array(
+        [[0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1], [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3]]
+    )
+    vertices = corners[quads].reshape(-1, 3)
+    faces = _np.arange(len(vertices)).reshape(-1, 4)
+
+    c = _cgal.CSG.fromArrays(vertices, faces)
+
+    assert c.vertexCount() == 8
+    assert c.polygonCount() == 12
+    assert c.isClosed()
+    assert _cgal.CGAL.is_outward_oriented(c.sm)
+    assert abs(c.volume() - 8) < 1e-9
+
+
+def test_cgal_fromArrays_solids():
+    reg = pyg4ometry.geant4.Registry()
+    n = 64
+    t = pyg4ometry.geant4.solid.Tubs("t", 10, 20, 100, 0, "2*pi", reg, nslice=n)
+    s = pyg4ometry.geant4.solid.Sphere("s", 10, 20, 0.4, 2.0, 0.3, 1.9, reg, nslice=16, nstack=12)
+    p = pyg4ometry.geant4.solid.Polycone(
+        "p", 0.2, 2.5, [-10, 0, 10, 20], [1, 2, 5, 1], [10, 20, 20, 8], reg, nslice=24
+    )
+
+    tm = t.mesh()
+    assert tm.isClosed()
+    assert tm.polygonCount() == 8 * n
+    volume = n / 2 * _np.sin(2 * _np.pi / n) * (20**2 - 10**2) * 100
+    assert abs(tm.volume() - volume) < 1e-6 * volume
+
+    for m in [s.mesh(), p.mesh()]:
+        assert m.isClosed()
+        assert m.isOutwardOriented()
+
+
+def test_cgal_toArrays():
+    c = _cgal.CSG.cube(radius=[1, 2, 3])
+    vertices, triangles = c.toArrays()
+
+    assert vertices.dtype == _np.float64
+    assert vertices.shape == (8, 3)
+    assert triangles.dtype == _np.int32
+    assert triangles.shape == (12, 3)
+    assert (vertices.min(axis=0) == [-1, -2, -3]).all()
+    assert (vertices.max(axis=0) == [1, 2, 3]).all()
+    assert c.minEdgeLength() == 2
+    assert abs(c.maxEdgeLength() - _np.sqrt(4**2 + 6**2)) < 1e-12
+
+    # round trip
+    c2 = _cgal.CSG.fromArrays(vertices, triangles)
+    assert c2.polygonCount() == 12
+    assert abs(c2.volume() - 48) < 1e-9
@@ -0,0 +1,129 @@
+import pyg4ometry as _pyg4
+from pyg4ometry.visualisation.MeshCache import meshKey
+
+
+def _tubsRegistry():
+    reg = _pyg4.geant4.Registry()
+    r = _pyg4.gdml.Defines.Constant("r", "10", reg)
+    ws = _pyg4.geant4.solid.Box("ws", 1000, 1000, 1000, reg)
+    wl = _pyg4.geant4.LogicalVolume(ws, "G4_Galactic", "wl", reg)
+    t1 = _pyg4.geant4.solid.Tubs("t1", 0, r, 100, 0, "2*pi", reg)
+    t2 = _pyg4.geant4.solid.Tubs("t2", 0, 10, 100, 0, "2*pi", reg)
+    t3 = _pyg4.geant4.solid.Tubs("t3", 0, 1, 10, 0, "2*pi", reg, lunit="cm")
+    t4 = _pyg4.geant4.solid.Tubs("t4", 0, 10, 100, 0, "2*pi", reg, nslice=32)
+    return reg, r, [t1, t2, t3, t4]
+
+
+def test_MeshCache_key():
+    reg, r, (t1, t2, t3, t4) = _tubsRegistry()
+
+    # same evaluated parameters (incl. units) give the same key
+    assert meshKey(t1) == meshKey(t2)
+    assert meshKey(t1) == meshKey(t3)
+
+    # mesh settings are part of the key
+    assert meshKey(t1) != meshKey(t4)
+
+    # changing a define changes the key
+    r.setExpression(20)
+    assert meshKey(t1) != meshKey(t2)
+
+
+def test_MeshCache_keyComposite():
+    reg, r, (t1, t2, t3, t4) = _tubsRegistry()
+
+    # booleans are keyed on their constituents and transformation
+    u1 = _pyg4.geant4.solid.Union("u1", t1, t4, [[0, 0, 0], [0, 0, 50]], reg)
+    u2 = _pyg4.geant4.solid.Union("u2", t2, t4, [[0, 0, 0], [0, 0, 50]], reg)
+    u3 = _pyg4.geant4.solid.Union("u3", t2, t4, [[0, 0, 0], [0, 0, 60]], reg)
+    s1 = _pyg4.geant4.solid.Subtraction("s1", t2, t4, [[0, 0, 0], [0, 0, 50]], reg)
+    assert meshKey(u1) == meshKey(u2)
+    assert meshKey(u1) != meshKey(u3)
+    assert meshKey(u1) != meshKey(s1)
+
+    sc = _pyg4.geant4.solid.Scaled("sc", u1, 1, 1, 2, reg)
+    assert meshKey(sc) is not None
+
+    # tessellated solids are keyed on their vertices and facets
+    vertices = [[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]]
+    facets = [[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]]
+    te1 = _pyg4.geant4.solid.TessellatedSolid("te1", [vertices, facets], reg)
+    te2 = _pyg4.geant4.solid.TessellatedSolid("te2", [vertices, facets], reg)
+    te3 = _pyg4.geant4.solid.TessellatedSolid("te3", [vertices, facets[::-1]], reg)
+    assert meshKey(te1) == meshKey(te2)
+    assert meshKey(te1) != meshKey(te3)
+
+
+def test_MeshCache_shared():
+    reg, r, (t1, t2, t3, t4) = _tubsRegistry()
+    l1 = _pyg4.geant4.LogicalVolume(t1, "G4_Fe", "l1", reg)
+    l2 = _pyg4.geant4.LogicalVolume(t2, "G4_Fe", "l2", reg)
+    l4 = _pyg4.geant4.LogicalVolume(t4, "G4_Fe", "l4", reg)
+
+    assert l1.mesh.localmesh is l2.mesh.localmesh
+    assert l1.mesh.localmesh is not l4.mesh.localmesh
+
+    r.setExpression(20)
+    l1.reMesh()
+    assert l1.mesh.localmesh is not l2.mesh.localmesh
+    assert l1.mesh.getBoundingBox()[1][0] == 20
+
+
+def test_MeshCache_lru(tmptestdir):
+    reg, r, (t1, t2, t3, t4) = _tubsRegistry()
+    cache = _pyg4.visualisation.MeshCache(maxSize=1, directory=str(tmptestdir / "meshcache"))
+
+    m1 = cache.mesh(t1)
+    assert cache.mesh(t2) is m1
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+    # evicts t1 from memory
+    m4 = cache.mesh(t4)
+    assert len(cache) == 1
+
+    # read back from disk
+    m1Disk = cache.mesh(t1)
+    assert m1Disk is not m1
+    assert m1Disk.polygonCount() == m1.polygonCount()
+    assert m1Disk.vertexCount() == m1.vertexCount()
+    assert cache.misses == 3
+
+
+def test_MeshCache_persistent(tmptestdir):
+    reg, r, (t1, t2, t3, t4) = _tubsRegistry()
+    directory = str(tmptestdir / "meshcachepersistent")
+    s1 = _pyg4.geant4.solid.Subtraction("s1", t1, t4, [[0, 0, 0], [0, 0, 50]], reg)
+
+    m1 = _pyg4.visualisation.MeshCache(directory=directory).mesh(s1)
+
+    # a new cache (i.e. session) reads the mesh back without meshing the solid
+    def noMesh():
+        msg = "solid should not be meshed"
+        raise AssertionError(msg)
+
+    s1.mesh = noMesh
+    m2 = _pyg4.visualisation.MeshCache(directory=directory).mesh(s1)
+    assert m2.polygonCount() == m1.polygonCount()
+    assert m2.vertexCount() == m1.vertexCount()
+
+
+def test_MeshCache_assemblyAABBMesh():
+    reg = _pyg4.geant4.Registry()
+    ws = _pyg4.geant4.solid.Box("ws", 1000, 1000, 1000, reg)
+    wl = _pyg4.geant4.LogicalVolume(ws, "G4_Galactic", "wl", reg)
+    ab = _pyg4.geant4.solid.Box("ab", 20, 20, 20, reg)
+    al = _pyg4.geant4.LogicalVolume(ab, "G4_Fe", "al", reg)
+    av = _pyg4.geant4.AssemblyVolume("av", reg)
+    _pyg4.geant4.PhysicalVolume([0, 0, 0], [0, 0, 0], al, "ap", av, reg)
+
+    # the same size as the (shared) aabb mesh of the assembly
+    b = _pyg4.geant4.solid.Box("b", 10, 10, 10, reg)
+    bl = _pyg4.geant4.LogicalVolume(b, "G4_Fe", "bl", reg)
+    _pyg4.geant4.PhysicalVolume([0, 0, 0], [100, 0, 0], av, "avp", wl, reg)
+    _pyg4.geant4.PhysicalVolume([0, 0, 0], [-100, 0, 0], bl, "bp", wl, reg)
+    reg.setWorld(wl)
+
+    # transforms the aabb mesh of the assembly placement
+    wl.cullDaughtersOutsideSolid(ws)
+    assert bl.mesh.getBoundingBox() == [[-5, -5, -5], [5, 5, 5]]
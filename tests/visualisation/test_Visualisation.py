@@ -166,6 +166,206 @@ def test_VtkViewerColouredMaterialNewAppend(testdata, tmptestdir):
     v.buildPipelinesAppend()
 
 
+def _instancedRegistry():
+    reg = _pyg4.geant4.Registry()
+    ws = _pyg4.geant4.solid.Box("ws", 2000, 2000, 2000, reg)
+    bs = _pyg4.geant4.solid.Box("bs", 50, 80, 120, reg)
+    cs = _pyg4.geant4.solid.Box("cs", 300, 300, 300, reg)
+    wl = _pyg4.geant4.LogicalVolume(ws, "G4_Galactic", "wl", reg)
+    bl = _pyg4.geant4.LogicalVolume(bs, "G4_Fe", "bl", reg)
+    cl = _pyg4.geant4.LogicalVolume(cs, "G4_Galactic", "cl", reg)
+    for i in range(4):
+        _pyg4.geant4.PhysicalVolume(
+            [0.5 * i, 0.2, 0], [60 * i - 90, 0, 20 * i], bl, f"b{i}", cl, reg
+        )
+    _pyg4.geant4.PhysicalVolume([0, 0, 0], [0, 0, 0], cl, "c0", wl, reg)
+    _pyg4.geant4.PhysicalVolume([0.3, 0.2, 0.1], [400, 0, 0], cl, "c1", wl, reg)
+    _pyg4.geant4.PhysicalVolume([0, 0, 0.5], [-400, 0, 0], cl, "c2", wl, reg, scale=[-1, 1, 1])
+    _pyg4.geant4.PhysicalVolume([0, 0.7, 0], [0, 500, 0], cl, "c3", wl, reg, scale=[1, 2, 1])
+    reg.setWorld(wl)
+    return reg
+
+
+def test_VtkViewerNewInstanced():
+    import numpy as _np
+    import warnings as _warnings
+    from vtk.util.numpy_support import vtk_to_numpy
+
+    def cutLength(pd):
+        points = vtk_to_numpy(pd.GetPoints().GetData())
+        lines = vtk_to_numpy(pd.GetLines().GetConnectivityArray()).reshape(-1, 2)
+        return _np.linalg.norm(points[lines[:, 0]] - points[lines[:, 1]], axis=1).sum()
+
+    wl = _instancedRegistry().getWorldVolume()
+    viewers = {}
+    for mode in ["Append", "Instanced"]:
+        v = _pyg4.visualisation.VtkViewerNew()
+        v.addClipper([0, 0, 0], [1, 0.2, 0], True)
+        v.addLogicalVolume(wl)
+        with _warnings.catch_warnings():
+            # vtkTransformPolyDataFilter of the append pipelines is deprecated in vtk 9.7
+            _warnings.simplefilter("ignore", DeprecationWarning)
+            getattr(v, "buildPipelines" + mode)()
+        v.setClipper([10, 0, 0], [1, 0, 0])
+        v.setCutter("xy", [0, 0, 20], [0.2, 0.1, 1])
+        viewers[mode] = v
+
+    # one actor for the daughter boxes except those that are rotated in the scaled c3
+    v = viewers["Instanced"]
+    assert len(v.instanceActors) == 1 + 1 + 4
+    assert sorted(len(i) for k, i in v.instanceActors.values() if k == "bl") == [1, 1, 1, 13]
+    assert v.clipperPlanes[0].GetNormal() == (-1, 0, 0)
+
+    for ck in ["xy", "xz", "yz", "clipperCutter"]:
+        lengths = [cutLength(v.getCutterPolydata(ck)) for v in viewers.values()]
+        assert abs(lengths[0] - lengths[1]) < 1e-6 * lengths[0]
+
+
+def test_VtkViewerNewMeshPolyData():
+    import warnings as _warnings
+
+    wl = _instancedRegistry().getWorldVolume()
+    bl = wl.daughterVolumes[0].logicalVolume.daughterVolumes[0].logicalVolume
+
+    # the polydata is converted once and shared by viewers
+    polydata = []
+    for i in range(2):
+        v = _pyg4.visualisation.VtkViewerNew()
+        v.addLogicalVolume(wl)
+        with _warnings.catch_warnings():
+            _warnings.simplefilter("ignore", DeprecationWarning)
+            v.buildPipelinesSeparate()
+        polydata.append(v.polydata["bl"])
+    assert polydata[0] is polydata[1]
+    assert polydata[0] is bl.mesh.vtkPolyData()
+    assert polydata[0].GetNumberOfPolys() == bl.mesh.localmesh.polygonCount()
+
+    # not kept by copies and remade with the mesh
+    assert bl.mesh.__getstate__()["_vtkPolyData"] == {}
+    bl.mesh.remesh()
+    assert bl.mesh.vtkPolyData() is not polydata[0]
+
+
+def test_ViewerBaseLevelOfDetail():
+    reg = _pyg4.geant4.Registry()
+    ws = _pyg4.geant4.solid.Box("ws", 20000, 20000, 20000, reg)
+    ts = _pyg4.geant4.solid.Tubs("ts", 10, 20, 100, 0, "2*pi", reg, nslice=64)
+    bs = _pyg4.geant4.solid.Box("bs", 5000, 5000, 5000, reg)
+    wl = _pyg4.geant4.LogicalVolume(ws, "G4_Galactic", "wl", reg)
+    tl = _pyg4.geant4.LogicalVolume(ts, "G4_Fe", "tl", reg)
+    bl = _pyg4.geant4.LogicalVolume(bs, "G4_Fe", "bl", reg)
+    for i in range(10):
+        _pyg4.geant4.PhysicalVolume([0, 0, 0], [0, 0, 100 * i], tl, f"t{i}", bl, reg)
+    _pyg4.geant4.PhysicalVolume([0, 0, 0], [0, 0, 0], bl, "b0", wl, reg)
+    reg.setWorld(wl)
+
+    # decimated variants, small meshes are kept
+    counts = [tl.mesh.lodMesh(i).polygonCount() for i in range(tl.mesh.lodLevels())]
+    assert counts[0] == 512
+    assert all(c1 < c0 for c0, c1 in zip(counts[:-1], counts[1:]))
+    assert tl.mesh.lodMesh(1).isClosed()
+    assert bl.mesh.lodMesh(3) is bl.mesh.localmesh
+
+    def scenePolygons(v):
+        return sum(
+            v.localmeshes[k].polygonCount() * len(v.instancePlacements[k]) for k in v.localmeshes
+        )
+
+    v = _pyg4.visualisation.VtkViewerNew()
+    v.addLogicalVolume(wl)
+    v.setLevelOfDetail(depth=1)
+    assert v.localmeshLevels == {"wl": 0, "bl": 0, "tl": 1}
+    v.setLevelOfDetail(screenFractions=True)
+    assert v.localmeshLevels["tl"] == tl.mesh.lodLevels() - 1
+    assert v.localmeshLevels["bl"] == 0
+    v.setLevelOfDetail(screenFractions=True, viewPoint=[0, 0, 300])
+    assert v.localmeshLevels["tl"] == 0
+
+    v.setLevelOfDetail(polygonBudget=2000)
+    assert scenePolygons(v) <= 2000
+    assert v.localmeshes["tl"] is tl.mesh.lodMesh(v.localmeshLevels["tl"])
+    assert v._meshPolyData("tl") is tl.mesh.vtkPolyData(v.localmeshLevels["tl"])
+
+
+def test_MeshLevelOfDetailNullMesh():
+    reg = _pyg4.geant4.Registry()
+    bs1 = _pyg4.geant4.solid.Box("bs1", 10, 10, 10, reg)
+    bs2 = _pyg4.geant4.solid.Box("bs2", 20, 20, 20, reg)
+    ss = _pyg4.geant4.solid.Subtraction("ss", bs1, bs2, [[0, 0, 0], [0, 0, 0]], reg)
+
+    meshingNullException = _pyg4.config.meshingNullException
+    _pyg4.config.meshingNullException = False
+    try:
+        sl = _pyg4.geant4.LogicalVolume(ss, "G4_Fe", "sl", reg)
+        assert sl.mesh.localmesh.polygonCount() == 0
+        for level in range(sl.mesh.lodLevels()):
+            assert sl.mesh.lodMesh(level) is sl.mesh.localmesh
+        assert sl.mesh.vtkPolyData(1) is sl.mesh.vtkPolyData(0)
+    finally:
+        _pyg4.config.meshingNullException = meshingNullException
+
+
+def test_ViewerBaseExportGLTF(tmptestdir):
+    import numpy as _np
+    import pygltflib as _pygltflib
+
+    reg = _instancedRegistry()
+    wl = reg.getWorldVolume()
+    # same geometry as bl in another logical volume
+    bs2 = _pyg4.geant4.solid.Box("bs2", 50, 80, 120, reg)
+    bl2 = _pyg4.geant4.LogicalVolume(bs2, "G4_Fe", "bl2", reg)
+    _pyg4.geant4.PhysicalVolume([0, 0, 0], [0, -500, 0], bl2, "d0", wl, reg)
+
+    v = _pyg4.visualisation.VtkViewerNew()
+    v.addLogicalVolume(wl)
+    meshes = dict(v.localmeshes)
+
+    v.exportGLTFScene(tmptestdir / "scene.glb")
+    g = _pygltflib.GLTF2.load(str(tmptestdir / "scene.glb"))
+    blob = g.binary_blob()
+    assert len(g.buffers) == 1
+    assert g.buffers[0].byteLength == len(blob)
+    assert len(g.nodes) == 22
+    assert len({m.primitives[0].attributes.POSITION for m in g.meshes}) == 3
+    assert v.localmeshes == meshes
+
+    # world coordinates of the reflected placement of bl in c2
+    node = next(n for n in g.nodes if n.name == "bl_8")
+    accessor = g.accessors[g.meshes[node.mesh].primitives[0].attributes.POSITION]
+    view = g.bufferViews[accessor.bufferView]
+    vertices = _np.frombuffer(blob, _np.float32, 3 * accessor.count, view.byteOffset)
+    vertices = vertices.reshape(-1, 3).astype(float)
+    x, y, z, w = node.rotation
+    rotation = _np.array(
+        [
+            [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+            [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+            [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+        ]
+    )
+    placement = v.instancePlacements["bl"][8]
+    assert placement["name"] == "b0"
+    assert _np.linalg.det(placement["transformation"]) < 0
+    scale = 1 - 0.001 * v.instanceVisOptions["bl"][0].depth
+    expected = vertices * scale @ _np.asarray(placement["transformation"], dtype=float).T
+    expected += placement["translation"]
+    assert _np.allclose((vertices * node.scale) @ rotation.T + node.translation, expected)
+
+    v.exportGLTFScene(tmptestdir / "scene.gltf", normals=True, quantise=True, gpuInstancing=True)
+    g = _pygltflib.GLTF2.load(str(tmptestdir / "scene.gltf"))
+    assert len(g.buffers) == 1
+    assert g.extensionsRequired == ["KHR_mesh_quantization", "EXT_mesh_gpu_instancing"]
+    # one node per mesh and one for each placement in c3 that is not a rotation and scale
+    assert len(g.nodes) == 4 + 3
+    attributes = g.meshes[g.nodes[0].mesh].primitives[0].attributes
+    assert g.accessors[attributes.POSITION].componentType == _pygltflib.SHORT
+    assert g.accessors[attributes.NORMAL].componentType == _pygltflib.BYTE
+
+    # the suffix decides the format, not the rest of the name
+    v.exportGLTFScene(tmptestdir / "glb_scene.gltf")
+    assert (tmptestdir / "glb_scene.gltf").read_text().startswith("{")
+
+
 def test_UsdViewer(testdata, tmptestdir):
     r = _pyg4.gdml.Reader(testdata["gdml/ChargeExchangeMC/lht.gdml"])
     reg = r.getRegistry()